@@ -53,10 +53,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'news_application.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'news_application.middleware.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -95,6 +97,24 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# The database cache is shared by the web process and every notification
+# worker, so what one process caches (rendered notifications, tweet media
+# IDs, compressed API bodies) is reused by the others. Create its table with
+# createcachetable.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'news_addiction_cache',
+        'OPTIONS': {
+            # Room for the compressed API bodies next to the other entries:
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -158,3 +178,84 @@ AUTH_USER_MODEL = 'news_application.User'
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 
+
+# Number of articles per page on the reader start page:
+READER_FEED_PAGE_SIZE = 20
+
+# Maximum number of (most relevant) full-text search matches per search:
+SEARCH_MAX_RESULTS = 500
+
+# Articles per page of the /get/articles/ API, and the largest page a client
+# can ask for with ?limit=:
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 500
+# Rows read at a time by the streaming article export:
+EXPORT_CHUNK_SIZE = 2000
+# Verified API keys are cached in each process for this long, so a revoked
+# key (or the key of a deactivated user) can keep working in other processes
+# for up to this many seconds:
+API_KEY_CACHE_SECONDS = 60
+API_KEY_CACHE_SIZE = 10000
+# Response compression (CompressionMiddleware): content codings in order of
+# preference (br and zstd need the brotli and zstandard packages; HTML pages
+# only get gzip, which Django pads against BREACH), the
+# smallest body worth compressing, and how long (and up to what size)
+# compressed API bodies are cached per collection version in the shared
+# default cache (see CACHES), so every web process reuses them:
+COMPRESSION_ENCODINGS = ["zstd", "br", "gzip"]
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CACHE_TTL = 300
+COMPRESSION_CACHE_MAX_SIZE = 512 * 1024
+# Changes younger than this are left out of the /get/articles/changes/ feed,
+# so transactions still committing them are unlikely to be skipped by a
+# cursor. A heuristic, not a guarantee: a commit slower than this can still
+# be missed:
+CHANGES_FEED_SETTLE_SECONDS = 2
+
+# Notification outbox (see the run_notification_worker command):
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_BASE_SECONDS = 30
+NOTIFICATION_RETRY_MAX_SECONDS = 3600
+NOTIFICATION_LOCK_TIMEOUT_SECONDS = 600
+# Subscriber emails built and sent per chunk on one connection:
+NOTIFICATION_EMAIL_CHUNK_SIZE = 100
+# Subscriber rows fetched at a time when fanning out a notification:
+NOTIFICATION_FANOUT_CHUNK_SIZE = 2000
+# Rendered notifications are cached per article in the shared default cache
+# (see CACHES), so the web process and the workers render each article once;
+# send an HTML part with the plain text emails:
+NOTIFICATION_RENDER_CACHE_TTL = 3600
+NOTIFICATION_EMAIL_HTML = False
+
+# Encrypted store for the Twitter OAuth tokens (see authorize_twitter). The
+# key defaults to one derived from SECRET_KEY:
+TWITTER_TOKEN_STORE_PATH = BASE_DIR / "twitter_tokens.enc"
+TWITTER_TOKEN_STORE_KEY = env('TWITTER_TOKEN_STORE_KEY', default=None)
+# Seconds an uploaded tweet image's media ID is reused for the same image, by
+# every worker through the shared default cache (see CACHES):
+TWITTER_MEDIA_CACHE_TTL = 23 * 60 * 60
+
+# Where published articles are posted (see functions/syndication.py). The
+# tests post nothing; use StubSyndicationBackend with run_syndication_stub
+# to develop without a Twitter account:
+if TESTING:
+    SYNDICATION_BACKEND = (
+        'news_application.functions.syndication.NoopSyndicationBackend')
+else:
+    SYNDICATION_BACKEND = env(
+        'SYNDICATION_BACKEND',
+        default='news_application.functions.syndication.'
+                'TwitterSyndicationBackend')
+SYNDICATION_STUB_URL = env('SYNDICATION_STUB_URL',
+                           default='http://127.0.0.1:8081/2/tweets')
+
+# Outbound HTTP client shared by the Twitter and syndication integrations:
+# connections kept alive per host, (connect, read) timeouts in seconds and
+# retries with jittered exponential backoff:
+OUTBOUND_HTTP_POOL_SIZE = 10
+OUTBOUND_HTTP_CONNECT_TIMEOUT = 3.05
+OUTBOUND_HTTP_READ_TIMEOUT = 10
+OUTBOUND_HTTP_RETRIES = 3
+OUTBOUND_HTTP_BACKOFF_FACTOR = 0.5
+OUTBOUND_HTTP_BACKOFF_JITTER = 0.5
+OUTBOUND_HTTP_BACKOFF_MAX = 10
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from .models import (User, ReaderProfile, JournalistProfile, EditorProfile, 
-                     Roles, Publisher, Article, ResetToken)
+                     Roles, Publisher, Article, ResetToken, NotificationJob,
+                     NotificationDelivery, DigestItem, APIKey)
+from .functions.api_keys import revoke_api_keys
 
 class PublisherAdmin(admin.ModelAdmin):
     list_display = ['name', 'get_editors_count', 
@@ -29,6 +31,41 @@ class PublisherAdmin(admin.ModelAdmin):
         return super().formfield_for_manytomany(db_field, request, **kwargs)
 
 
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ['article', 'kind', 'status', 'attempts', 'available_at',
+                    'delivered_at']
+    list_filter = ['status', 'kind']
+    raw_id_fields = ['article']
+
+
+class NotificationDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['article', 'recipient', 'delivered_at']
+    raw_id_fields = ['article', 'recipient']
+
+
+class DigestItemAdmin(admin.ModelAdmin):
+    list_display = ['reader', 'article', 'created_at']
+    raw_id_fields = ['reader', 'article']
+
+
+class APIKeyAdmin(admin.ModelAdmin):
+    # Keys are minted with the api_keys command, which shows the key once:
+    list_display = ['prefix', 'user', 'name', 'created_at', 'last_used_at',
+                    'revoked_at']
+    search_fields = ['prefix', 'user__username', 'name']
+    readonly_fields = ['prefix', 'digest', 'created_at', 'last_used_at',
+                       'revoked_at']
+    raw_id_fields = ['user']
+    actions = ['revoke']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description='Revoke selected API keys')
+    def revoke(self, request, queryset):
+        revoke_api_keys(queryset)
+
+
 
 
 
@@ -43,4 +80,8 @@ admin.site.register(JournalistProfile)
 admin.site.register(EditorProfile)
 admin.site.register(Publisher, PublisherAdmin)  # Use the custom admin class
 admin.site.register(Article)
-admin.site.register(ResetToken)
\ No newline at end of file
+admin.site.register(ResetToken)
+admin.site.register(NotificationJob, NotificationJobAdmin)
+admin.site.register(NotificationDelivery, NotificationDeliveryAdmin)
+admin.site.register(DigestItem, DigestItemAdmin)
+admin.site.register(APIKey, APIKeyAdmin)
@@ -0,0 +1,48 @@
+from functools import wraps
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.contrib.auth import REDIRECT_FIELD_NAME
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import resolve_url
+from .middleware import get_request_role
+from .models import Roles
+
+
+def role_required(*roles, login_url=None,
+                  redirect_field_name=REDIRECT_FIELD_NAME):
+    """Decorator for views that checks that the user has one of the given
+    roles, redirecting to the log-in page if not. Behaves like
+    user_passes_test, but checks the role resolved by RoleMiddleware
+    instead of querying the user's groups.
+
+    Args:
+        roles (Roles): The roles allowed to access the view.
+        login_url (str, optional): Log-in URL, defaults to
+            settings.LOGIN_URL.
+        redirect_field_name (str, optional): Name of the GET parameter
+            holding the URL to return to after logging in.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if get_request_role(request) in roles:
+                return view_func(request, *args, **kwargs)
+
+            path = request.build_absolute_uri()
+            resolved_login_url = resolve_url(login_url or settings.LOGIN_URL)
+            # Use a relative "next" URL if the log-in page is on the same
+            # scheme and host as the current page:
+            login_scheme, login_netloc = urlsplit(resolved_login_url)[:2]
+            current_scheme, current_netloc = urlsplit(path)[:2]
+            if ((not login_scheme or login_scheme == current_scheme) and
+                    (not login_netloc or login_netloc == current_netloc)):
+                path = request.get_full_path()
+            return redirect_to_login(path, resolved_login_url,
+                                     redirect_field_name)
+        return _wrapped_view
+    return decorator
+
+
+reader_required = role_required(Roles.READER)
+journalist_required = role_required(Roles.JOURNALIST)
+editor_required = role_required(Roles.EDITOR)
@@ -7,7 +7,6 @@ from django.contrib.auth.forms import UserCreationForm, PasswordResetForm
 from django.contrib.auth.models import  Group
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError
-from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 import copy
 
@@ -173,11 +172,9 @@ class ArticlePublishForm(forms.ModelForm):
         publisher_choice = self.cleaned_data.get("publisher_choice")
         
         if publisher_choice == self.PUBLISH_DIRECTLY:
-            # Set publisher to the journalist"s profile for self-publishing
-        
-            content_type = ContentType.objects.get_for_model(article.author)
-            article.publisher_content_type = content_type
-            article.publisher_object_id = article.author.id
+            # Mark the article as self-published by the journalist:
+            article.publisher = None
+            article.self_published = True
             # Only publish automatically if published directly:
             if publisher_choice == self.PUBLISH_DIRECTLY:
                 article.publication_status = ArticleStatus.PUBLISHED
@@ -186,9 +183,7 @@ class ArticlePublishForm(forms.ModelForm):
             # Set publisher to the selected Publisher
             publisher_id = int(publisher_choice)
             publisher = Publisher.objects.get(id=publisher_id)
-            article.publisher_content_type = ContentType.objects.get_for_model(
-                Publisher)
-            article.publisher_object_id = publisher.id
+            article.publisher = publisher
             # If publishing through a publisher, set status to pending:
             article.publication_status = ArticleStatus.AWAITING_APPROVAL  
 
@@ -255,4 +250,17 @@ class AssignJournalistsToPublisherForm(forms.ModelForm):
         if commit:
             publisher.save()
         
-        return publisher
\ No newline at end of file
+        return publisher
+
+class ReaderNotificationSettingsForm(forms.ModelForm):
+    """
+    Form for a reader to choose how new article notifications are emailed.
+    """
+
+    class Meta:
+        model = ReaderProfile
+        fields = ["digest_frequency"]
+        labels = {"digest_frequency": "Email me about new articles"}
+        widgets = {
+            "digest_frequency": forms.Select(attrs={"class": "form-control"})
+        }
@@ -0,0 +1,149 @@
+import copy
+import hashlib
+import secrets
+import threading
+import time
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.authentication import (BaseAuthentication,
+                                           get_authorization_header)
+from rest_framework.exceptions import AuthenticationFailed
+from ..models import APIKey
+
+
+def hash_api_key(key):
+    """Return the hex SHA-256 digest stored for a key.
+
+    Keys are random and long, so unlike passwords they need no slow,
+    salted hash to resist guessing.
+    """
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def mint_api_key(user, name=""):
+    """Issue a new API key to a user.
+
+    Returns:
+        tuple: (APIKey, key). The key is not stored and cannot be shown
+            again.
+    """
+    prefix = secrets.token_hex(6)
+    key = f"{prefix}.{secrets.token_urlsafe(32)}"
+    api_key = APIKey.objects.create(user=user, name=name, prefix=prefix,
+                                    digest=hash_api_key(key))
+    return api_key, key
+
+
+def revoke_api_keys(queryset):
+    """Revoke the active keys of a queryset.
+
+    The verification cache of this process is cleared. Other processes
+    accept a revoked key until their cached result expires, at most
+    API_KEY_CACHE_SECONDS later.
+
+    Returns:
+        int: The number of keys revoked.
+    """
+    revoked = queryset.filter(revoked_at__isnull=True).update(
+        revoked_at=timezone.now())
+    _verified.clear()
+    return revoked
+
+
+class VerificationCache():
+    """Users of recently verified key digests, for a short time.
+
+    Only valid keys are cached, so unknown keys cannot fill it up, and it
+    is cleared when it reaches API_KEY_CACHE_SIZE entries.
+    """
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[digest]
+                return None
+            return user
+
+    def set(self, digest, user):
+        ttl = getattr(settings, "API_KEY_CACHE_SECONDS", 60)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if len(self._entries) >= getattr(settings, "API_KEY_CACHE_SIZE",
+                                             10000):
+                self._entries.clear()
+            self._entries[digest] = (user, time.monotonic() + ttl)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_verified = VerificationCache()
+
+
+def clear_api_key_cache():
+    _verified.clear()
+
+
+def verify_api_key(key):
+    """Return the user of an active API key, or None.
+
+    The key is looked up by its digest, so neither the database lookup
+    nor the cache lookup takes longer the more of a stored key a guess
+    matches. Valid keys are cached for API_KEY_CACHE_SECONDS, so a
+    polling client costs one hash and a dictionary lookup per request.
+    last_used_at is only updated on cache misses.
+
+    The user is cached with the key and is_active is not checked again
+    on cache hits. Deactivating or deleting a user clears the cache of
+    the process that did it (see signals.py), but other processes accept
+    the user's keys until their cached result expires, at most
+    API_KEY_CACHE_SECONDS later, as with revoke_api_keys().
+    """
+    digest = hash_api_key(key)
+    user = _verified.get(digest)
+    if user is None:
+        api_key = APIKey.objects.select_related("user").filter(
+            digest=digest, revoked_at__isnull=True).first()
+        if api_key is None or not api_key.user.is_active:
+            return None
+        APIKey.objects.filter(pk=api_key.pk).update(
+            last_used_at=timezone.now())
+        user = api_key.user
+        _verified.set(digest, user)
+    # Each request gets its own instance of the shared cached user:
+    return copy.copy(user)
+
+
+class APIKeyAuthentication(BaseAuthentication):
+    """Authenticates "Authorization: Api-Key <key>" headers with the keys
+    from mint_api_key(), without the password hash of Basic auth.
+    """
+    keyword = "Api-Key"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise AuthenticationFailed("Invalid API key header.")
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed("Invalid API key header.")
+
+        user = verify_api_key(key)
+        if user is None:
+            raise AuthenticationFailed("Invalid or revoked API key.")
+        return (user, None)
+
+    def authenticate_header(self, request):
+        return self.keyword
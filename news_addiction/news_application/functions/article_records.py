@@ -0,0 +1,149 @@
+from functools import partial
+from operator import itemgetter
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+
+def format_datetime(value, tz=None):
+    """Format a datetime like the API does (ISO 8601 in the current time
+    zone, or tz, with UTC as "Z").
+    """
+    if value is None:
+        return None
+    value = value.astimezone(tz or timezone.get_current_timezone())
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def publisher_name(self_published, publisher_id, name, author_display_name):
+    """The same rules as Article.get_publisher_name(), from column values."""
+    if self_published:
+        return author_display_name
+    if publisher_id is None:
+        return "No Publisher"
+    return name
+
+
+# The record fields, named and ordered like ArticleSerializer. Each field
+# has the values_list() columns it is built from and a function building
+# its value from those columns:
+ARTICLE_FIELDS = {
+    "author_display_name": (["author__display_name"], None),
+    "author_user_name": (["author__username"], None),
+    "publisher_name": (["self_published", "publisher_id", "publisher__name",
+                        "author__display_name"], publisher_name),
+    "id": (["id"], None),
+    "title": (["title"], None),
+    "content": (["content"], None),
+    "publication_date": (["publication_date"], format_datetime),
+    "publication_status": (["publication_status"], None),
+    "image": (["image"],
+              lambda image: default_storage.url(image) if image else None),
+    "author": (["author_id"], None),
+    "category": (["category"], None),
+    "self_published": (["self_published"], None),
+    "publisher": (["publisher_id"], None),
+    "created_at": (["created_at"], format_datetime),
+    "updated_at": (["updated_at"], format_datetime),
+}
+
+# Relations that ?expand= embeds in place of their ID:
+EXPANSIONS = {
+    "author": (["author_id", "author__username", "author__display_name"],
+               lambda pk, username, display_name: {
+                   "id": pk, "username": username,
+                   "display_name": display_name}),
+    "publisher": (["publisher_id", "self_published", "publisher__name",
+                   "author__display_name"],
+                  lambda pk, self_published, name, author_display_name: {
+                      "id": pk, "self_published": self_published,
+                      "name": publisher_name(self_published, pk, name,
+                                             author_display_name)}),
+}
+
+
+def parse_field_list(value):
+    """Split a comma separated ?fields= or ?expand= value."""
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def column_getter(indexes, build):
+    """Return a function reading a field's value from a row, given the
+    row indexes of its columns and its build function (or None).
+    """
+    if build is None:
+        return itemgetter(indexes[0])
+    if len(indexes) == 1:
+        index = indexes[0]
+        return lambda row: build(row[index])
+    return lambda row: build(*[row[index] for index in indexes])
+
+
+class ArticleRecordBuilder():
+    """Builds the API records of articles from values_list() rows that only
+    hold the columns of the requested fields, so unrequested columns (such
+    as content) are never read from the database.
+
+    With every field the records encode to the same JSON, byte for byte,
+    as ArticleSerializer, at several times its speed: there is no model
+    instance or serializer field per row and publisher names come from
+    the same query (see benchmark_article_serialization).
+
+    Args:
+        fields (list): Record fields to include, in ARTICLE_FIELDS order.
+            Defaults to all of them.
+        expand (list): EXPANSIONS to embed as objects. An expanded
+            relation is included even if it is not in fields.
+
+    Raises:
+        ValueError: If a field or expansion does not exist.
+    """
+    def __init__(self, fields=None, expand=()):
+        for name in fields or ():
+            if name not in ARTICLE_FIELDS:
+                raise ValueError(f"Unknown field: {name}")
+        for name in expand:
+            if name not in EXPANSIONS:
+                raise ValueError(f"Cannot expand: {name}")
+        selected = set(fields or ARTICLE_FIELDS) | set(expand)
+        self.fields = [name for name in ARTICLE_FIELDS if name in selected]
+
+        # Look the time zone up once instead of for every datetime:
+        tz = timezone.get_current_timezone()
+
+        # The pk is always read first, for pagination and stream_rows():
+        self.columns = ["id"]
+        self.getters = []
+        for name in self.fields:
+            columns, build = (EXPANSIONS[name] if name in expand
+                              else ARTICLE_FIELDS[name])
+            if build is format_datetime:
+                build = partial(format_datetime, tz=tz)
+            for column in columns:
+                if column not in self.columns:
+                    self.columns.append(column)
+            indexes = [self.columns.index(column) for column in columns]
+            self.getters.append((name, column_getter(indexes, build)))
+
+    def rows(self, queryset):
+        """Select the columns of the requested fields from a queryset."""
+        return queryset.values_list(*self.columns)
+
+    def record(self, row):
+        """Build the record of one row from rows().
+
+        Returns:
+            dict: The requested fields.
+        """
+        return {name: getter(row) for name, getter in self.getters}
+
+    def records(self, rows):
+        """Build the records of many rows.
+
+        Returns:
+            list: The records, in the order of the rows.
+        """
+        record = self.record
+        return [record(row) for row in rows]
@@ -0,0 +1,137 @@
+from datetime import timedelta
+from heapq import merge
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from ..models import Article, ArticleTombstone
+from .article_records import ArticleRecordBuilder, format_datetime
+from .conditional import bump_collection_version
+
+
+CHANGES_CURSOR_SALT = "news_application.changes.cursor"
+
+
+def touch_articles(queryset):
+    """Mark articles as changed without saving each one, e.g. when the
+    name of their author or publisher (part of their records) changes.
+    """
+    if queryset.update(updated_at=timezone.now()):
+        bump_collection_version()
+
+
+def record_article_deletion(article_id):
+    """Leave a tombstone for a deleted article in the changes feed."""
+    ArticleTombstone.objects.create(article_id=article_id)
+
+
+def encode_changes_cursor(changed_at, article_id):
+    """Build the opaque cursor of the position just after a change."""
+    return signing.dumps({"t": changed_at.isoformat(), "pk": article_id},
+                         salt=CHANGES_CURSOR_SALT)
+
+
+def decode_changes_cursor(token):
+    """Decode a cursor from encode_changes_cursor().
+
+    Returns:
+        tuple: (changed_at, article_id), or None if token is empty.
+
+    Raises:
+        ValueError: If the token is invalid or tampered with. Unlike page
+            cursors, a bad changes cursor is not restarted from the
+            beginning, which would silently resend the whole catalogue.
+    """
+    if not token:
+        return None
+    try:
+        cursor = signing.loads(token, salt=CHANGES_CURSOR_SALT)
+        changed_at = parse_datetime(cursor["t"])
+        article_id = int(cursor["pk"])
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        raise ValueError("Invalid changes cursor")
+    if changed_at is None:
+        raise ValueError("Invalid changes cursor")
+    return changed_at, article_id
+
+
+def after_cursor_q(time_field, id_field, cursor):
+    """Build the Q() selecting the rows ordered after cursor by
+    (time_field, id_field).
+    """
+    if cursor is None:
+        return Q()
+    changed_at, article_id = cursor
+    return (Q(**{f"{time_field}__gt": changed_at})
+            | Q(**{time_field: changed_at, f"{id_field}__gt": article_id}))
+
+
+def get_changes(since=None, page_size=100):
+    """Return the article changes after a cursor, oldest first.
+
+    Saved articles (created, edited, published or unpublished) come from
+    Article.updated_at and deleted ones from their ArticleTombstone, so a
+    page costs two index range scans however large the catalogue is.
+    Changes from the last CHANGES_FEED_SETTLE_SECONDS are held back, so
+    a transaction that was still committing when a page was read is
+    unlikely to slip in behind the cursor. This is a heuristic, not a
+    guarantee: updated_at is set before the commit, so a transaction
+    that takes longer than the window to commit can still land behind a
+    cursor and be missed until the article changes again.
+
+    Args:
+        since (str): A cursor from a previous page, or None to start with
+            every article.
+        page_size (int): Maximum number of changes to return.
+
+    Returns:
+        dict: "articles" (the records of the changed articles), "deleted"
+            (the IDs and deletion times of deleted articles), "has_more"
+            (if the next page already has changes) and "cursor" (to pass
+            as since for the next page).
+
+    Raises:
+        ValueError: If since is not a valid cursor.
+    """
+    cursor = decode_changes_cursor(since)
+    horizon = timezone.now() - timedelta(
+        seconds=getattr(settings, "CHANGES_FEED_SETTLE_SECONDS", 2))
+
+    # Read one extra change to find out if there is a next page:
+    builder = ArticleRecordBuilder()
+    updated_at = builder.columns.index("updated_at")
+    rows = builder.rows(Article.objects.filter(
+        after_cursor_q("updated_at", "pk", cursor),
+        updated_at__lte=horizon,
+    )).order_by("updated_at", "pk")[:page_size + 1]
+    tombstones = ArticleTombstone.objects.filter(
+        after_cursor_q("deleted_at", "article_id", cursor),
+        deleted_at__lte=horizon,
+    ).order_by("deleted_at", "article_id").values_list(
+        "deleted_at", "article_id")[:page_size + 1]
+
+    changes = list(merge(
+        ((row[updated_at], row[0], row) for row in rows),
+        ((deleted_at, article_id, None)
+         for deleted_at, article_id in tombstones),
+        key=lambda change: change[:2]))
+    has_more = len(changes) > page_size
+    changes = changes[:page_size]
+
+    articles = []
+    deleted = []
+    for changed_at, article_id, row in changes:
+        if row is None:
+            deleted.append({"id": article_id,
+                            "deleted_at": format_datetime(changed_at)})
+        else:
+            articles.append(builder.record(row))
+
+    if changes:
+        since = encode_changes_cursor(*changes[-1][:2])
+    elif since is None:
+        # Nothing has changed up to the horizon, so resume from there:
+        since = encode_changes_cursor(horizon, 0)
+    return {"articles": articles, "deleted": deleted,
+            "has_more": has_more, "cursor": since}
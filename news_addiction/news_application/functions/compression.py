@@ -0,0 +1,343 @@
+import hashlib
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # Optional, br is only offered when installed
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional, zstd is only offered when installed
+    zstandard = None
+
+
+# Content types worth compressing, besides text/*:
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/xml",
+    "application/x-ndjson",
+    "application/javascript",
+    "image/svg+xml",
+}
+
+
+class GzipCompressor():
+    """gzip with Django's compress_string() and compress_sequence(), which
+    pad the gzip header with a random number of bytes (up to
+    GZipMiddleware.max_random_bytes) to mitigate BREACH attacks on pages
+    that carry a CSRF token.
+    """
+    max_random_bytes = GZipMiddleware.max_random_bytes
+
+    def compress_body(self, body):
+        return compress_string(body, max_random_bytes=self.max_random_bytes)
+
+    def compress_chunks(self, chunks):
+        return compress_sequence(chunks,
+                                 max_random_bytes=self.max_random_bytes)
+
+
+class StreamCompressor():
+    """Base of the compressors with a compress() and flush() interface."""
+    def compress_body(self, body):
+        return self.compress(body) + self.flush()
+
+    def compress_chunks(self, chunks):
+        for chunk in chunks:
+            compressed = self.compress(chunk)
+            if compressed:
+                yield compressed
+        yield self.flush()
+
+
+class BrotliCompressor(StreamCompressor):
+    def __init__(self):
+        # Quality 5 of 11 suits compressing on the fly:
+        self._compressor = brotli.Compressor(quality=5)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.finish()
+
+
+class ZstdCompressor(StreamCompressor):
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+
+# Compressor of each installed content coding:
+COMPRESSORS = {"gzip": GzipCompressor}
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+# Codings whose output is padded against BREACH, the only ones used for
+# HTML pages (which carry CSRF tokens and reflect user input):
+PADDED_ENCODINGS = {"gzip"}
+
+
+class EncodingMetrics():
+    """Compression counters of one content coding.
+
+    Attributes:
+        responses (int): Responses sent with the coding.
+        cache_hits (int): Responses whose body came from the cache of
+            compressed bodies instead of being compressed.
+        bytes_in (int): Uncompressed bytes of the compressed responses.
+        bytes_out (int): Compressed bytes of those responses.
+        cpu_seconds (float): CPU time spent compressing.
+    """
+    def __init__(self):
+        self.responses = 0
+        self.cache_hits = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cpu_seconds = 0.0
+
+    @property
+    def ratio(self):
+        return self.bytes_in / self.bytes_out if self.bytes_out else 0.0
+
+    def __str__(self):
+        compressed = self.responses - self.cache_hits
+        per_response = self.cpu_seconds / compressed if compressed else 0.0
+        return (f"{self.responses} responses ({self.cache_hits} cached), "
+                f"ratio {self.ratio:.1f}x, "
+                f"cpu {self.cpu_seconds * 1000:.1f}ms "
+                f"({per_response * 1000:.2f}ms per compression)")
+
+    def record(self, bytes_in, bytes_out, cpu_seconds, cached):
+        self.responses += 1
+        self.cache_hits += cached
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.cpu_seconds += cpu_seconds
+
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def get_compression_metrics():
+    """Return a snapshot of the compression counters of this process.
+
+    Returns:
+        dict: EncodingMetrics by content coding.
+    """
+    with _metrics_lock:
+        snapshot = {}
+        for encoding, metrics in _metrics.items():
+            copy = EncodingMetrics()
+            copy.__dict__.update(metrics.__dict__)
+            snapshot[encoding] = copy
+        return snapshot
+
+
+def reset_compression_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def record_compression(encoding, bytes_in, bytes_out, cpu_seconds,
+                       cached=False):
+    with _metrics_lock:
+        _metrics.setdefault(encoding, EncodingMetrics()).record(
+            bytes_in, bytes_out, cpu_seconds, cached)
+
+
+def parse_accept_encoding(header):
+    """Parse an Accept-Encoding header.
+
+    Returns:
+        dict: The q value of each coding named in the header.
+    """
+    accepted = {}
+    for part in header.split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header, encodings=None):
+    """Choose the content coding of a response from the Accept-Encoding
+    header of its request: the accepted coding with the highest q value,
+    ties going to the first of COMPRESSION_ENCODINGS.
+
+    Args:
+        header (str): The Accept-Encoding header.
+        encodings (set): Only choose from these codings, defaults to every
+            installed one.
+
+    Returns:
+        str: The coding, or None to send the response uncompressed.
+    """
+    accepted = parse_accept_encoding(header or "")
+    candidates = []
+    preference = getattr(settings, "COMPRESSION_ENCODINGS",
+                         ["zstd", "br", "gzip"])
+    for rank, encoding in enumerate(preference):
+        q = accepted.get(encoding, accepted.get("*", 0.0))
+        if (encoding in COMPRESSORS and q > 0
+                and (encodings is None or encoding in encodings)):
+            candidates.append((-q, rank, encoding))
+    return min(candidates)[2] if candidates else None
+
+
+def compress(body, encoding):
+    """Compress a body.
+
+    Returns:
+        tuple: (compressed body, CPU seconds it took).
+    """
+    start = time.thread_time()
+    compressed = COMPRESSORS[encoding]().compress_body(body)
+    return compressed, time.thread_time() - start
+
+
+def compress_stream(chunks, encoding):
+    """Compress the chunks of a streaming response as they are produced.
+
+    The CPU time spent producing the chunks is not counted as compression
+    time.
+
+    Yields:
+        bytes: Compressed chunks.
+    """
+    bytes_in = bytes_out = 0
+    source_seconds = cpu_seconds = 0.0
+
+    def source():
+        nonlocal bytes_in, source_seconds
+        chunks_iter = iter(chunks)
+        while True:
+            start = time.thread_time()
+            chunk = next(chunks_iter, None)
+            source_seconds += time.thread_time() - start
+            if chunk is None:
+                return
+            bytes_in += len(chunk)
+            yield chunk
+
+    compressed_chunks = iter(
+        COMPRESSORS[encoding]().compress_chunks(source()))
+    while True:
+        start = time.thread_time()
+        compressed = next(compressed_chunks, None)
+        cpu_seconds += time.thread_time() - start
+        if compressed is None:
+            break
+        if compressed:
+            bytes_out += len(compressed)
+            yield compressed
+    record_compression(encoding, bytes_in, bytes_out,
+                       cpu_seconds - source_seconds)
+
+
+def compressed_cache_key(request, response, encoding):
+    """The cache key of a compressed body, or None if it is not cached.
+
+    Only responses tagged by conditional_on_collection() are cached: the
+    tag names the collection version (and format) the body was built
+    from, so a URL's body can only change with the tag.
+    """
+    tag = getattr(response, "collection_tag", None)
+    if tag is None or response.status_code != 200:
+        return None
+    url = hashlib.sha256(request.get_full_path().encode()).hexdigest()
+    return f"compressed:{url}:{tag}:{encoding}"
+
+
+def is_compressible(response):
+    content_type = response.get("Content-Type", "").split(";")[0].strip()
+    return (content_type.startswith("text/")
+            or content_type in COMPRESSIBLE_TYPES)
+
+
+def compress_response(request, response):
+    """Compress a response with the coding negotiated for its request.
+
+    Bodies smaller than COMPRESSION_MIN_SIZE are sent as they are, and
+    streaming responses are compressed chunk by chunk. HTML pages are
+    only compressed with the codings of PADDED_ENCODINGS, like
+    django.middleware.gzip does. Compressed bodies of tagged responses
+    (see compressed_cache_key()) are kept for COMPRESSION_CACHE_TTL
+    seconds in the default cache, which every web process shares (see
+    CACHES), so hot pages are compressed once per version instead of on
+    every request in every process.
+
+    Returns:
+        HttpResponse: The same response.
+    """
+    if response.has_header("Content-Encoding") or not is_compressible(
+            response):
+        return response
+    if not response.streaming and len(response.content) < getattr(
+            settings, "COMPRESSION_MIN_SIZE", 1024):
+        return response
+
+    patch_vary_headers(response, ("Accept-Encoding",))
+    encodings = (PADDED_ENCODINGS if response.get("Content-Type", "")
+                 .startswith("text/html") else None)
+    encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING"),
+                               encodings)
+    if encoding is None:
+        return response
+
+    if response.streaming:
+        if response.is_async:
+            return response
+        response.streaming_content = compress_stream(
+            response.streaming_content, encoding)
+        del response["Content-Length"]
+    else:
+        key = compressed_cache_key(request, response, encoding)
+        body = cache.get(key) if key else None
+        cached = body is not None
+        cpu_seconds = 0.0
+        if not cached:
+            body, cpu_seconds = compress(response.content, encoding)
+            if len(body) >= len(response.content):
+                return response  # Not worth it
+            if key and len(body) <= getattr(
+                    settings, "COMPRESSION_CACHE_MAX_SIZE", 512 * 1024):
+                cache.set(key, body, getattr(
+                    settings, "COMPRESSION_CACHE_TTL", 300))
+        record_compression(encoding, len(response.content), len(body),
+                           cpu_seconds, cached)
+        response.content = body
+        response.headers["Content-Length"] = str(len(body))
+
+    response.headers["Content-Encoding"] = encoding
+    # The compressed body is not byte for byte the one the strong ETag
+    # named, so weaken it (like django.middleware.gzip does):
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response.headers["ETag"] = "W/" + etag
+    return response
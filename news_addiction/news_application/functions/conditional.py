@@ -0,0 +1,117 @@
+from functools import wraps
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from ..models import Article, CollectionVersion
+
+
+ARTICLES = "articles"
+
+
+def bump_collection_version(name=ARTICLES):
+    """Record a write to a collection, changing its ETag and Last-Modified.
+
+    Called by the signal handlers in the transaction of the write, so the
+    new version is only seen once the write is committed.
+    """
+    now = timezone.now()
+    updated = CollectionVersion.objects.filter(name=name).update(
+        version=F("version") + 1, changed_at=now)
+    if not updated:
+        CollectionVersion.objects.get_or_create(
+            name=name, defaults={"version": 1, "changed_at": now})
+
+
+def get_collection_version(name=ARTICLES):
+    """Return (version, changed_at) of a collection, (0, None) if it has
+    never been written to.
+    """
+    row = CollectionVersion.objects.filter(name=name).values_list(
+        "version", "changed_at").first()
+    return row or (0, None)
+
+
+def request_collection_version(request, name=ARTICLES):
+    """get_collection_version(), read once per request."""
+    versions = request.__dict__.setdefault("_collection_versions", {})
+    if name not in versions:
+        versions[name] = get_collection_version(name)
+    return versions[name]
+
+
+def must_revalidate(view):
+    """Mark the responses of a view private and to be revalidated (with
+    If-None-Match/If-Modified-Since) on every use.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    return wrapper
+
+
+def conditional_on_collection(name=ARTICLES):
+    """Decorate a view listing a collection to answer If-None-Match and
+    If-Modified-Since with a 304 before the view runs.
+
+    The validators come from the collection's CollectionVersion, so an
+    unchanged poll costs one primary key lookup. On a DRF view the ETag
+    also names the negotiated format, as the JSON and XML of a version
+    are different representations (DRF adds "Vary: Accept").
+    """
+    def etag(request, *args, **kwargs):
+        tag = f"{name}-{request_collection_version(request, name)[0]}"
+        renderer = getattr(request, "accepted_renderer", None)
+        if renderer is not None:
+            tag = f"{tag}-{renderer.format}"
+        return tag
+
+    def last_modified(request, *args, **kwargs):
+        return request_collection_version(request, name)[1]
+
+    def decorator(view):
+        @wraps(view)
+        def tagged(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            # Identifies the body for the cache of compressed bodies. The
+            # change time tells apart versions reused after a restore:
+            changed_at = last_modified(request)
+            response.collection_tag = (
+                f"{etag(request)}-"
+                f"{changed_at.timestamp() if changed_at else 0}")
+            return response
+        return must_revalidate(condition(etag, last_modified)(tagged))
+    return decorator
+
+
+def article_updated_at(request, article_id):
+    """The updated_at of an article, read once per request, or None if it
+    does not exist.
+    """
+    cache = request.__dict__.setdefault("_article_updated_at", {})
+    if article_id not in cache:
+        cache[article_id] = Article.objects.filter(pk=article_id).values_list(
+            "updated_at", flat=True).first()
+    return cache[article_id]
+
+
+def article_etag(request, article_id, *args, **kwargs):
+    updated_at = article_updated_at(request, article_id)
+    if updated_at is None:
+        return None
+    # The page greets the signed in user, so the tag is per user:
+    return (f"article-{article_id}-{updated_at.timestamp()}-"
+            f"{request.user.pk}")
+
+
+def conditional_on_article(view):
+    """Decorate a view of one article (with an article_id argument) to
+    answer If-None-Match and If-Modified-Since with a 304, using the
+    article's updated_at.
+    """
+    def last_modified(request, article_id, *args, **kwargs):
+        return article_updated_at(request, article_id)
+
+    return must_revalidate(condition(article_etag, last_modified)(view))
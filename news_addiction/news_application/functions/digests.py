@@ -0,0 +1,103 @@
+from collections import namedtuple
+from django.core.mail import EmailMessage
+from django.utils import timezone
+from ..models import DigestFrequency, DigestItem, User
+from .notifications import send_emails_in_chunks
+from .pagination import stream_rows
+
+
+# One reader's digest: their email details and the pending articles as
+# (item id, article title, author display name) tuples:
+Digest = namedtuple("Digest", ["email", "display_name", "items"])
+
+
+def build_digest_email(digest, frequency):
+    """Build the digest email listing a reader's new articles.
+
+    Returns:
+        EmailMessage: The unsent email.
+    """
+    period = "hour" if frequency == DigestFrequency.HOURLY else "day"
+    count = len(digest.items)
+    subject = (f"News Addiction! digest: {count} new "
+               f"article{'s' if count != 1 else ''}")
+    body = (f"Hi {digest.display_name},\n Here is what was published in the "
+            f"last {period} by the entities you subscribe to.\n\n")
+    for item_id, title, author_name in digest.items:
+        body += f"- {title} (by {author_name})\n"
+    body += "\nView the articles and more at News Addiction!.co.za\n"
+    return EmailMessage(subject, body, "example@domain.com", [digest.email])
+
+
+def iter_digests(frequency, until, chunk_size=500):
+    """Stream the pending digests of the readers with a frequency.
+
+    Readers who switched back to IMMEDIATE after items were queued for
+    them are included too, so their last items go out with the next
+    digest run instead of waiting forever. Items created after until are
+    left for the next window.
+
+    The readers are streamed with stream_rows(), and the items of each
+    batch of chunk_size readers are read in full before any of them are
+    sent (and deleted).
+
+    Yields:
+        Digest: One per reader with pending items.
+    """
+    readers = User.objects.filter(
+        reader_profile__digest_frequency__in=[frequency,
+                                              DigestFrequency.IMMEDIATE],
+        pk__in=DigestItem.objects.filter(
+            created_at__lte=until).values("reader_id"),
+    ).values_list("pk", "email", "display_name")
+
+    def digests_of(batch):
+        rows = DigestItem.objects.filter(
+            reader_id__in=[reader[0] for reader in batch],
+            created_at__lte=until,
+        ).order_by("reader_id", "created_at", "pk").values_list(
+            "reader_id", "pk", "article__title",
+            "article__author__display_name",
+        )
+        items = {}
+        for reader_id, *item in rows:
+            items.setdefault(reader_id, []).append(tuple(item))
+        for reader_id, email, display_name in batch:
+            if reader_id in items:
+                yield Digest(email, display_name, items[reader_id])
+
+    batch = []
+    for reader in stream_rows(readers, chunk_size):
+        batch.append(reader)
+        if len(batch) >= chunk_size:
+            yield from digests_of(batch)
+            batch = []
+    if batch:
+        yield from digests_of(batch)
+
+
+def send_digests(frequency, chunk_size=None, connection=None):
+    """Send one digest email to every reader with pending items.
+
+    The digests are sent in chunks over a single connection. The items of
+    the digests of each chunk that were sent are deleted, so a failed
+    digest is sent again on the next run.
+
+    Args:
+        frequency (str): DigestFrequency.HOURLY or DigestFrequency.DAILY.
+        chunk_size (int): Messages per chunk.
+        connection: An email backend instance, defaults to get_connection().
+
+    Returns:
+        BulkEmailReport: The timings and failures of every chunk.
+    """
+    def delete_sent_items(digests):
+        DigestItem.objects.filter(pk__in=[
+            item[0] for digest in digests for item in digest.items
+        ]).delete()
+
+    return send_emails_in_chunks(
+        iter_digests(frequency, timezone.now()),
+        lambda digest: build_digest_email(digest, frequency),
+        chunk_size=chunk_size, connection=connection,
+        on_sent=delete_sent_items)
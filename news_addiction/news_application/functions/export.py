@@ -0,0 +1,168 @@
+import csv
+import json
+from datetime import datetime, time
+from io import StringIO
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.xmlutils import SimplerXMLGenerator
+from rest_framework.renderers import BaseRenderer
+from rest_framework_xml.renderers import XMLRenderer
+from ..models import Article
+from .article_records import ARTICLE_FIELDS, ArticleRecordBuilder
+from .pagination import stream_rows
+
+
+# Every article is exported with all the fields of the API:
+EXPORT_FIELDS = list(ARTICLE_FIELDS)
+
+
+def parse_since(value):
+    """Parse the 'since' filter, an ISO 8601 date or datetime. Times
+    without a UTC offset are in TIME_ZONE.
+
+    Returns:
+        datetime: The aware datetime, or None if value is empty.
+
+    Raises:
+        ValueError: If value is not a date or datetime.
+    """
+    if not value:
+        return None
+    since = parse_datetime(value)
+    if since is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValueError(f"Invalid date or datetime: {value}")
+        since = datetime.combine(date, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_queryset(since=None, status=None):
+    """Build the query for the articles to export.
+
+    Args:
+        since (datetime): Only articles updated at or after this time.
+        status (str): Only articles with this ArticleStatus.
+
+    Returns:
+        QuerySet: The filtered articles.
+    """
+    articles = Article.objects.all()
+    if since is not None:
+        articles = articles.filter(updated_at__gte=since)
+    if status:
+        articles = articles.filter(publication_status=status)
+    return articles
+
+
+def iter_article_records(queryset, chunk_size=None):
+    """Stream the export records of a queryset from export_queryset().
+
+    Yields:
+        dict: The EXPORT_FIELDS of each article, in pk order.
+    """
+    chunk_size = chunk_size or getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+    builder = ArticleRecordBuilder()
+    for row in stream_rows(builder.rows(queryset), chunk_size):
+        yield builder.record(row)
+
+
+def ndjson_lines(records):
+    """Encode records as newline delimited JSON, one line per record."""
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+
+class LineBuffer():
+    """A file-like object for csv.writer that returns what it is given."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(records):
+    """Encode records as CSV lines, after a header line of EXPORT_FIELDS."""
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(EXPORT_FIELDS)
+    for record in records:
+        yield writer.writerow(
+            ["" if record[field] is None else record[field]
+             for field in EXPORT_FIELDS])
+
+
+def drain(buffer):
+    """Return what was written to a StringIO and empty it."""
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+class StreamingXMLRenderer(XMLRenderer):
+    """An XMLRenderer that can also write a list one item at a time.
+
+    stream() writes the same document as render(), but yields it as each
+    item is written instead of holding the whole document in memory.
+    """
+
+    def stream(self, items):
+        """Encode items as XML incrementally.
+
+        Yields:
+            str: The start of the document with the first item, then one
+                item at a time, then the end of the document.
+        """
+        buffer = StringIO()
+        xml = SimplerXMLGenerator(buffer, self.charset)
+        xml.startDocument()
+        xml.startElement(self.root_tag_name, {})
+        for item in items:
+            xml.startElement(self.item_tag_name, {})
+            self._to_xml(xml, item)
+            xml.endElement(self.item_tag_name)
+            yield drain(buffer)
+        xml.endElement(self.root_tag_name)
+        xml.endDocument()
+        yield drain(buffer)
+
+
+def xml_lines(records):
+    """Encode records as an XML document, one record at a time."""
+    return StreamingXMLRenderer().stream(records)
+
+
+# The export view streams its own response, so the renderers below only
+# render DRF's error responses (e.g. 401) in the negotiated format.
+
+class NDJSONRenderer(BaseRenderer):
+    """Negotiates ?format=ndjson for the streaming article export."""
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+class CSVRenderer(BaseRenderer):
+    """Negotiates ?format=csv for the streaming article export."""
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        writer = csv.writer(LineBuffer())
+        data = data or {}
+        return (writer.writerow(data.keys())
+                + writer.writerow(data.values())).encode()
+
+
+# Line encoder of each export format:
+EXPORT_FORMATS = {
+    "ndjson": ndjson_lines,
+    "csv": csv_lines,
+    "xml": xml_lines,
+}
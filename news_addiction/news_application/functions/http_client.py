@@ -0,0 +1,144 @@
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Server errors worth retrying; 429 is left to the callers, which defer
+# until the rate limit window resets:
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+class HostMetrics():
+    """Latency and error counts of the outbound requests to one host.
+
+    Attributes:
+        requests (int): Requests made, including failed ones.
+        errors (int): Requests that raised (timeouts, refused connections).
+        total_seconds (float): Time spent in the requests, with retries.
+        max_seconds (float): The slowest request.
+    """
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    @property
+    def mean_seconds(self):
+        return self.total_seconds / self.requests if self.requests else 0.0
+
+    def __str__(self):
+        return (f"{self.requests} requests, {self.errors} errors, "
+                f"mean {self.mean_seconds * 1000:.1f}ms, "
+                f"max {self.max_seconds * 1000:.1f}ms")
+
+    def record(self, seconds, error):
+        self.requests += 1
+        self.errors += error
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def get_http_metrics():
+    """Return a snapshot of the outbound request metrics of this process.
+
+    Returns:
+        dict: HostMetrics by host name.
+    """
+    with _metrics_lock:
+        snapshot = {}
+        for host, metrics in _metrics.items():
+            copy = HostMetrics()
+            copy.__dict__.update(metrics.__dict__)
+            snapshot[host] = copy
+        return snapshot
+
+
+def reset_http_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+class OutboundHTTPAdapter(HTTPAdapter):
+    """An HTTPAdapter that applies default timeouts and records the
+    latency of every request by host.
+
+    Args:
+        timeout (tuple): (connect, read) seconds, used when a request does
+            not set its own timeout.
+    """
+    def __init__(self, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        host = urlsplit(request.url).netloc
+        start = time.perf_counter()
+        error = False
+        try:
+            return super().send(request, **kwargs)
+        except Exception:
+            error = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            with _metrics_lock:
+                _metrics.setdefault(host, HostMetrics()).record(seconds,
+                                                                error)
+
+
+def build_adapter():
+    """Build an OutboundHTTPAdapter from the OUTBOUND_HTTP_* settings.
+
+    Idempotent requests are retried on connection errors, read errors and
+    RETRY_STATUSES. Other requests, such as posting a tweet, are only
+    retried when the connection could not be made, so nothing is sent
+    twice. Retries back off exponentially with random jitter.
+    """
+    retries = Retry(
+        total=getattr(settings, "OUTBOUND_HTTP_RETRIES", 3),
+        backoff_factor=getattr(settings, "OUTBOUND_HTTP_BACKOFF_FACTOR", 0.5),
+        backoff_jitter=getattr(settings, "OUTBOUND_HTTP_BACKOFF_JITTER", 0.5),
+        backoff_max=getattr(settings, "OUTBOUND_HTTP_BACKOFF_MAX", 10),
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    pool_size = getattr(settings, "OUTBOUND_HTTP_POOL_SIZE", 10)
+    return OutboundHTTPAdapter(
+        timeout=(getattr(settings, "OUTBOUND_HTTP_CONNECT_TIMEOUT", 3.05),
+                 getattr(settings, "OUTBOUND_HTTP_READ_TIMEOUT", 10)),
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retries,
+    )
+
+
+def configure_session(session):
+    """Mount the outbound adapter on a requests session, e.g. an
+    OAuth1Session, so it keeps connections alive in a sized pool and
+    gets the timeouts, retries and metrics.
+
+    Returns:
+        requests.Session: The same session.
+    """
+    adapter = build_adapter()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def new_session():
+    """Return a requests session configured for outbound integrations."""
+    return configure_session(requests.Session())
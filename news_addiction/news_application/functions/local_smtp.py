@@ -0,0 +1,94 @@
+import socketserver
+import threading
+import time
+
+
+class SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Speaks just enough SMTP to accept messages and discard them."""
+    disable_nagle_algorithm = True
+
+    def reply(self, *lines):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        # Multi-line replies go out in a single write:
+        self.wfile.write("".join(f"{line}\r\n" for line in lines).encode())
+
+    def handle(self):
+        self.reply("220 localhost SMTP sink ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors="replace").strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250-localhost", "250 8BITMIME")
+            elif command.startswith("DATA"):
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                # Read the message up to the terminating "." line:
+                for data_line in self.rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                self.server.count_message()
+                self.reply("250 OK: queued")
+            elif command.startswith("QUIT"):
+                self.reply("221 Bye")
+                return
+            else:
+                # HELO, MAIL FROM, RCPT TO, RSET, NOOP...
+                self.reply("250 OK")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """A local SMTP stand-in for benchmarks and tests.
+
+    Accepts every message without delivering it and counts the messages
+    and connections it receives. Use it as a context manager:
+
+        with LocalSMTPServer() as server:
+            connection = get_connection(
+                "django.core.mail.backends.smtp.EmailBackend",
+                host=server.host, port=server.port)
+
+    Args:
+        host (str): Interface to listen on.
+        port (int): Port to listen on, 0 picks a free port.
+        latency (float): Seconds to wait before each reply, to simulate the
+            round trip to a remote mail server.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0):
+        super().__init__((host, port), SMTPSinkHandler)
+        self.latency = latency
+        self.host, self.port = self.server_address[:2]
+        self.messages = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def count_message(self):
+        with self._lock:
+            self.messages += 1
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        super().process_request(request, client_address)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
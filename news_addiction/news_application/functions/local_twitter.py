@@ -0,0 +1,199 @@
+import json
+import threading
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+MEDIA_UPLOAD_PATH = "/1.1/media/upload.json"
+TWEET_PATH = "/2/tweets"
+
+
+def parse_form(content_type, body):
+    """Parse an urlencoded or multipart request body into a dict."""
+    if content_type.startswith("multipart/form-data"):
+        message = BytesParser(policy=policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        fields = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            payload = part.get_payload(decode=True)
+            if part.get_filename() is None:
+                payload = payload.decode()
+            fields[name] = payload
+        return fields
+    return dict(parse_qsl(body.decode()))
+
+
+class TwitterStubHandler(BaseHTTPRequestHandler):
+    """Implements the media upload and tweet endpoints used by Tweet."""
+
+    def log_message(self, format, *args):
+        pass  # Keep test and benchmark output clean
+
+    def send_json(self, status, data=None, headers=None):
+        body = json.dumps(data).encode() if data is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        self.handle_request(url.path, params)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self.read_body()
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/json"):
+            params = json.loads(body or b"{}")
+        else:
+            params = parse_form(content_type, body)
+        self.handle_request(url.path, params)
+
+    def handle_request(self, path, params):
+        server = self.server
+        server.record(self.command, path, params)
+        queued = server.pop_queued_response()
+        if queued is not None:
+            self.send_json(*queued)
+        elif path == MEDIA_UPLOAD_PATH:
+            self.send_json(*server.media_upload(params))
+        elif path == TWEET_PATH:
+            self.send_json(*server.create_tweet(params))
+        else:
+            self.send_json(404, {"errors": [{"message": "Not found"}]})
+
+
+class LocalTwitterServer(ThreadingHTTPServer):
+    """A local stand-in for the Twitter API, for tests and benchmarks.
+
+    Supports the chunked media upload (INIT, APPEND, FINALIZE, STATUS) and
+    tweet creation endpoints. Point Tweet at it with the
+    TWITTER_MEDIA_UPLOAD_URL and TWITTER_TWEET_URL settings:
+
+        with LocalTwitterServer() as server:
+            with override_settings(
+                    TWITTER_MEDIA_UPLOAD_URL=server.media_upload_url,
+                    TWITTER_TWEET_URL=server.tweet_url):
+                ...
+
+    Attributes:
+        requests (list): (method, path, params) of every request.
+        media (dict): Uploads by media ID, with the appended segments.
+        tweets (list): The bodies of the created tweets.
+    """
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        super().__init__((host, port), TwitterStubHandler)
+        self.host, self.port = self.server_address[:2]
+        self.requests = []
+        self.media = {}
+        self.tweets = []
+        self._queued_responses = []
+        self._next_media_id = 1000
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def media_upload_url(self):
+        return self.url + MEDIA_UPLOAD_PATH
+
+    @property
+    def tweet_url(self):
+        return self.url + TWEET_PATH
+
+    def record(self, method, path, params):
+        with self._lock:
+            self.requests.append((method, path, params))
+
+    def queue_response(self, status, data=None, headers=None):
+        """Answer the next request with this response instead, e.g. a 429
+        with rate limit headers."""
+        with self._lock:
+            self._queued_responses.append((status, data, headers))
+
+    def pop_queued_response(self):
+        with self._lock:
+            if self._queued_responses:
+                return self._queued_responses.pop(0)
+        return None
+
+    def commands(self):
+        """Return the media upload commands received, in order."""
+        return [params.get("command") for method, path, params
+                in self.requests if path == MEDIA_UPLOAD_PATH]
+
+    def media_upload(self, params):
+        command = params.get("command")
+        with self._lock:
+            if command == "INIT":
+                media_id = str(self._next_media_id)
+                self._next_media_id += 1
+                self.media[media_id] = {
+                    "total_bytes": int(params["total_bytes"]),
+                    "media_type": params.get("media_type"),
+                    "segments": {},
+                    "finalized": False,
+                }
+                return 202, {"media_id_string": media_id,
+                             "expires_after_secs": 86400}
+            upload = self.media.get(params.get("media_id"))
+            if upload is None:
+                return 400, {"errors": [{"message": "Unknown media_id"}]}
+            if command == "APPEND":
+                upload["segments"][int(params["segment_index"])] = \
+                    params["media"]
+                return 204, None
+            if command in ("FINALIZE", "STATUS"):
+                if command == "FINALIZE":
+                    if len(self.uploaded_bytes(params["media_id"])) != \
+                            upload["total_bytes"]:
+                        return 400, {"errors": [{"message": "Size mismatch"}]}
+                    upload["finalized"] = True
+                return 200, {"media_id_string": params["media_id"],
+                             "size": upload["total_bytes"],
+                             "expires_after_secs": 86400}
+        return 400, {"errors": [{"message": "Unknown command"}]}
+
+    def uploaded_bytes(self, media_id):
+        """Return the bytes of an upload, joined in segment order."""
+        segments = self.media[media_id]["segments"]
+        return b"".join(segments[index] for index in sorted(segments))
+
+    def create_tweet(self, params):
+        with self._lock:
+            self.tweets.append(params)
+            tweet_id = str(len(self.tweets))
+        return 201, {"data": {"id": tweet_id, "text": params.get("text")}}
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
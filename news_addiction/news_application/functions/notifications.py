@@ -0,0 +1,450 @@
+import os
+import socket
+import time
+from collections import namedtuple
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..models import (NotificationJob, NotificationKind, NotificationStatus,
+                      NotificationDelivery, JournalistProfile, Publisher,
+                      User, DigestFrequency, DigestItem)
+from .pagination import stream_rows
+from .rendering import get_article_notification
+from .syndication import get_syndication_backend, SyndicationRateLimited
+
+
+class DeliveryDeferred(Exception):
+    """Raised by a delivery handler to retry the job at a given time
+    without counting the attempt, e.g. while rate limited.
+
+    Attributes:
+        retry_at (datetime): When the job becomes due again.
+    """
+    def __init__(self, retry_at, reason=""):
+        self.retry_at = retry_at
+        super().__init__(reason or f"Deferred until {retry_at.isoformat()}")
+
+
+def get_worker_id():
+    """Return an identifier for the current worker process."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_publish_notifications(article):
+    """Write the notification jobs for a published article to the outbox.
+
+    Called from the post_save signal, inside the transaction that
+    Article.save() opens, so the jobs are committed (or rolled back)
+    together with the publication. Jobs that were already queued for the
+    article are left as they are.
+    """
+    NotificationJob.objects.bulk_create([
+        NotificationJob(article=article, kind=kind)
+        for kind in (NotificationKind.EMAIL_SUBSCRIBERS,
+                     NotificationKind.TWEET)
+    ], ignore_conflicts=True)
+
+
+def retry_delay(attempts):
+    """Return the backoff before the next attempt after a failed one.
+
+    The delay doubles with every attempt, starting at
+    NOTIFICATION_RETRY_BASE_SECONDS and capped at
+    NOTIFICATION_RETRY_MAX_SECONDS.
+    """
+    base = getattr(settings, "NOTIFICATION_RETRY_BASE_SECONDS", 30)
+    maximum = getattr(settings, "NOTIFICATION_RETRY_MAX_SECONDS", 3600)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), maximum))
+
+
+def claim_jobs(batch_size, worker_id=None, kinds=None, queryset=None):
+    """Claim a batch of due jobs for this worker.
+
+    Pending jobs whose available_at has passed are claimed, as are jobs
+    left in PROCESSING by a worker that stopped before finishing them (after
+    NOTIFICATION_LOCK_TIMEOUT_SECONDS). Rows are locked with
+    SELECT ... FOR UPDATE SKIP LOCKED where supported, so several workers
+    can run side by side without claiming the same job.
+
+    Args:
+        batch_size (int): Maximum number of jobs to claim.
+        worker_id (str): Recorded as locked_by on the claimed jobs.
+        kinds (list): Only claim jobs of these NotificationKinds (all
+            kinds if not given), e.g. to run separate email and
+            syndication workers.
+        queryset (QuerySet): The NotificationJobs to claim from, all of
+            them if not given.
+
+    Returns:
+        list: The claimed NotificationJob objects.
+    """
+    worker_id = worker_id or get_worker_id()
+    now = timezone.now()
+    lock_timeout = timedelta(seconds=getattr(
+        settings, "NOTIFICATION_LOCK_TIMEOUT_SECONDS", 600))
+
+    due = (Q(status=NotificationStatus.PENDING, available_at__lte=now)
+           | Q(status=NotificationStatus.PROCESSING,
+               locked_at__lt=now - lock_timeout))
+    if kinds:
+        due &= Q(kind__in=kinds)
+
+    if queryset is None:
+        queryset = NotificationJob.objects.all()
+
+    with transaction.atomic():
+        job_ids = list(
+            queryset.select_for_update(skip_locked=True)
+            .filter(due).order_by("available_at", "pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        NotificationJob.objects.filter(pk__in=job_ids).update(
+            status=NotificationStatus.PROCESSING,
+            locked_at=now,
+            locked_by=worker_id,
+        )
+    return list(NotificationJob.objects.filter(pk__in=job_ids)
+                .select_related("article__author", "article__publisher")
+                .order_by("available_at", "pk"))
+
+
+def build_new_article_email(article, user):
+    """Build the new article notification email for a subscriber.
+
+    Returns:
+        EmailMultiAlternatives: The unsent email.
+    """
+    return get_article_notification(article).email_for(user)
+
+
+class EmailChunkResult():
+    """Outcome of sending one chunk of notification emails.
+
+    Attributes:
+        index (int): Position of the chunk, starting at 0.
+        size (int): Number of messages in the chunk.
+        sent (int): Number of messages the backend accepted.
+        seconds (float): Time taken to send the chunk.
+        error (str): The first error of the chunk, or "" if every
+            message was sent.
+    """
+    def __init__(self, index, size, sent, seconds, error=""):
+        self.index = index
+        self.size = size
+        self.sent = sent
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def failed(self):
+        return self.size - self.sent
+
+
+class BulkEmailReport():
+    """Per-chunk results of send_bulk_notification_emails."""
+    def __init__(self):
+        self.chunks = []
+
+    @property
+    def sent(self):
+        return sum(chunk.sent for chunk in self.chunks)
+
+    @property
+    def failed(self):
+        return sum(chunk.failed for chunk in self.chunks)
+
+    @property
+    def seconds(self):
+        return sum(chunk.seconds for chunk in self.chunks)
+
+    @property
+    def errors(self):
+        return [chunk.error for chunk in self.chunks if chunk.error]
+
+
+def send_emails_in_chunks(items, build_message, chunk_size=None,
+                          connection=None, on_sent=None):
+    """Build and send one email per item over a single connection.
+
+    The messages are sent in chunks through a single backend connection
+    (one SMTP session, one file with the filebased backend) instead of
+    opening a connection per recipient. Each message of a chunk is handed
+    to send_messages() on its own, so a failure is attributed to the
+    message that caused it: messages the server already accepted are not
+    counted as failed (and sent again later), and a fail_silently backend
+    that drops a message does not mark it delivered. The connection is
+    reopened after an error. Only one chunk of messages is held in memory
+    at a time.
+
+    Args:
+        items (iterable): One item per email, e.g. the subscribers.
+        build_message (callable): Returns the EmailMessage for an item.
+        chunk_size (int): Messages per chunk, defaults to
+            NOTIFICATION_EMAIL_CHUNK_SIZE.
+        connection: An email backend instance, defaults to get_connection().
+        on_sent (callable): Called after every chunk with the items whose
+            message the backend accepted, if there are any.
+
+    Returns:
+        BulkEmailReport: The timings and failures of every chunk.
+    """
+    chunk_size = chunk_size or getattr(
+        settings, "NOTIFICATION_EMAIL_CHUNK_SIZE", 100)
+    connection = connection or get_connection()
+    report = BulkEmailReport()
+
+    def send_chunk(chunk):
+        delivered = []
+        error = ""
+        start = time.perf_counter()
+        for item in chunk:
+            try:
+                # Opens the connection for the first message (or after a
+                # failed one) and is a no-op while it is open:
+                connection.open()
+                sent = connection.send_messages([build_message(item)])
+            except Exception as e:
+                sent = 0
+                error = error or f"{e.__class__.__name__}: {e}"
+                # Send the next message on a fresh connection:
+                connection.close()
+            else:
+                if not sent:
+                    error = error or "The email backend did not send it"
+            if sent:
+                delivered.append(item)
+        report.chunks.append(EmailChunkResult(
+            len(report.chunks), len(chunk), len(delivered),
+            time.perf_counter() - start, error))
+        if delivered and on_sent is not None:
+            on_sent(delivered)
+
+    try:
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                send_chunk(chunk)
+                chunk = []
+        if chunk:
+            send_chunk(chunk)
+    finally:
+        connection.close()
+    return report
+
+
+def send_bulk_notification_emails(article, subscribers, chunk_size=None,
+                                  connection=None, on_sent=None):
+    """Send the new article email to many subscribers over one connection.
+
+    Args:
+        article (Article): The published article.
+        subscribers (iterable): The subscribers to notify, User objects or
+            Recipients.
+        chunk_size (int): Messages per chunk, defaults to
+            NOTIFICATION_EMAIL_CHUNK_SIZE.
+        connection: An email backend instance, defaults to get_connection().
+        on_sent (callable): Called after every chunk with the subscribers
+            whose email was sent.
+
+    Returns:
+        BulkEmailReport: The timings and failures of every chunk.
+    """
+    # Render the article once, only the greeting differs per subscriber:
+    rendered = get_article_notification(article)
+    return send_emails_in_chunks(
+        subscribers, rendered.email_for,
+        chunk_size=chunk_size, connection=connection, on_sent=on_sent)
+
+
+# The fields of a subscriber needed to notify them:
+Recipient = namedtuple("Recipient",
+                       ["id", "email", "display_name", "digest_frequency"])
+
+
+def subscriber_recipients(article, exclude_notified=True):
+    """Build the query for the subscribers to notify about an article.
+
+    The subscribers of the author and of the publisher (if any) are
+    selected with semi-joins on the subscription tables, so a reader
+    subscribed to both appears once without a DISTINCT.
+
+    Args:
+        article (Article): The published article.
+        exclude_notified (bool): Leave out the subscribers already in the
+            NotificationDelivery ledger for the article.
+
+    Returns:
+        QuerySet: (id, email, display_name, digest_frequency) rows ordered
+        by id.
+    """
+    author_subscriptions = JournalistProfile.subscribers.through.objects \
+        .filter(journalistprofile__user_id=article.author_id) \
+        .values("user_id")
+    subscribed = Q(pk__in=author_subscriptions)
+    if article.publisher_id is not None:
+        publisher_subscriptions = Publisher.subscribers.through.objects \
+            .filter(publisher_id=article.publisher_id).values("user_id")
+        subscribed |= Q(pk__in=publisher_subscriptions)
+
+    recipients = User.objects.filter(subscribed)
+    if exclude_notified:
+        recipients = recipients.exclude(
+            pk__in=NotificationDelivery.objects.filter(
+                article_id=article.pk).values("recipient_id"))
+    return recipients.order_by("pk").values_list(
+        "pk", "email", "display_name", "reader_profile__digest_frequency")
+
+
+def iter_subscriber_recipients(article, chunk_size=None,
+                               exclude_notified=True, connection=None):
+    """Stream the subscribers to notify about an article as Recipients.
+
+    The rows are streamed with stream_rows(), so memory use does not grow
+    with the number of subscribers.
+
+    Args:
+        article (Article): The published article.
+        chunk_size (int): Rows fetched at a time, defaults to
+            NOTIFICATION_FANOUT_CHUNK_SIZE.
+        exclude_notified (bool): Leave out the subscribers already in the
+            NotificationDelivery ledger for the article.
+
+    Yields:
+        Recipient: (id, email, display_name, digest_frequency) of each
+        subscriber.
+    """
+    chunk_size = chunk_size or getattr(
+        settings, "NOTIFICATION_FANOUT_CHUNK_SIZE", 2000)
+    recipients = subscriber_recipients(article, exclude_notified)
+    for row in stream_rows(recipients, chunk_size, connection):
+        yield Recipient(*row)
+
+
+def deliver_subscriber_emails(article):
+    """Notify every subscriber of the article's author and publisher.
+
+    Subscribers who want immediate notifications are emailed. The article
+    is added to the pending DigestItems of subscribers who receive hourly
+    or daily digests, which send_notification_digests rolls up later.
+
+    Recipients are recorded in the NotificationDelivery ledger as each
+    chunk is sent or queued. Subscribers already in the ledger are
+    skipped, so a retried or interrupted fan-out resumes where it stopped.
+    """
+    def record_deliveries(recipients):
+        NotificationDelivery.objects.bulk_create([
+            NotificationDelivery(article=article, recipient_id=recipient.id)
+            for recipient in recipients
+        ], ignore_conflicts=True)
+
+    def queue_digest_items(recipients):
+        with transaction.atomic():
+            DigestItem.objects.bulk_create([
+                DigestItem(article=article, reader_id=recipient.id)
+                for recipient in recipients
+            ], ignore_conflicts=True)
+            record_deliveries(recipients)
+
+    chunk_size = getattr(settings, "NOTIFICATION_EMAIL_CHUNK_SIZE", 100)
+    digest_frequencies = (DigestFrequency.HOURLY, DigestFrequency.DAILY)
+
+    def immediate_recipients():
+        digest_recipients = []
+        for recipient in iter_subscriber_recipients(article):
+            if recipient.digest_frequency not in digest_frequencies:
+                yield recipient
+                continue
+            digest_recipients.append(recipient)
+            if len(digest_recipients) >= chunk_size:
+                queue_digest_items(digest_recipients)
+                digest_recipients = []
+        if digest_recipients:
+            queue_digest_items(digest_recipients)
+
+    # Stream the recipients and send the emails in chunks over a single
+    # connection:
+    report = send_bulk_notification_emails(
+        article, immediate_recipients(), chunk_size=chunk_size,
+        on_sent=record_deliveries)
+    if report.failed:
+        raise RuntimeError(
+            f"{report.failed} of {report.sent + report.failed} emails "
+            f"failed: {'; '.join(report.errors)}")
+
+
+def syndicate_article(article):
+    """Post the article through the configured syndication backend."""
+    try:
+        get_syndication_backend().post_article(article)
+    except SyndicationRateLimited as e:
+        # Try again once the rate limit window has reset:
+        raise DeliveryDeferred(e.reset_at, str(e)) from e
+
+
+DELIVERY_HANDLERS = {
+    NotificationKind.EMAIL_SUBSCRIBERS: deliver_subscriber_emails,
+    NotificationKind.TWEET: syndicate_article,
+}
+
+
+def process_job(job):
+    """Deliver a claimed job and record the outcome.
+
+    A failed delivery is retried with exponential backoff until
+    NOTIFICATION_MAX_ATTEMPTS is reached, after which the job is FAILED.
+    A deferred delivery is retried at the requested time and does not
+    count as an attempt.
+
+    Returns:
+        bool: True if the job was delivered.
+    """
+    max_attempts = getattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 5)
+    job.attempts += 1
+    try:
+        DELIVERY_HANDLERS[job.kind](job.article)
+    except DeliveryDeferred as e:
+        job.attempts -= 1
+        job.last_error = str(e)
+        job.status = NotificationStatus.PENDING
+        job.available_at = e.retry_at
+        delivered = False
+    except Exception as e:
+        job.last_error = f"{e.__class__.__name__}: {e}"
+        if job.attempts >= max_attempts:
+            job.status = NotificationStatus.FAILED
+        else:
+            job.status = NotificationStatus.PENDING
+            job.available_at = timezone.now() + retry_delay(job.attempts)
+        delivered = False
+    else:
+        job.status = NotificationStatus.DELIVERED
+        job.delivered_at = timezone.now()
+        job.last_error = ""
+        delivered = True
+
+    job.locked_at = None
+    job.locked_by = ""
+    job.save(update_fields=["attempts", "status", "available_at",
+                            "delivered_at", "last_error", "locked_at",
+                            "locked_by"])
+    return delivered
+
+
+def process_batch(batch_size=100, worker_id=None, kinds=None):
+    """Claim and process one batch of jobs.
+
+    Returns:
+        tuple: (number of jobs delivered, number of failed attempts)
+    """
+    delivered_count = 0
+    failed_count = 0
+    for job in claim_jobs(batch_size, worker_id, kinds):
+        if process_job(job):
+            delivered_count += 1
+        else:
+            failed_count += 1
+    return delivered_count, failed_count
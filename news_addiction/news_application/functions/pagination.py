@@ -0,0 +1,163 @@
+from datetime import datetime
+from django.core import signing
+from django.db import connection as default_connection
+from django.db.models import Q
+
+
+CURSOR_SALT = "news_application.pagination.cursor"
+
+
+class KeysetPage():
+    """A single page of results returned by the KeysetPaginator.
+
+    Attributes:
+        object_list (list): The objects on this page.
+        next_cursor (str): Opaque token for the following page, or None if
+            this is the last page.
+    """
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator():
+    """Cursor (keyset) pagination over a queryset.
+
+    Rows are ordered by (ordering_field, pk) and each page continues from the
+    last row of the previous page with a WHERE clause instead of an OFFSET,
+    so fetching page 500 costs the same as fetching page 1.
+
+    NULL values of ordering_field are treated as the lowest values, which
+    matches how MySQL and SQLite sort them.
+
+    Args:
+        queryset (QuerySet): The (filtered) queryset to paginate.
+        ordering_field (str): Field to order by, e.g. "publication_date".
+            Use "pk" to paginate on the primary key alone.
+        page_size (int): Number of rows per page.
+        descending (bool): Newest/highest values first if True.
+    """
+    def __init__(self, queryset, ordering_field, page_size, descending=True):
+        self.queryset = queryset
+        self.ordering_field = ordering_field
+        self.page_size = page_size
+        self.descending = descending
+
+    def get_ordering(self):
+        prefix = "-" if self.descending else ""
+        if self.ordering_field == "pk":
+            return [f"{prefix}pk"]
+        return [f"{prefix}{self.ordering_field}", f"{prefix}pk"]
+
+    def encode_cursor(self, obj):
+        """Build the opaque cursor token pointing just after obj.
+
+        obj can also be a values_list() row selecting the pk first, when
+        paginating on "pk".
+        """
+        if isinstance(obj, tuple):
+            return signing.dumps({"v": None, "pk": obj[0]}, salt=CURSOR_SALT)
+        value = None
+        if self.ordering_field != "pk":
+            value = getattr(obj, self.ordering_field)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+        return signing.dumps({"v": value, "pk": obj.pk}, salt=CURSOR_SALT)
+
+    @staticmethod
+    def decode_cursor(token):
+        """Decode a cursor token.
+
+        Returns:
+            dict: The cursor position, or None if the token is missing,
+            tampered with or otherwise invalid.
+        """
+        if not token:
+            return None
+        try:
+            cursor = signing.loads(token, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            return None
+        if not isinstance(cursor, dict) or "pk" not in cursor:
+            return None
+        return cursor
+
+    def cursor_q(self, cursor):
+        """Build the Q() selecting every row that sorts after cursor."""
+        after = "lt" if self.descending else "gt"
+        pk_after = Q(**{f"pk__{after}": cursor["pk"]})
+        if self.ordering_field == "pk":
+            return pk_after
+
+        field = self.ordering_field
+        value = cursor.get("v")
+        is_null = Q(**{f"{field}__isnull": True})
+        if value is None:
+            if self.descending:
+                # NULLs come last, so only later NULL rows remain:
+                return is_null & pk_after
+            return (is_null & pk_after) | ~is_null
+
+        later = (Q(**{f"{field}__{after}": value})
+                 | (Q(**{field: value}) & pk_after))
+        if self.descending:
+            return later | is_null
+        return later
+
+    def page(self, token=None):
+        """Return the page starting after the given cursor token.
+
+        An invalid token is treated as a request for the first page.
+        """
+        queryset = self.queryset.order_by(*self.get_ordering())
+        cursor = self.decode_cursor(token)
+        if cursor is not None:
+            queryset = queryset.filter(self.cursor_q(cursor))
+
+        # Fetch one extra row to find out if there is a next page:
+        rows = list(queryset[:self.page_size + 1])
+        next_cursor = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            next_cursor = self.encode_cursor(rows[-1])
+        return KeysetPage(rows, next_cursor)
+
+
+def stream_rows(queryset, chunk_size, connection=None):
+    """Stream the rows of a values_list() queryset with constant memory.
+
+    The rows are read with a single query and iterator(chunk_size). MySQL's
+    driver buffers a whole result set on the client, so on MySQL the rows
+    are read in keyset batches of chunk_size (one query per batch)
+    instead. The queryset must select the primary key first and must not
+    be sliced; it is ordered by pk.
+
+    Yields:
+        tuple: Each row.
+    """
+    connection = connection or default_connection
+    queryset = queryset.order_by("pk")
+    if connection.vendor != "mysql":
+        yield from queryset.iterator(chunk_size=chunk_size)
+        return
+
+    last_pk = None
+    while True:
+        batch = queryset
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        rows = list(batch[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
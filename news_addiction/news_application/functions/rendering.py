@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.utils.html import escape, linebreaks
+
+
+DOMAIN_EMAIL = "example@domain.com"
+
+
+class RenderedNotification():
+    """The new article notifications of an article, rendered once.
+
+    Everything but the greeting is the same for every subscriber, so the
+    subject, bodies and post text are built once per article and only the
+    greeting is added per recipient. Instances are picklable, so they can
+    be shared between the web process and the workers through the
+    database cache (see CACHES).
+
+    Attributes:
+        subject (str): The email subject.
+        body (str): The plain text email body, after the greeting.
+        html_body (str): The HTML email body after the greeting, or None
+            if NOTIFICATION_EMAIL_HTML is off.
+        post_text (str): The text posted to social networks.
+    """
+    def __init__(self, subject, body, html_body, post_text):
+        self.subject = subject
+        self.body = body
+        self.html_body = html_body
+        self.post_text = post_text
+
+    def email_for(self, recipient):
+        """Build the email to one subscriber.
+
+        Args:
+            recipient: A User or Recipient with email and display_name.
+
+        Returns:
+            EmailMultiAlternatives: The unsent email.
+        """
+        email = EmailMultiAlternatives(
+            self.subject, f"Hi {recipient.display_name},\n" + self.body,
+            DOMAIN_EMAIL, [recipient.email])
+        if self.html_body is not None:
+            greeting = f"<p>Hi {escape(recipient.display_name)},</p>\n"
+            email.attach_alternative(greeting + self.html_body, "text/html")
+        return email
+
+
+def render_article_notification(article):
+    """Render the notifications of a published article.
+
+    Returns:
+        RenderedNotification: The rendered parts.
+    """
+    title = article.title
+    author_name = article.author.display_name
+    subject = f"New Article Published on News Addiction!: {title}"
+
+    body = (" A new article has been published from an entity you "
+            "subscribe to.\n\n")
+    body += f"Title: {title}\n"
+    body += f"Author: {author_name}\n"
+    body += f"Content: \n{article.content}\n\n"
+    body += "View the article and more at News Addiction!.co.za\n"
+
+    html_body = None
+    if getattr(settings, "NOTIFICATION_EMAIL_HTML", False):
+        html_body = ("<p>A new article has been published from an entity "
+                     "you subscribe to.</p>\n")
+        html_body += f"<h2>{escape(title)}</h2>\n"
+        html_body += f"<p>By {escape(author_name)}</p>\n"
+        html_body += linebreaks(article.content, autoescape=True) + "\n"
+        html_body += ("<p>View the article and more at "
+                      "News Addiction!.co.za</p>\n")
+
+    post_text = "New Article Published on News Addiction!:\n"
+    post_text += f"Title: {title}\n"
+    post_text += f"Author: {author_name}\n"
+    post_text += f"Content: \n{article.content}\n\n"
+    post_text += "View the article and more at News Addiction!.co.za"
+
+    return RenderedNotification(subject, body, html_body, post_text)
+
+
+def get_article_notification(article):
+    """Return the rendered notifications of an article from the cache,
+    rendering them on a miss.
+
+    The default cache is shared by every process (see CACHES), so each
+    article is rendered once however many workers send its emails. The
+    cache key includes updated_at, so an edit to the article is rendered
+    again. Unsaved articles are rendered without caching.
+    """
+    if article.pk is None or article.updated_at is None:
+        return render_article_notification(article)
+    key = (f"article_notification:{article.pk}:"
+           f"{article.updated_at.timestamp()}")
+    rendered = cache.get(key)
+    if rendered is None:
+        rendered = render_article_notification(article)
+        cache.set(key, rendered,
+                  getattr(settings, "NOTIFICATION_RENDER_CACHE_TTL", 3600))
+    return rendered
@@ -0,0 +1,264 @@
+import re
+from django.db import connection as default_connection
+from django.db.models import Q
+
+
+# Table holding one search document per article:
+SEARCH_TABLE = "news_application_article_search"
+
+# Query words; everything else, including FULLTEXT/FTS5 operators, is dropped:
+QUERY_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def search_terms(query):
+    """Split a search box query into plain word terms.
+
+    Args:
+        query (str): The raw search query.
+
+    Returns:
+        list: The words in the query, without any search operators.
+    """
+    return QUERY_TERM_RE.findall(query or "")
+
+
+def build_document(article):
+    """Build the searchable fields of an article.
+
+    Returns:
+        tuple: (title, content, author_name, publisher_name)
+    """
+    publisher_name = article.get_publisher_name()
+    if publisher_name == "No Publisher":
+        publisher_name = ""
+    return (article.title, article.content, article.author.display_name,
+            publisher_name)
+
+
+class SearchBackend():
+    """Interface for the article full-text search index.
+
+    Each backend stores one document per published article (title,
+    content, author display name and publisher name) and returns article
+    IDs ranked by relevance.
+    """
+    vendor = None
+
+    def __init__(self, connection=None):
+        self.connection = connection or default_connection
+
+    def create_index(self):
+        """Create the index table (called from the migrations)."""
+        raise NotImplementedError
+
+    def drop_index(self):
+        """Drop the index table (called from the migrations)."""
+        raise NotImplementedError
+
+    def index_article(self, article):
+        """Add or replace the search document of an article."""
+        raise NotImplementedError
+
+    def remove_article(self, article_id):
+        """Remove the search document of an article."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove every search document."""
+        raise NotImplementedError
+
+    def search(self, query, limit=500):
+        """Search the index.
+
+        Args:
+            query (str): The search box query.
+            limit (int): Maximum number of results.
+
+        Returns:
+            list: Matching article IDs, most relevant first.
+        """
+        raise NotImplementedError
+
+    def rebuild(self, articles, batch_size=500):
+        """Rebuild the whole index from an Article queryset.
+
+        Returns:
+            int: Number of articles indexed.
+        """
+        self.clear()
+        count = 0
+        articles = articles.with_publishers().order_by("pk")
+        for article in articles.iterator(chunk_size=batch_size):
+            self.index_article(article)
+            count += 1
+        return count
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """Full-text search using an SQLite FTS5 virtual table, ranked with
+    bm25(). The FTS rowid is the article ID.
+    """
+    vendor = "sqlite"
+
+    # bm25() column weights for title, content, author and publisher:
+    weights = (10.0, 1.0, 5.0, 5.0)
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+                "USING fts5(title, content, author_name, publisher_name, "
+                "tokenize='unicode61')"
+            )
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def index_article(self, article):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+                           [article.pk])
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, content, "
+                "author_name, publisher_name) VALUES (%s, %s, %s, %s, %s)",
+                [article.pk, *build_document(article)]
+            )
+
+    def remove_article(self, article_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+                           [article_id])
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    def search(self, query, limit=500):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        # Every term must match, as a prefix ("break" matches "breaking"):
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(weight) for weight in self.weights)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {SEARCH_TABLE} "
+                f"WHERE {SEARCH_TABLE} MATCH %s "
+                f"ORDER BY bm25({SEARCH_TABLE}, {weights}) LIMIT %s",
+                [match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class MySQLSearchBackend(SearchBackend):
+    """Full-text search using a MySQL InnoDB FULLTEXT index, ranked with
+    MATCH() ... AGAINST().
+    """
+    vendor = "mysql"
+
+    columns = "title, content, author_name, publisher_name"
+
+    def create_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+                "article_id BIGINT NOT NULL PRIMARY KEY, "
+                "title VARCHAR(255) NOT NULL, "
+                "content LONGTEXT NOT NULL, "
+                "author_name VARCHAR(150) NOT NULL, "
+                "publisher_name VARCHAR(255) NOT NULL, "
+                f"FULLTEXT KEY article_search_fulltext ({self.columns})"
+                ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+            )
+
+    def drop_index(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+    def index_article(self, article):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"REPLACE INTO {SEARCH_TABLE} (article_id, title, content, "
+                "author_name, publisher_name) VALUES (%s, %s, %s, %s, %s)",
+                [article.pk, *build_document(article)]
+            )
+
+    def remove_article(self, article_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE article_id = %s",
+                [article_id]
+            )
+
+    def clear(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    def search(self, query, limit=500):
+        terms = search_terms(query)
+        if not terms:
+            return []
+        # Boolean mode: every term is required and matched as a prefix.
+        match = " ".join(f"+{term}*" for term in terms)
+        against = f"MATCH ({self.columns}) AGAINST (%s IN BOOLEAN MODE)"
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT article_id, {against} AS score "
+                f"FROM {SEARCH_TABLE} WHERE {against} "
+                "ORDER BY score DESC LIMIT %s",
+                [match, match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class BasicSearchBackend(SearchBackend):
+    """Fallback for databases without a supported full-text index. Matches
+    the title or content with LIKE and keeps no index of its own.
+    """
+
+    def create_index(self):
+        pass
+
+    def drop_index(self):
+        pass
+
+    def index_article(self, article):
+        pass
+
+    def remove_article(self, article_id):
+        pass
+
+    def clear(self):
+        pass
+
+    def rebuild(self, articles, batch_size=500):
+        return 0
+
+    def search(self, query, limit=500):
+        from ..models import Article, ArticleStatus
+        terms = search_terms(query)
+        if not terms:
+            return []
+        articles = Article.objects.filter(
+            publication_status=ArticleStatus.PUBLISHED)
+        for term in terms:
+            articles = articles.filter(Q(title__icontains=term)
+                                       | Q(content__icontains=term))
+        return list(articles.order_by("-pk").values_list("pk", flat=True)
+                    [:limit])
+
+
+SEARCH_BACKENDS = {
+    backend.vendor: backend
+    for backend in (SQLiteSearchBackend, MySQLSearchBackend)
+}
+
+
+def get_search_backend(connection=None):
+    """Return the search backend for the database vendor of a connection
+    (the default connection if not given).
+    """
+    connection = connection or default_connection
+    backend_class = SEARCH_BACKENDS.get(connection.vendor, BasicSearchBackend)
+    return backend_class(connection)
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.utils.module_loading import import_string
+from .http_client import new_session
+from .rendering import get_article_notification
+from .tweet import Tweet, TwitterRateLimited, rate_limit_reset
+
+
+DEFAULT_SYNDICATION_BACKEND = (
+    "news_application.functions.syndication.TwitterSyndicationBackend")
+
+
+class SyndicationRateLimited(Exception):
+    """Raised by a backend when the social network is rate limiting posts.
+
+    Attributes:
+        reset_at (datetime): When posting can be tried again.
+    """
+    def __init__(self, reset_at):
+        self.reset_at = reset_at
+        super().__init__(f"Rate limited until {reset_at.isoformat()}")
+
+
+def build_post_text(article):
+    """Build the text posted to social networks for a published article."""
+    return get_article_notification(article).post_text
+
+
+class SyndicationBackend():
+    """Interface for posting published articles to a social network.
+
+    The backend used is set with the SYNDICATION_BACKEND setting.
+    """
+
+    def post_article(self, article):
+        """Post a published article.
+
+        Raises:
+            SyndicationRateLimited: To have the post retried later.
+        """
+        raise NotImplementedError
+
+
+class TwitterSyndicationBackend(SyndicationBackend):
+    """Posts to the site's Twitter account through the Tweet singleton."""
+
+    def post_article(self, article):
+        if article.image:
+            image_path = article.image.path
+        else:
+            image_path = None
+        try:
+            Tweet().make_tweet(build_post_text(article), image_path)
+        except TwitterRateLimited as e:
+            raise SyndicationRateLimited(e.reset_at) from e
+
+
+class StubSyndicationBackend(SyndicationBackend):
+    """Posts the text of each article to a local HTTP stub server, such as
+    LocalTwitterServer or the run_syndication_stub command, at
+    SYNDICATION_STUB_URL. Used to develop and benchmark the publishing
+    pipeline without a Twitter account.
+    """
+
+    def __init__(self):
+        # Reuse connections to the stub between posts:
+        self.session = new_session()
+
+    def post_article(self, article):
+        url = getattr(settings, "SYNDICATION_STUB_URL",
+                      "http://127.0.0.1:8081/2/tweets")
+        response = self.session.post(
+            url, json={"text": build_post_text(article)})
+        if response.status_code == 429:
+            raise SyndicationRateLimited(rate_limit_reset(response))
+        response.raise_for_status()
+
+
+class NoopSyndicationBackend(SyndicationBackend):
+    """Posts nothing (used by the tests)."""
+
+    def post_article(self, article):
+        pass
+
+
+_backends = {}
+
+
+def get_syndication_backend():
+    """Return the backend set in SYNDICATION_BACKEND, created once per
+    process.
+    """
+    path = getattr(settings, "SYNDICATION_BACKEND",
+                   DEFAULT_SYNDICATION_BACKEND)
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
@@ -0,0 +1,58 @@
+import base64
+import hashlib
+import json
+import os
+from cryptography.fernet import Fernet, InvalidToken
+from django.conf import settings
+
+
+class EncryptedTokenStore():
+    """Keeps OAuth tokens in a local file encrypted with Fernet.
+
+    The key is TWITTER_TOKEN_STORE_KEY if set, otherwise it is derived from
+    SECRET_KEY, so the file cannot be read without the site's secrets.
+
+    Args:
+        path (str): The token file, defaults to TWITTER_TOKEN_STORE_PATH.
+        key (str): A Fernet key, defaults to the key described above.
+    """
+    def __init__(self, path=None, key=None):
+        self.path = path or getattr(
+            settings, "TWITTER_TOKEN_STORE_PATH",
+            os.path.join(settings.BASE_DIR, "twitter_tokens.enc"))
+        key = key or getattr(settings, "TWITTER_TOKEN_STORE_KEY", None)
+        if not key:
+            digest = hashlib.sha256(settings.SECRET_KEY.encode()).digest()
+            key = base64.urlsafe_b64encode(digest)
+        self.fernet = Fernet(key)
+
+    def load(self):
+        """Read the stored tokens.
+
+        Returns:
+            dict: The tokens, or None if there is no token file or it
+            cannot be decrypted with the current key.
+        """
+        try:
+            with open(self.path, "rb") as token_file:
+                data = self.fernet.decrypt(token_file.read())
+        except (FileNotFoundError, InvalidToken):
+            return None
+        return json.loads(data)
+
+    def save(self, tokens):
+        """Encrypt and store the tokens, replacing any previous ones."""
+        data = self.fernet.encrypt(json.dumps(tokens).encode())
+        temp_path = f"{self.path}.tmp"
+        # Readable by the owner only:
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as token_file:
+            token_file.write(data)
+        os.replace(temp_path, self.path)
+
+    def clear(self):
+        """Delete the stored tokens."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
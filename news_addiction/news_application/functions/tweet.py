@@ -1,8 +1,16 @@
 from requests_oauthlib import OAuth1Session
-import os
+import hashlib
 import json
-import requests
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from PIL import Image
 from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from .http_client import configure_session
+from .token_store import EncryptedTokenStore
 
 # ---- Config (use env vars in real code) ----
 CONSUMER_KEY = "ZT7rgZUZbWB9TNKeVuFfqQaqP"
@@ -12,25 +20,152 @@ REQUEST_TOKEN_URL = "https://api.twitter.com/oauth/request_token"
 AUTHENTICATE_URL   = "https://api.twitter.com/oauth/authorize"   # or oauth/authenticate
 ACCESS_TOKEN_URL   = "https://api.twitter.com/oauth/access_token"
 
+# Overridable in settings, e.g. to point at a local stub server:
+MEDIA_UPLOAD_URL = "https://upload.twitter.com/1.1/media/upload.json"
+TWEET_URL = "https://api.twitter.com/2/tweets"
+
+# Platform limits for tweet images:
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+MAX_IMAGE_DIMENSION = 4096
+# Size of each APPEND segment, which is all that is held in memory:
+MEDIA_CHUNK_SIZE = 1024 * 1024
+# Uploaded media IDs are reused for this long (Twitter keeps them for 24h):
+MEDIA_CACHE_TTL = 23 * 60 * 60
+# Longest wait for Twitter to process uploaded media:
+MEDIA_PROCESSING_TIMEOUT = 60
+
+# Used when a 429 response has no x-rate-limit-reset header:
+DEFAULT_RATE_LIMIT_WINDOW = timedelta(minutes=15)
+
+class TwitterNotAuthorised(Exception):
+    """Raised when no OAuth tokens have been stored yet."""
+
+
+class TwitterRateLimited(Exception):
+    """Raised when the Twitter API rate limit has been reached.
+
+    Attributes:
+        reset_at (datetime): When the rate limit window resets.
+    """
+    def __init__(self, reset_at):
+        self.reset_at = reset_at
+        super().__init__(f"Rate limited until {reset_at.isoformat()}")
+
+
+def rate_limit_reset(response):
+    """Return the reset time from the x-rate-limit-reset header (epoch
+    seconds), or DEFAULT_RATE_LIMIT_WINDOW from now if it is missing.
+    """
+    try:
+        reset = int(response.headers["x-rate-limit-reset"])
+    except (KeyError, TypeError, ValueError):
+        return timezone.now() + DEFAULT_RATE_LIMIT_WINDOW
+    return datetime.fromtimestamp(reset, tz=dt_timezone.utc)
+
+
+def file_sha256(path):
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as image_file:
+        for chunk in iter(lambda: image_file.read(MEDIA_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def prepared_image(image_path):
+    """Open an image for upload, downscaling it if it is over the limits.
+
+    Images within MAX_IMAGE_DIMENSION and MAX_IMAGE_BYTES are uploaded as
+    they are. Larger ones are resized and re-encoded as JPEG into a
+    temporary file, shrinking further until they fit.
+
+    Yields:
+        tuple: (binary file object, size in bytes, media type)
+    """
+    with Image.open(image_path) as image:
+        media_type = Image.MIME.get(image.format, "image/jpeg")
+        with open(image_path, "rb") as image_file:
+            image_file.seek(0, 2)
+            size = image_file.tell()
+            if (size <= MAX_IMAGE_BYTES
+                    and max(image.size) <= MAX_IMAGE_DIMENSION):
+                image_file.seek(0)
+                yield image_file, size, media_type
+                return
+
+        # Let JPEG decoding skip detail that would be scaled away:
+        image.draft("RGB", (MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION))
+        image = image.convert("RGB")
+        dimension = min(max(image.size), MAX_IMAGE_DIMENSION)
+        with tempfile.TemporaryFile() as resized_file:
+            while True:
+                resized = image.copy()
+                resized.thumbnail((dimension, dimension))
+                resized_file.seek(0)
+                resized_file.truncate()
+                resized.save(resized_file, format="JPEG", quality=85)
+                size = resized_file.tell()
+                if size <= MAX_IMAGE_BYTES or dimension <= 256:
+                    break
+                dimension = int(dimension * 0.75)
+            resized_file.seek(0)
+            yield resized_file, size, "image/jpeg"
+
+
 class Tweet():
+    """Posts to the site's Twitter account.
+
+    One instance is shared per process. It loads the OAuth tokens from the
+    encrypted token store and never prompts for input; the tokens are
+    created once with the authorize_twitter management command.
+    """
     _instance = None  # Missing from the original notes.
     def __new__(cls):
         if cls._instance is None:
-            print("Creating the Tweet instance")
             cls._instance = super(Tweet, cls).__new__(cls)
-            cls._instance.authenticate()
+            cls._instance.oauth = None
+            # Posting is blocked until this time after a 429 response:
+            cls._instance.rate_limited_until = None
+            cls._instance.load_tokens()
         return cls._instance
 
+    def load_tokens(self):
+        """Build the OAuth session from the token store.
 
-    def authenticate(self):
-        
+        Returns:
+            bool: True if tokens were found.
+        """
+        tokens = EncryptedTokenStore().load()
+        if not tokens:
+            self.oauth = None
+            return False
+        # Pooled keep-alive connections with timeouts and retries:
+        self.oauth = configure_session(OAuth1Session(
+            client_key=CONSUMER_KEY,
+            client_secret=CONSUMER_SECRET,
+            resource_owner_key=tokens["oauth_token"],
+            resource_owner_secret=tokens["oauth_token_secret"],
+        ))
+        return True
+
+    def authenticate(self, get_verifier=input):
+        """Run the PIN-based OAuth flow and store the access tokens.
+
+        Only called from the authorize_twitter management command, as it
+        waits for the PIN to be entered.
+
+        Args:
+            get_verifier (callable): Prompts for the verifier PIN given the
+                authorisation URL.
+        """
         # Get request token
         # Include the callback in the session so it's part of the signed request
-        oauth = OAuth1Session( 
+        oauth = configure_session(OAuth1Session(
             client_key=CONSUMER_KEY,
             client_secret=CONSUMER_SECRET,
              callback_uri="oob",   # out-of-band PIN flow
-        )
+        ))
         try:
             fetch_response = oauth.fetch_request_token(
                         REQUEST_TOKEN_URL,
@@ -38,65 +173,146 @@ class Tweet():
                         )
 
         except ValueError as e:
-            print("There may be an issue with your consumer key/secret"
-            " or request signature.")
+            raise TwitterNotAuthorised(
+                "There may be an issue with your consumer key/secret"
+                " or request signature.") from e
 
         resource_owner_key = fetch_response.get("oauth_token")
         resource_owner_secret = fetch_response.get("oauth_token_secret")
-        print("Got OAuth token: %s" % resource_owner_key)
-        print("Got OAuth token secret: %s" % resource_owner_secret)
 
         authorization_url = oauth.authorization_url(AUTHENTICATE_URL)
         print("Please go here and authorize: %s" % authorization_url)
-        verifier = input("Please input the verifier PIN code: ").strip()
+        verifier = get_verifier("Please input the verifier PIN code: ").strip()
 
-        oauth = OAuth1Session(
+        oauth = configure_session(OAuth1Session(
             client_key=CONSUMER_KEY,
             client_secret=CONSUMER_SECRET,
             resource_owner_key=resource_owner_key,
             resource_owner_secret=resource_owner_secret,
             verifier=verifier,
-        )
+        ))
         oauth_tokens = oauth.fetch_access_token(ACCESS_TOKEN_URL)
-        access_token = oauth_tokens['oauth_token']
-        access_token_secret = oauth_tokens['oauth_token_secret']    
+        EncryptedTokenStore().save({
+            "oauth_token": oauth_tokens["oauth_token"],
+            "oauth_token_secret": oauth_tokens["oauth_token_secret"],
+        })
+        self.load_tokens()
 
-        print("Got access token: %s" % access_token)
-        print("Got access token secret: %s" % access_token_secret)
-        self.oauth = OAuth1Session(
-            client_key=CONSUMER_KEY,
-            client_secret=CONSUMER_SECRET,
-            resource_owner_key=access_token,
-            resource_owner_secret=access_token_secret,
-        )
+    def check_ready(self):
+        """Raise if posting is not possible right now."""
+        if not self.oauth:
+            raise TwitterNotAuthorised(
+                "No Twitter tokens stored, run manage.py authorize_twitter")
+        if (self.rate_limited_until is not None
+                and timezone.now() < self.rate_limited_until):
+            raise TwitterRateLimited(self.rate_limited_until)
+
+    def check_rate_limit(self, response):
+        """Track the rate limit headers of a Twitter API response.
+
+        Raises:
+            TwitterRateLimited: If the request was rejected with 429.
+        """
+        if response.status_code == 429:
+            self.rate_limited_until = rate_limit_reset(response)
+            raise TwitterRateLimited(self.rate_limited_until)
+        if response.headers.get("x-rate-limit-remaining") == "0":
+            # This request got through but the next one would not:
+            self.rate_limited_until = rate_limit_reset(response)
+
+    def check_response(self, response, action):
+        """Raise unless a Twitter API response was successful."""
+        self.check_rate_limit(response)
+        if not 200 <= response.status_code < 300:
+            raise Exception(
+                "{} failed: {}{}".format(
+                action, response.status_code, response.text
+                ))
 
     def upload_image(self, image_path):
-        """Upload an image to Twitter and return the media ID"""
-        if not self.oauth:
-            raise ValueError("Authentication failed!")
-        
-           
+        """Upload an image to Twitter and return the media ID.
+
+        The image is sent with the chunked INIT/APPEND/FINALIZE protocol,
+        one MEDIA_CHUNK_SIZE segment at a time. Media IDs are cached by the
+        SHA-256 of the file in the shared default cache (see CACHES), so
+        posting the same image again (e.g. when a tweet is retried by
+        another worker) reuses the earlier upload.
+        """
+        self.check_ready()
+        cache_key = f"tweet_media:{file_sha256(image_path)}"
+        media_id = cache.get(cache_key)
+        if media_id is not None:
+            return media_id
+
         print(f"Attempting to open image at: {image_path}")
-        
-        # Read the image file
-        with open(image_path, 'rb') as image_file:
-            file = {'media': image_file}
-            
-            # Upload to Twitter's media upload endpoint
+        with prepared_image(image_path) as (image_file, size, media_type):
+            media_id, expires_after = self.chunked_upload(
+                image_file, size, media_type)
+
+        ttl = getattr(settings, "TWITTER_MEDIA_CACHE_TTL", MEDIA_CACHE_TTL)
+        if expires_after:
+            # Stop reusing the ID a minute before Twitter discards it:
+            ttl = min(ttl, expires_after - 60)
+        if ttl > 0:
+            cache.set(cache_key, media_id, ttl)
+        return media_id
+
+    def chunked_upload(self, image_file, size, media_type):
+        """Upload a file with the INIT/APPEND/FINALIZE commands.
+
+        Returns:
+            tuple: (media ID, seconds until Twitter discards the media, or
+            None if not given)
+        """
+        upload_url = getattr(settings, "TWITTER_MEDIA_UPLOAD_URL",
+                             MEDIA_UPLOAD_URL)
+        response = self.oauth.post(upload_url, data={
+            "command": "INIT",
+            "total_bytes": size,
+            "media_type": media_type,
+            "media_category": "tweet_image",
+        })
+        self.check_response(response, "Image upload INIT")
+        media_id = response.json()["media_id_string"]
+
+        segment_index = 0
+        for chunk in iter(lambda: image_file.read(MEDIA_CHUNK_SIZE), b""):
             response = self.oauth.post(
-                "https://upload.twitter.com/1.1/media/upload.json",
-                files=file
+                upload_url,
+                data={"command": "APPEND", "media_id": media_id,
+                      "segment_index": segment_index},
+                files={"media": chunk},
             )
-        
-        if response.status_code != 200:
-            raise Exception(
-                "Image upload failed: {}{}".format(
-                response.status_code, response.text
-                ))
-        
+            self.check_response(response, "Image upload APPEND")
+            segment_index += 1
+
+        response = self.oauth.post(upload_url, data={
+            "command": "FINALIZE",
+            "media_id": media_id,
+        })
+        self.check_response(response, "Image upload FINALIZE")
         media_data = response.json()
-        return media_data['media_id_string']
-    
+
+        # Wait for any server-side processing of the media:
+        deadline = time.monotonic() + MEDIA_PROCESSING_TIMEOUT
+        processing = media_data.get("processing_info")
+        while processing and processing.get("state") in ("pending",
+                                                         "in_progress"):
+            if time.monotonic() > deadline:
+                raise Exception("Image processing timed out")
+            time.sleep(processing.get("check_after_secs", 1))
+            response = self.oauth.get(upload_url, params={
+                "command": "STATUS",
+                "media_id": media_id,
+            })
+            self.check_response(response, "Image upload STATUS")
+            media_data = response.json()
+            processing = media_data.get("processing_info")
+        if processing and processing.get("state") == "failed":
+            raise Exception(f"Image processing failed: {processing}")
+
+        return media_id, media_data.get("expires_after_secs")
+
     def make_tweet(self, tweet_text, image_path=None):
         """
         Create a tweet with optional image
@@ -105,9 +321,8 @@ class Tweet():
             tweet_text (str): The text content of the tweet
             image_path (str, optional): Path to image file to attach
         """
-        if not self.oauth:
-            raise ValueError("Authentication failed!")
-        
+        self.check_ready()
+
         # Prepare tweet data
         tweet_data = {"text": tweet_text}
         
@@ -123,10 +338,11 @@ class Tweet():
         
         # Make the tweet request
         response = self.oauth.post(
-            "https://api.twitter.com/2/tweets",
+            getattr(settings, "TWITTER_TWEET_URL", TWEET_URL),
             json=tweet_data,
         )
-        
+        self.check_rate_limit(response)
+
         if response.status_code != 201:
             raise Exception(
                 "Request returned as an error: {}{}".format(
@@ -0,0 +1,82 @@
+from django.core.management.base import BaseCommand, CommandError
+from news_application.functions.api_keys import mint_api_key, revoke_api_keys
+from news_application.models import APIKey, User
+
+
+class Command(BaseCommand):
+    """Mint, list and revoke the API keys of the article API. A minted key
+       is printed once and only its digest is stored, so it cannot be
+       shown again. Clients send it as "Authorization: Api-Key <key>".
+       Usage:
+       python manage.py api_keys mint <username> --name "Partner site"
+       python manage.py api_keys list [<username>]
+       python manage.py api_keys revoke <prefix>
+       To revoke every key of a user:
+       python manage.py api_keys revoke --user <username>
+    """
+    help = 'Mint, list and revoke API keys'
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest='action', required=True)
+
+        mint = actions.add_parser('mint', help='Issue a new key to a user')
+        mint.add_argument('username')
+        mint.add_argument('--name', default='',
+                          help='What the key is for, e.g. the partner')
+
+        listing = actions.add_parser('list', help='List the keys')
+        listing.add_argument('username', nargs='?')
+
+        revoke = actions.add_parser('revoke', help='Revoke keys')
+        revoke.add_argument('prefix', nargs='?',
+                            help='Prefix of the key to revoke')
+        revoke.add_argument('--user', help='Revoke every key of this user')
+
+    def get_user(self, username):
+        try:
+            return User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f'No user named {username}')
+
+    def handle(self, *args, **options):
+        actions = {'mint': self.mint, 'list': self.list_keys,
+                   'revoke': self.revoke}
+        actions[options['action']](options)
+
+    def mint(self, options):
+        user = self.get_user(options['username'])
+        api_key, key = mint_api_key(user, options['name'])
+        self.stdout.write(key)
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSummary: Minted key {api_key.prefix} for {user.username}. '
+            f'Store it now, it cannot be shown again'))
+
+    def list_keys(self, options):
+        keys = APIKey.objects.select_related('user').order_by('created_at')
+        if options['username']:
+            keys = keys.filter(user=self.get_user(options['username']))
+        count = 0
+        for api_key in keys:
+            status = (f'revoked {api_key.revoked_at:%Y-%m-%d %H:%M}'
+                      if api_key.revoked_at else 'active')
+            last_used = (f'{api_key.last_used_at:%Y-%m-%d %H:%M}'
+                         if api_key.last_used_at else 'never')
+            self.stdout.write(
+                f'{api_key.prefix}  {api_key.user.username}  {status}  '
+                f'last used {last_used}  {api_key.name}')
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'\nSummary: {count} keys'))
+
+    def revoke(self, options):
+        if bool(options['prefix']) == bool(options['user']):
+            raise CommandError('Give either a key prefix or --user')
+        if options['user']:
+            keys = APIKey.objects.filter(
+                user=self.get_user(options['user']))
+        else:
+            keys = APIKey.objects.filter(prefix=options['prefix'])
+            if not keys.exists():
+                raise CommandError(f'No key with prefix {options["prefix"]}')
+        revoked = revoke_api_keys(keys)
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSummary: Revoked {revoked} keys'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from news_application.functions.token_store import EncryptedTokenStore
+from news_application.functions.tweet import Tweet
+
+
+class Command(BaseCommand):
+    """Authorise the site's Twitter account with the PIN-based OAuth flow
+       and save the access tokens in the encrypted token store. The web
+       application and the notification worker load the tokens from the
+       store and never prompt for the PIN themselves.
+       Usage:
+       python manage.py authorize_twitter
+       To delete the stored tokens:
+       python manage.py authorize_twitter --clear
+    """
+    help = 'Authorise the Twitter account and store its OAuth tokens'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete the stored tokens instead',
+        )
+
+    def handle(self, *args, **options):
+        store = EncryptedTokenStore()
+        if options['clear']:
+            store.clear()
+            Tweet().load_tokens()
+            self.stdout.write(self.style.SUCCESS(
+                '\nSummary: Twitter tokens deleted'))
+            return
+
+        Tweet().authenticate()
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSummary: Twitter tokens saved to {store.path}'))
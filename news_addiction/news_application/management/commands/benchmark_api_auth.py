@@ -0,0 +1,74 @@
+import base64
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from news_application.functions.api_keys import (clear_api_key_cache,
+                                                 mint_api_key)
+from news_application.models import Roles, User
+from news_application.views import API_get_articles
+
+
+class Command(BaseCommand):
+    """Compare the requests/sec of /get/articles/ with Basic auth, which
+       checks the password hash on every request, and with an API key.
+       The view is called directly (without the middleware) for a page of
+       one article, so the difference is mostly the authentication. The
+       user and key are created in a transaction that is rolled back, so
+       no data is left behind.
+       Usage:
+       python manage.py benchmark_api_auth
+       To change the number of requests per scheme:
+       python manage.py benchmark_api_auth --requests 100
+    """
+    help = 'Benchmark API key authentication against Basic auth'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=20,
+            help='Number of requests per authentication scheme',
+        )
+
+    def time_requests(self, authorization, count):
+        """Return the requests/sec of count requests with an
+        Authorization header.
+        """
+        factory = RequestFactory()
+        start = time.perf_counter()
+        for _ in range(count):
+            request = factory.get('/get/articles/', {'limit': 1},
+                                  HTTP_AUTHORIZATION=authorization)
+            response = API_get_articles(request)
+            if response.status_code != 200:
+                raise CommandError(
+                    f'{authorization.split()[0]} request failed with '
+                    f'{response.status_code}')
+        return count / (time.perf_counter() - start)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        with transaction.atomic():
+            password = "benchmark-password-123"
+            user = User.objects.create_user(
+                username="benchmark_api_auth_user",
+                password=password,
+                role=Roles.JOURNALIST,
+                display_name="Benchmark User",
+                date_of_birth="1990-01-01",
+            )
+            credentials = base64.b64encode(
+                f"{user.username}:{password}".encode()).decode()
+            _, key = mint_api_key(user, "benchmark")
+
+            basic = self.time_requests(f"Basic {credentials}", count)
+            api_key = self.time_requests(f"Api-Key {key}", count)
+            transaction.set_rollback(True)
+        clear_api_key_cache()
+
+        self.stdout.write(f'Basic auth: {basic:.1f} requests/s')
+        self.stdout.write(f'API key:    {api_key:.1f} requests/s')
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSummary: API keys serve {api_key / basic:.1f}x the '
+            f'requests/sec of Basic auth'))
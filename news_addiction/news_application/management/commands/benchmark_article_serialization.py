@@ -0,0 +1,102 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.http import JsonResponse
+from django.utils import timezone
+from news_application.functions.article_records import ArticleRecordBuilder
+from news_application.models import (Article, ArticleSerializer,
+                                     ArticleStatus, Publisher, Roles, User)
+
+
+class Command(BaseCommand):
+    """Compare the rows/sec of the /get/articles/ list serialization paths:
+       ArticleSerializer over model instances (the old path) and
+       ArticleRecordBuilder over values_list() rows (the current path).
+       Both encode the same articles with JsonResponse and the outputs are
+       checked to be byte-identical. The articles are created in a
+       transaction that is rolled back, so no data is left behind.
+       Usage:
+       python manage.py benchmark_article_serialization
+       To change the corpus sizes (one run per size):
+       python manage.py benchmark_article_serialization --articles 1000 10000
+    """
+    help = 'Benchmark ArticleSerializer against the values() record builder'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--articles',
+            type=int,
+            nargs='+',
+            default=[10000, 100000],
+            help='Corpus sizes to serialize',
+        )
+        parser.add_argument(
+            '--content-size',
+            type=int,
+            default=2000,
+            help='Characters of content per article',
+        )
+
+    def time_path(self, serialize):
+        start = time.perf_counter()
+        content = JsonResponse(serialize(), safe=False).content
+        return time.perf_counter() - start, content
+
+    def handle(self, *args, **options):
+        speedups = []
+        with transaction.atomic():
+            author = User.objects.create(
+                username="benchmark_serialization_author",
+                role=Roles.JOURNALIST,
+                display_name="Benchmark Author",
+                date_of_birth="1990-01-01",
+            )
+            publisher = Publisher.objects.create(
+                name="Benchmark Publisher",
+                description="Benchmark publisher",
+            )
+            content = ("Benchmark content. " * options['content_size'])[
+                :options['content_size']]
+            created = 0
+            for size in sorted(options['articles']):
+                self.stdout.write(self.style.WARNING(
+                    f'Creating {size} articles...'))
+                now = timezone.now()
+                # Every other article is self-published:
+                Article.objects.bulk_create([
+                    Article(title=f"Benchmark Article {i}", content=content,
+                            author=author,
+                            publisher=author if i % 2 else publisher,
+                            publication_status=ArticleStatus.PUBLISHED,
+                            publication_date=now)
+                    for i in range(created, size)
+                ], batch_size=2000)
+                created = size
+                articles = Article.objects.filter(author=author)
+
+                serializer_seconds, serializer_content = self.time_path(
+                    lambda: ArticleSerializer(
+                        articles.with_publishers().order_by("pk"),
+                        many=True).data)
+                builder = ArticleRecordBuilder()
+                builder_seconds, builder_content = self.time_path(
+                    lambda: builder.records(
+                        builder.rows(articles).order_by("pk")))
+                if builder_content != serializer_content:
+                    raise CommandError(
+                        f'The outputs differ at {size} articles')
+
+                speedup = serializer_seconds / builder_seconds
+                speedups.append(speedup)
+                self.stdout.write(
+                    f'{size} articles: ArticleSerializer '
+                    f'{size / serializer_seconds:.0f} rows/s, values() '
+                    f'{size / builder_seconds:.0f} rows/s '
+                    f'({speedup:.1f}x), {len(builder_content)} bytes, '
+                    f'identical')
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSummary: values() serialization is '
+            f'{min(speedups):.1f}x-{max(speedups):.1f}x faster than '
+            f'ArticleSerializer'))
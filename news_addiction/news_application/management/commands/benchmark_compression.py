@@ -0,0 +1,110 @@
+import random
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from news_application.functions.api_keys import (clear_api_key_cache,
+                                                 mint_api_key)
+from news_application.functions.conditional import bump_collection_version
+from news_application.functions.compression import (COMPRESSORS,
+                                                    get_compression_metrics,
+                                                    reset_compression_metrics)
+from news_application.middleware import CompressionMiddleware
+from news_application.models import (Article, ArticleStatus, Publisher,
+                                     Roles, User)
+from news_application.views import API_get_articles
+
+
+# Words of the generated article text:
+WORDS = ("the council said on monday that new figures showed a rise in "
+         "local news readers while sport and politics coverage grew across "
+         "every region after the election week of storms and markets").split()
+
+
+class Command(BaseCommand):
+    """Request a page of /get/articles/ repeatedly with each installed
+       content coding (gzip, and br/zstd with the brotli and zstandard
+       packages) through CompressionMiddleware, and report the
+       compression ratio, the CPU time spent compressing and the hits of
+       the compressed body cache. The first request of each coding is
+       compressed and the following ones are served from the cache. The
+       articles (and the cached bodies, in the database cache) are created
+       in a transaction that is rolled back, so no data is left behind.
+       Usage:
+       python manage.py benchmark_compression
+       To change the page size and the number of requests per coding:
+       python manage.py benchmark_compression --articles 500 --requests 50
+    """
+    help = 'Benchmark the response compression of the article API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--articles',
+            type=int,
+            default=100,
+            help='Articles on the requested page',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=20,
+            help='Number of requests per content coding',
+        )
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        middleware = CompressionMiddleware(API_get_articles)
+        results = {}
+        with transaction.atomic():
+            author = User.objects.create(
+                username="benchmark_compression_author",
+                role=Roles.JOURNALIST,
+                display_name="Benchmark Author",
+                date_of_birth="1990-01-01",
+            )
+            publisher = Publisher.objects.create(
+                name="Benchmark Publisher",
+                description="Benchmark publisher",
+            )
+            rng = random.Random(0)
+            Article.objects.bulk_create([
+                Article(title=f"Benchmark Article {i}",
+                        content=" ".join(rng.choice(WORDS)
+                                         for _ in range(300)),
+                        author=author, publisher=publisher,
+                        publication_status=ArticleStatus.PUBLISHED,
+                        publication_date=timezone.now())
+                for i in range(options['articles'])
+            ])
+            # bulk_create() sends no signals:
+            bump_collection_version()
+            _, key = mint_api_key(author, "benchmark")
+
+            # The cache key includes the coding, so the first request of
+            # each coding is compressed. The cached bodies are written in
+            # this transaction and rolled back with it:
+            for encoding in COMPRESSORS:
+                reset_compression_metrics()
+                for _ in range(options['requests']):
+                    request = factory.get(
+                        '/get/articles/',
+                        {'author_name': author.username,
+                         'limit': options['articles']},
+                        HTTP_AUTHORIZATION=f'Api-Key {key}',
+                        HTTP_ACCEPT_ENCODING=encoding)
+                    response = middleware(request)
+                    if response.get('Content-Encoding') != encoding:
+                        raise CommandError(
+                            f'The response was not compressed with '
+                            f'{encoding}')
+                results[encoding] = get_compression_metrics()[encoding]
+                self.stdout.write(
+                    f'Compression {encoding}: {results[encoding]}')
+            transaction.set_rollback(True)
+        clear_api_key_cache()
+        reset_compression_metrics()
+
+        best = max(results, key=lambda encoding: results[encoding].ratio)
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSummary: {best} compresses the page best, '
+            f'{results[best].ratio:.1f}x'))
@@ -0,0 +1,107 @@
+import time
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+from news_application.models import Article, User, Roles
+from news_application.functions.local_smtp import LocalSMTPServer
+from news_application.functions.notifications import (
+    build_new_article_email, send_bulk_notification_emails)
+
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+
+class Command(BaseCommand):
+    """Compare sending the new article notification emails one connection
+       per recipient (the old email.send() path) with the chunked
+       send_bulk_notification_emails() path. Both send to a local SMTP
+       stand-in, so no email leaves the machine and no database rows are
+       created.
+       Usage:
+       python manage.py benchmark_notification_emails
+       To change the number of recipients and the chunk size:
+       python manage.py benchmark_notification_emails --recipients 20000 --chunk-size 500
+       To simulate a remote mail server 5ms away:
+       python manage.py benchmark_notification_emails --latency-ms 5
+    """
+    help = 'Benchmark per-recipient and bulk notification email delivery'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--recipients',
+            type=int,
+            default=10000,
+            help='Number of subscribers to email',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Messages per chunk on the bulk path',
+        )
+        parser.add_argument(
+            '--latency-ms',
+            type=float,
+            default=0,
+            help='Delay before each SMTP reply of the stand-in server',
+        )
+        parser.add_argument(
+            '--skip-baseline',
+            action='store_true',
+            help='Only time the bulk path',
+        )
+
+    def handle(self, *args, **options):
+        recipients = options['recipients']
+        author = User(username="benchmark_author", role=Roles.JOURNALIST,
+                      display_name="Benchmark Author")
+        article = Article(title="Benchmark Article", author=author,
+                          content="Benchmark content. " * 50)
+        subscribers = [
+            User(username=f"reader{i}", email=f"reader{i}@example.com",
+                 display_name=f"Reader {i}", role=Roles.READER)
+            for i in range(recipients)
+        ]
+
+        latency = options['latency_ms'] / 1000
+        with LocalSMTPServer(latency=latency) as server:
+            def connection():
+                return get_connection(SMTP_BACKEND, host=server.host,
+                                      port=server.port)
+
+            baseline = None
+            if not options['skip_baseline']:
+                self.stdout.write(self.style.WARNING(
+                    f'Sending {recipients} emails one at a time...'))
+                start = time.perf_counter()
+                for subscriber in subscribers:
+                    email = build_new_article_email(article, subscriber)
+                    email.connection = connection()
+                    email.send()
+                baseline = time.perf_counter() - start
+                self.stdout.write(
+                    f'Per-recipient: {baseline:.2f}s '
+                    f'({recipients / baseline:.0f} emails/s)')
+
+            self.stdout.write(self.style.WARNING(
+                f'Sending {recipients} emails in chunks of '
+                f'{options["chunk_size"]}...'))
+            connections_before = server.connections
+            start = time.perf_counter()
+            report = send_bulk_notification_emails(
+                article, subscribers, chunk_size=options['chunk_size'],
+                connection=connection())
+            bulk = time.perf_counter() - start
+
+        slowest = max((chunk.seconds for chunk in report.chunks), default=0)
+        self.stdout.write(
+            f'Bulk: {bulk:.2f}s ({recipients / bulk:.0f} emails/s), '
+            f'{len(report.chunks)} chunks, slowest chunk {slowest:.3f}s, '
+            f'{server.connections - connections_before} SMTP connections, '
+            f'{report.failed} failed')
+        for error in report.errors:
+            self.stdout.write(self.style.ERROR(error))
+
+        summary = f'\nSummary: Sent {report.sent} emails in {bulk:.2f}s'
+        if baseline:
+            summary += f' ({baseline / bulk:.1f}x faster than per-recipient)'
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,112 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from news_application.functions.http_client import (get_http_metrics,
+                                                     reset_http_metrics)
+from news_application.functions.local_twitter import LocalTwitterServer
+from news_application.functions.notifications import (claim_jobs,
+                                                       process_job)
+from news_application.models import (Article, ArticleStatus, User, Roles,
+                                     NotificationJob, NotificationKind)
+
+
+STUB_BACKEND = "news_application.functions.syndication.StubSyndicationBackend"
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[int(index)]
+
+
+class Command(BaseCommand):
+    """Push N publish events through the syndication pipeline against a
+       local stub server and report the throughput and latency of one
+       worker. Each event publishes an article, which queues a TWEET job
+       in the notification outbox; the jobs are then claimed and posted
+       through the StubSyndicationBackend like run_notification_worker
+       does. Everything runs in a transaction that is rolled back, so no
+       data is left behind.
+       Use the posts/sec of one worker to size the number of workers.
+       Usage:
+       python manage.py benchmark_syndication
+       To change the number of events and the claim batch size:
+       python manage.py benchmark_syndication --events 5000 --batch-size 200
+    """
+    help = 'Benchmark the syndication pipeline against a local stub'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--events',
+            type=int,
+            default=1000,
+            help='Number of articles to publish',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of jobs claimed at a time',
+        )
+
+    def handle(self, *args, **options):
+        events = options['events']
+        with LocalTwitterServer() as server, override_settings(
+                SYNDICATION_BACKEND=STUB_BACKEND,
+                SYNDICATION_STUB_URL=server.tweet_url):
+            with transaction.atomic():
+                self.stdout.write(self.style.WARNING(
+                    f'Publishing {events} articles...'))
+                author = User.objects.create(
+                    username="benchmark_syndication_author",
+                    role=Roles.JOURNALIST,
+                    display_name="Benchmark Author",
+                    date_of_birth="1990-01-01",
+                )
+                for i in range(events):
+                    Article.objects.create(
+                        title=f"Benchmark Article {i}",
+                        content="Benchmark content.",
+                        author=author,
+                        publication_status=ArticleStatus.PUBLISHED,
+                    )
+
+                self.stdout.write(self.style.WARNING(
+                    'Posting through the stub backend...'))
+                # Leave any real queued jobs alone:
+                benchmark_jobs = NotificationJob.objects.filter(
+                    article__author=author)
+                latencies = []
+                failed = 0
+                reset_http_metrics()
+                start = time.perf_counter()
+                while True:
+                    jobs = claim_jobs(options['batch_size'],
+                                      kinds=[NotificationKind.TWEET],
+                                      queryset=benchmark_jobs)
+                    if not jobs:
+                        break
+                    for job in jobs:
+                        job_start = time.perf_counter()
+                        if not process_job(job):
+                            failed += 1
+                        latencies.append(time.perf_counter() - job_start)
+                elapsed = time.perf_counter() - start
+                transaction.set_rollback(True)
+
+        posted = len(server.tweets)
+        self.stdout.write(
+            f'Posts: {posted}, failed: {failed}, elapsed: {elapsed:.2f}s')
+        self.stdout.write(
+            f'Latency per post: p50 {percentile(latencies, 50) * 1000:.1f}ms'
+            f', p99 {percentile(latencies, 99) * 1000:.1f}ms'
+            f', max {max(latencies, default=0) * 1000:.1f}ms')
+        for host, metrics in get_http_metrics().items():
+            self.stdout.write(f'HTTP {host}: {metrics}')
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSummary: {posted / elapsed if elapsed else 0:.0f} posts/sec '
+            f'per worker'))
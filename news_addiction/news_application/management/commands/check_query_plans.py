@@ -0,0 +1,117 @@
+import json
+import re
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from news_application.models import Article, ArticleStatus, Publisher
+
+
+# Index names in text plans, e.g. "USING INDEX name" (SQLite) or
+# "Index Scan using name" (PostgreSQL):
+TEXT_PLAN_INDEX_RE = re.compile(r"\busing (?:covering )?(?:index )?(\w+)",
+                                re.IGNORECASE)
+
+
+def used_indexes(plan, vendor):
+    """Return the names of the indexes used by a query plan.
+
+    Args:
+        plan (str): Output of QuerySet.explain().
+        vendor (str): Database vendor of the connection.
+
+    Returns:
+        set: Index names found in the plan.
+    """
+    if vendor == "mysql":
+        # JSON plans list the chosen index under "key" (unlike the text
+        # format, which also lists every candidate in "possible_keys"):
+        found = set()
+
+        def collect(node):
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if key == "key" and isinstance(value, str):
+                        found.add(value)
+                    else:
+                        collect(value)
+            elif isinstance(node, list):
+                for item in node:
+                    collect(item)
+
+        collect(json.loads(plan))
+        return found
+    return set(TEXT_PLAN_INDEX_RE.findall(plan))
+
+
+class Command(BaseCommand):
+    """Run EXPLAIN on the canonical Article queries of the application
+       against the configured database and check that each one uses the
+       index it was designed for. Run it after schema changes to catch
+       query plan regressions. Plans depend on table statistics, so run it
+       against a database with production-like data.
+       Usage:
+       python manage.py check_query_plans
+       To also print the full plans:
+       python manage.py check_query_plans --verbosity 2
+    """
+    help = 'Check that the canonical Article queries use their indexes'
+
+    def canonical_queries(self):
+        """Return (name, queryset, expected index) for each hot query."""
+        publisher = Publisher.objects.order_by("pk").first()
+        publisher_id = publisher.pk if publisher else 0
+        author = Article.objects.order_by("pk").values_list(
+            "author_id", flat=True).first() or 0
+
+        return [
+            ("reader_feed",
+             Article.objects.filter(
+                 publication_status=ArticleStatus.PUBLISHED
+                 ).order_by("-publication_date", "-pk")[:21],
+             "article_status_date_idx"),
+            ("editor_article_management",
+             Article.objects.filter(publisher_id=publisher_id),
+             "article_publisher_status_idx"),
+            ("editor_approval_queue",
+             Article.objects.filter(
+                 publisher_id=publisher_id,
+                 publication_status=ArticleStatus.AWAITING_APPROVAL),
+             "article_publisher_status_idx"),
+            ("journalist_article_management",
+             Article.objects.filter(author_id=author),
+             "article_author_status_idx"),
+            ("api_changes_feed",
+             Article.objects.filter(
+                 updated_at__gt=timezone.now() - timedelta(days=1)
+                 ).order_by("updated_at", "pk")[:101],
+             "article_updated_at_idx"),
+        ]
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        explain_options = {"format": "JSON"} if vendor == "mysql" else {}
+
+        failures = []
+        for name, queryset, expected_index in self.canonical_queries():
+            plan = queryset.explain(**explain_options)
+            indexes = used_indexes(plan, vendor)
+            if expected_index in indexes:
+                self.stdout.write(self.style.SUCCESS(
+                    f'OK    {name}: uses {expected_index}'))
+            else:
+                failures.append(name)
+                used = ", ".join(sorted(indexes)) or "no index"
+                self.stdout.write(self.style.ERROR(
+                    f'FAIL  {name}: expected {expected_index}, '
+                    f'plan uses {used}'))
+            if options['verbosity'] > 1 or expected_index not in indexes:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(
+                f'{len(failures)} queries do not use their expected index: '
+                f'{", ".join(failures)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            '\nSummary: All queries use their expected indexes'))
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from news_application.functions.export import (EXPORT_FORMATS,
+                                               export_queryset,
+                                               iter_article_records,
+                                               parse_since)
+from news_application.models import ArticleStatus
+
+
+class Command(BaseCommand):
+    """Export every article as NDJSON, CSV or XML, the same records as the
+       /export/articles/ API. The articles are streamed from the database
+       and written one record at a time, so the export uses constant memory
+       at any number of articles.
+       Usage:
+       python manage.py export_articles --output articles.ndjson
+       To export the published articles updated since a date as CSV:
+       python manage.py export_articles --format csv --status PUBLISHED --since 2025-01-01 --output articles.csv
+    """
+    help = 'Stream all articles to an NDJSON, CSV or XML file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=list(EXPORT_FORMATS),
+            default='ndjson',
+            help='Output format',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only articles updated since this ISO 8601 date or datetime',
+        )
+        parser.add_argument(
+            '--status',
+            choices=ArticleStatus.values,
+            help='Only articles with this publication status',
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to, defaults to standard output',
+        )
+
+    def counted(self, records):
+        for record in records:
+            self.count += 1
+            yield record
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        self.count = 0
+        records = self.counted(iter_article_records(
+            export_queryset(since, options['status'])))
+        lines = EXPORT_FORMATS[options['format']](records)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                for line in lines:
+                    output.write(line)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
+
+        # Keep standard output clean for the exported data:
+        self.stderr.write(self.style.SUCCESS(
+            f'\nSummary: Exported {self.count} articles as {options["format"]}'))
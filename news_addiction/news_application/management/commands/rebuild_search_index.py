@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from news_application.models import Article, ArticleStatus
+from news_application.functions.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """Rebuild the full-text article search index from the published
+       articles of the Article table.
+       Use this to backfill the index for articles that existed before the
+       index was created, or after bulk changes that bypass Article.save().
+       Usage:
+       python manage.py rebuild_search_index
+       To change the number of articles read per query:
+       python manage.py rebuild_search_index --batch-size 1000
+    """
+    help = 'Rebuild the full-text article search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of articles read from the database per query',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        self.stdout.write(self.style.WARNING(
+            f'Rebuilding search index ({backend.__class__.__name__})...'))
+
+        with transaction.atomic():
+            indexed_count = backend.rebuild(
+                Article.objects.filter(
+                    publication_status=ArticleStatus.PUBLISHED),
+                batch_size=options['batch_size'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nSummary: Indexed {indexed_count} articles'
+            )
+        )
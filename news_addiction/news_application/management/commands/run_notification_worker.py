@@ -0,0 +1,91 @@
+import time
+from django.core.management.base import BaseCommand
+from news_application.functions.notifications import (get_worker_id,
+                                                       process_batch)
+from news_application.functions.http_client import get_http_metrics
+from news_application.functions.syndication import (
+    get_syndication_backend, TwitterSyndicationBackend)
+from news_application.functions.tweet import Tweet
+from news_application.models import NotificationKind
+
+
+class Command(BaseCommand):
+    """Deliver the queued article notifications (subscriber emails and
+       tweets) from the notification outbox. Jobs are claimed in batches,
+       failed deliveries are retried with exponential backoff and the
+       outcome of every job is recorded on its NotificationJob row.
+       Several workers can run at the same time.
+       Usage:
+       python manage.py run_notification_worker
+       To process the due jobs once and exit (e.g. from cron):
+       python manage.py run_notification_worker --once
+       To run a worker for one kind of notification only:
+       python manage.py run_notification_worker --kind TWEET
+    """
+    help = 'Deliver queued article notifications from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of jobs claimed at a time',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait when there are no due jobs',
+        )
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=NotificationKind.values,
+            help='Only deliver this kind of notification (repeatable)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the due jobs and exit instead of polling',
+        )
+
+    def handle(self, *args, **options):
+        worker_id = get_worker_id()
+        self.stdout.write(self.style.WARNING(
+            f'Notification worker {worker_id} started'))
+        # Load the Twitter tokens once at startup:
+        backend = get_syndication_backend()
+        if (isinstance(backend, TwitterSyndicationBackend)
+                and not Tweet().oauth):
+            self.stdout.write(self.style.WARNING(
+                'No Twitter tokens stored, tweets will fail until '
+                'python manage.py authorize_twitter is run'))
+
+        total_delivered = 0
+        total_failed = 0
+        try:
+            while True:
+                delivered, failed = process_batch(options['batch_size'],
+                                                  worker_id, options['kind'])
+                total_delivered += delivered
+                total_failed += failed
+                if delivered or failed:
+                    self.stdout.write(
+                        f'Delivered {delivered} jobs, {failed} failed')
+                    continue  # There may be more due jobs
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+
+        # Latency of the outbound integrations (Twitter, syndication stub):
+        for host, metrics in get_http_metrics().items():
+            self.stdout.write(f'HTTP {host}: {metrics}')
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nSummary: Delivered {total_delivered} jobs, '
+                f'{total_failed} failed attempts'
+            )
+        )
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from news_application.functions.local_twitter import LocalTwitterServer
+
+
+class Command(BaseCommand):
+    """Run a local HTTP stub of the Twitter media upload and tweet
+       endpoints. Point the StubSyndicationBackend at it to develop the
+       publishing pipeline without a Twitter account:
+       SYNDICATION_BACKEND=news_application.functions.syndication.StubSyndicationBackend
+       Usage:
+       python manage.py run_syndication_stub
+       To listen on another port:
+       python manage.py run_syndication_stub --port 9000
+    """
+    help = 'Run a local stub server for the syndication backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            default='127.0.0.1',
+            help='Interface to listen on',
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8081,
+            help='Port to listen on',
+        )
+
+    def handle(self, *args, **options):
+        server = LocalTwitterServer(options['host'], options['port'])
+        self.stdout.write(self.style.WARNING(
+            f'Syndication stub listening on {server.tweet_url}'))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSummary: Received {len(server.tweets)} posts'))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from news_application.functions.digests import send_digests
+from news_application.models import DigestFrequency
+
+
+class Command(BaseCommand):
+    """Email the hourly or daily digest of new articles to the readers who
+       chose digests instead of one email per article. Each reader gets one
+       email listing every article queued for them since their last digest.
+       Readers who switched back to one email per article get the articles
+       still queued for them with the next run of either frequency.
+       Usage:
+       python manage.py send_notification_digests --frequency HOURLY
+       To send the digests from cron at 5 past every hour and at 7am:
+       5 * * * * python manage.py send_notification_digests --frequency HOURLY
+       0 7 * * * python manage.py send_notification_digests --frequency DAILY
+    """
+    help = 'Send the hourly or daily new article digest emails'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--frequency',
+            required=True,
+            choices=[DigestFrequency.HOURLY, DigestFrequency.DAILY],
+            help='Which readers to send digests to',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=None,
+            help='Messages per chunk',
+        )
+
+    def handle(self, *args, **options):
+        report = send_digests(options['frequency'],
+                              chunk_size=options['chunk_size'])
+        for error in report.errors:
+            self.stdout.write(self.style.ERROR(error))
+        self.stdout.write(self.style.SUCCESS(
+            f'\nSummary: Sent {report.sent} {options["frequency"].lower()} '
+            f'digests in {report.seconds:.2f}s, {report.failed} failed'))
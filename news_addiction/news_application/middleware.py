@@ -0,0 +1,54 @@
+from .functions.compression import compress_response
+
+
+def get_user_role(user):
+    """Return the role of a user, or None for anonymous users.
+
+    The role is read from the User.role column, which is loaded together
+    with the user by AuthenticationMiddleware, so no query is needed.
+    """
+    if user is None or not user.is_authenticated:
+        return None
+    return getattr(user, "role", None)
+
+
+def get_request_role(request):
+    """Return the role resolved for a request by RoleMiddleware, or resolve
+    it from request.user if the middleware is not installed.
+    """
+    role = getattr(request, "role", None)
+    if role is None and hasattr(request, "user"):
+        role = get_user_role(request.user)
+    return role
+
+
+class RoleMiddleware():
+    """Resolve the role of the logged in user once per request and store it
+    as request.role (None for anonymous users). Must be placed after
+    AuthenticationMiddleware.
+
+    Anonymous requests cost no query; for logged in users the role comes
+    from the user row that authentication loads anyway.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.role = get_user_role(request.user)
+        return self.get_response(request)
+
+
+class CompressionMiddleware():
+    """Compress responses with the gzip, br or zstd content coding
+    negotiated with the Accept-Encoding header (br and zstd when the
+    brotli and zstandard packages are installed). See
+    functions.compression.compress_response(). Must be placed before any
+    middleware that reads or changes the response body.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return compress_response(request, self.get_response(request))
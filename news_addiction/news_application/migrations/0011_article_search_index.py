@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-17 09:00
+
+# Creates the full-text search index table for the active database vendor:
+# an FTS5 virtual table on SQLite, a FULLTEXT indexed table on MySQL.
+
+from django.db import migrations
+
+from news_application.functions.search import get_search_backend
+
+
+def create_search_index(apps, schema_editor):
+    get_search_backend(schema_editor.connection).create_index()
+
+
+def drop_search_index(apps, schema_editor):
+    get_search_backend(schema_editor.connection).drop_index()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_application', '0010_remove_article_published'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
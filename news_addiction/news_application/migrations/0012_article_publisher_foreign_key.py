@@ -0,0 +1,87 @@
+# Generated by Django 5.2.6 on 2026-10-17 09:00
+
+# Replaces the publisher GenericForeignKey of Article with a real foreign key
+# to Publisher plus a self_published flag. Existing rows are converted in
+# batches by primary key range.
+
+import django.db.models.deletion
+import news_application.models
+from django.db import migrations, models
+from django.db.models import F
+
+
+BATCH_SIZE = 1000
+
+
+def batches(queryset):
+    """Yield (start, end) primary key ranges covering the queryset."""
+    last_pk = queryset.order_by("-pk").values_list("pk", flat=True).first()
+    if last_pk is None:
+        return
+    for start in range(0, last_pk + 1, BATCH_SIZE):
+        yield start, start + BATCH_SIZE
+
+
+def get_content_type(apps, model):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    return ContentType.objects.filter(app_label="news_application",
+                                      model=model).first()
+
+
+def forwards(apps, schema_editor):
+    Article = apps.get_model("news_application", "Article")
+    Publisher = apps.get_model("news_application", "Publisher")
+    ct_publisher = get_content_type(apps, "publisher")
+    ct_user = get_content_type(apps, "user")
+
+    for start, end in batches(Article.objects.all()):
+        batch = Article.objects.filter(pk__gte=start, pk__lt=end)
+        if ct_publisher is not None:
+            batch.filter(
+                publisher_content_type=ct_publisher,
+                publisher_object_id__in=Publisher.objects.values("pk")
+            ).update(publisher_id=F("publisher_object_id"),
+                     self_published=False)
+        if ct_user is not None:
+            batch.filter(publisher_content_type=ct_user).update(
+                self_published=True)
+
+
+def backwards(apps, schema_editor):
+    Article = apps.get_model("news_application", "Article")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    ct_publisher, _ = ContentType.objects.get_or_create(
+        app_label="news_application", model="publisher")
+    ct_user, _ = ContentType.objects.get_or_create(
+        app_label="news_application", model="user")
+
+    for start, end in batches(Article.objects.all()):
+        batch = Article.objects.filter(pk__gte=start, pk__lt=end)
+        batch.filter(publisher__isnull=False).update(
+            publisher_content_type=ct_publisher,
+            publisher_object_id=F("publisher_id"))
+        batch.filter(self_published=True).update(
+            publisher_content_type=ct_user,
+            publisher_object_id=F("author_id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('news_application', '0011_article_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='self_published',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='publisher',
+            field=news_application.models.ArticlePublisherField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='articles', to='news_application.publisher'),
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
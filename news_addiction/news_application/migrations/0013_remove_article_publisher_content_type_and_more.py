@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-17 09:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_application', '0012_article_publisher_foreign_key'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='article',
+            name='publisher_content_type',
+        ),
+        migrations.RemoveField(
+            model_name='article',
+            name='publisher_object_id',
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:22
+
+import django.db.models.deletion
+import news_application.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+# The composite indexes are created before the single column foreign key
+# indexes are dropped, so the foreign keys are always backed by an index.
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_application', '0013_remove_article_publisher_content_type_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['publication_status', 'publication_date'], name='article_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['publisher', 'publication_status'], name='article_publisher_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['author', 'publication_status'], name='article_author_status_idx'),
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='author',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'role': 'JOURNALIST'}, on_delete=django.db.models.deletion.CASCADE, related_name='articles_authored', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='publisher',
+            field=news_application.models.ArticlePublisherField(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='articles', to='news_application.publisher'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:45
+
+# Adds the per-(article, recipient) notification ledger and makes the
+# notification jobs unique per (article, kind). Duplicate jobs queued by
+# resaves of published articles are removed before the constraint is added.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_jobs(apps, schema_editor):
+    """Keep the oldest job of each (article, kind)."""
+    NotificationJob = apps.get_model("news_application", "NotificationJob")
+    keep = (NotificationJob.objects.values("article", "kind")
+            .annotate(first_pk=Min("pk")).values_list("first_pk", flat=True))
+    NotificationJob.objects.exclude(pk__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_application', '0015_notificationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delivered_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(remove_duplicate_jobs,
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notificationjob',
+            constraint=models.UniqueConstraint(fields=('article', 'kind'), name='notification_job_unique'),
+        ),
+        migrations.AddField(
+            model_name='notificationdelivery',
+            name='article',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_deliveries', to='news_application.article'),
+        ),
+        migrations.AddField(
+            model_name='notificationdelivery',
+            name='recipient',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_deliveries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationdelivery',
+            constraint=models.UniqueConstraint(fields=('article', 'recipient'), name='notification_delivery_unique'),
+        ),
+    ]
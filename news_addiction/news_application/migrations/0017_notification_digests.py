@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_application', '0016_notification_delivery_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='readerprofile',
+            name='digest_frequency',
+            field=models.CharField(choices=[('IMMEDIATE', 'Immediately (one email per article)'), ('HOURLY', 'Hourly digest'), ('DAILY', 'Daily digest')], default='IMMEDIATE', max_length=25),
+        ),
+        migrations.CreateModel(
+            name='DigestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_items', to='news_application.article')),
+                ('reader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('reader', 'article'), name='digest_item_unique')],
+            },
+        ),
+    ]
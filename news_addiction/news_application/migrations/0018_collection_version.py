@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:33
+
+# Adds the collection version counters used for the ETag and
+# Last-Modified headers, starting the "articles" counter at the last
+# article change.
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def create_articles_version(apps, schema_editor):
+    Article = apps.get_model("news_application", "Article")
+    CollectionVersion = apps.get_model("news_application",
+                                       "CollectionVersion")
+    changed_at = Article.objects.aggregate(
+        changed_at=Max("updated_at"))["changed_at"]
+    CollectionVersion.objects.get_or_create(
+        name="articles",
+        defaults={"changed_at": changed_at or django.utils.timezone.now()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_application', '0017_notification_digests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CollectionVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(create_articles_version,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-17 05:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news_application', '0018_collection_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('article_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['updated_at'], name='article_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='articletombstone',
+            index=models.Index(fields=['deleted_at', 'article_id'], name='tombstone_deleted_at_idx'),
+        ),
+    ]
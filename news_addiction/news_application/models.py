@@ -1,13 +1,13 @@
-from django.db import models
+from django.db import models, transaction
 from phonenumber_field.modelfields import PhoneNumberField
 from django.contrib.auth.models import User, AbstractUser
 from django.db.models import Avg,Sum
-from django.contrib.contenttypes.fields import GenericForeignKey
-from django.contrib.contenttypes.models import ContentType
+from django.db.models.fields.related_descriptors import (
+    ForwardManyToOneDescriptor)
 import uuid
 from django.conf import settings
 from rest_framework import serializers
-from django.core.mail import EmailMessage
+from django.utils import timezone
 # Create your models here.
 
 class Roles(models.TextChoices):
@@ -15,6 +15,13 @@ class Roles(models.TextChoices):
     JOURNALIST = 'JOURNALIST', 'Journalist'
     EDITOR = 'EDITOR', 'Editor'
 
+# Each role has a matching permission group, kept in sync by the signals:
+ROLE_GROUPS = {
+    Roles.READER: "Readers",
+    Roles.JOURNALIST: "Journalists",
+    Roles.EDITOR: "Editors",
+}
+
 class ArticleStatus(models.TextChoices):
     DRAFT = 'DRAFT', 'Draft'
     PUBLISHED = 'PUBLISHED', 'Published'
@@ -65,27 +72,29 @@ class User(AbstractUser):
     
 # Each profile model has a one-to-one relationship with the User model.
 # These models hold the extra fields unique to that role.
+class DigestFrequency(models.TextChoices):
+    IMMEDIATE = 'IMMEDIATE', 'Immediately (one email per article)'
+    HOURLY = 'HOURLY', 'Hourly digest'
+    DAILY = 'DAILY', 'Daily digest'
+
 class ReaderProfile(models.Model):
     user = models.OneToOneField(settings.AUTH_USER_MODEL, 
                                 on_delete=models.CASCADE, 
                                 related_name="reader_profile")
+    # How new article notifications are emailed to the reader:
+    digest_frequency = models.CharField(
+        max_length=25,
+        choices=DigestFrequency.choices,
+        default=DigestFrequency.IMMEDIATE,
+    )
     
     def send_new_article_notification_email(self, article):
         """
         Send an email notification to the reader about a new
         article from a subscribed journalist or publisher.
         """
-        subject = f"New Article Published on News Addiction!: {article.title}"
-        user_email = self.user.email
-        domain_email = "example@domain.com"
-        body = (f"Hi {self.user.display_name},\n A new article has been "
-                f" published from an entity you subscribe to.\n\n")
-        body += f"Title: {article.title}\n"
-        body += f"Author: {article.author.display_name}\n"
-        body += f"Content: \n{article.content}\n\n"
-        body += f"View the article and more at News Addiction!.co.za\n"
-        email = EmailMessage(subject, body, domain_email, [user_email])
-        email.send()
+        from .functions.notifications import build_new_article_email
+        build_new_article_email(article, self.user).send()
 
 
 class JournalistProfile(models.Model):
@@ -144,6 +153,43 @@ class Publisher(models.Model):
     def __str__(self):
         return self.name
 
+class ArticleQuerySet(models.QuerySet):
+
+    def with_publishers(self):
+        """Join the author and publisher of every article in the queryset.
+
+        Publishers are a real foreign key, so both are loaded in the same
+        query as the articles.
+        """
+        return self.select_related("author", "publisher")
+
+
+class ArticlePublisherDescriptor(ForwardManyToOneDescriptor):
+    """Accessor for Article.publisher that keeps the behaviour of the old
+    publisher GenericForeignKey: a self-published article returns (and
+    accepts) its author, every other article returns its Publisher.
+    """
+
+    def __get__(self, instance, cls=None):
+        if instance is not None and instance.self_published:
+            return instance.author
+        return super().__get__(instance, cls)
+
+    def __set__(self, instance, value):
+        if isinstance(value, User):
+            # Self-published by the journalist:
+            instance.self_published = True
+            value = None
+        elif value is not None:
+            instance.self_published = False
+        super().__set__(instance, value)
+
+
+class ArticlePublisherField(models.ForeignKey):
+    """Foreign key to the Publisher that uses ArticlePublisherDescriptor."""
+    forward_related_accessor_class = ArticlePublisherDescriptor
+
+
 class Article(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
@@ -157,11 +203,13 @@ class Article(models.Model):
     
     image = models.ImageField(upload_to="article_images", blank=True,
                               null=True)
+    # Indexed by article_author_status_idx instead of a separate index:
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL, 
         on_delete=models.CASCADE,
         related_name="articles_authored",
-        limit_choices_to={'role': Roles.JOURNALIST}
+        limit_choices_to={'role': Roles.JOURNALIST},
+        db_index=False
     )
 
     category = models.CharField(
@@ -171,51 +219,58 @@ class Article(models.Model):
     )
     
 
-    # Generic Foreign Key for publisher (can be Publisher object if published
-    # through a Publisher or a JournalistProfile object if self-published)
-    publisher_content_type = models.ForeignKey(ContentType,
-                                               on_delete=models.CASCADE, 
-                                               null=True, 
-                                               blank=True)
-    publisher_object_id = models.PositiveIntegerField(null=True, blank=True)
-    publisher = GenericForeignKey('publisher_content_type',
-                                  'publisher_object_id')
+    # Publisher of the article. Self-published articles have no Publisher,
+    # instead self_published is set and article.publisher is the author.
+    # self_published must be declared before publisher so that
+    # Article(publisher=...) can set it. Indexed by
+    # article_publisher_status_idx instead of a separate index.
+    self_published = models.BooleanField(default=False)
+    publisher = ArticlePublisherField(Publisher,
+                                      on_delete=models.SET_NULL,
+                                      null=True,
+                                      blank=True,
+                                      related_name="articles",
+                                      db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ArticleQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # Reader feed: published articles, newest first.
+            models.Index(fields=["publication_status", "publication_date"],
+                         name="article_status_date_idx"),
+            # Editor views and the API: articles of a publisher.
+            models.Index(fields=["publisher", "publication_status"],
+                         name="article_publisher_status_idx"),
+            # Journalist article management: articles of an author.
+            models.Index(fields=["author", "publication_status"],
+                         name="article_author_status_idx"),
+            # Changes feed of the API: articles changed since a cursor.
+            models.Index(fields=["updated_at"],
+                         name="article_updated_at_idx"),
+        ]
 
-    @property
-    def self_published(self):
-        """ Return True if the article is self-published 
-        (i.e., published by the journalist themselves)
-
-        Returns:
-            bool: True if self-published, False otherwise
-        """
-        if hasattr(self.publisher, 'name'):
-            # It's a Publisher object
-            return False
-        elif hasattr(self.publisher, 'username'):
-            # It's a User object (self-published)
-            return True
-        else:
-            return "Not Published"
+    def save(self, *args, **kwargs):
+        # Autocommit would commit the row before post_save runs, so the
+        # signal handlers (the notification outbox, the search index, the
+        # collection version) get a transaction of their own with it:
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
 
     def get_publisher_name(self):
         """
         Return the appropriate publisher name based on the publisher object
         type.
         """
-        if not self.publisher:
+        if self.self_published:
+            # Self-published by the author:
+            return self.author.display_name
+
+        if self.publisher_id is None:
             return "No Publisher"
-        
-        if not self.self_published:
-            # It's a Publisher object
-            return self.publisher.name
-        else:
-            # It's a User object (self-published)
-            return self.publisher.display_name
+        return self.publisher.name
     
         
     @property
@@ -237,6 +292,157 @@ class ResetToken(models.Model):
     expiry_date = models.DateTimeField()
     used = models.BooleanField(default=False)
 
+class NotificationKind(models.TextChoices):
+    EMAIL_SUBSCRIBERS = 'EMAIL_SUBSCRIBERS', 'Email Subscribers'
+    TWEET = 'TWEET', 'Post on Twitter'
+
+class NotificationStatus(models.TextChoices):
+    PENDING = 'PENDING', 'Pending'
+    PROCESSING = 'PROCESSING', 'Processing'
+    DELIVERED = 'DELIVERED', 'Delivered'
+    FAILED = 'FAILED', 'Failed'
+
+
+class NotificationJob(models.Model):
+    """Outbox entry for a notification about a published article.
+
+    Jobs are written in the same transaction that publishes the article and
+    delivered later by the run_notification_worker management command.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE,
+                                related_name="notification_jobs")
+    kind = models.CharField(max_length=25, choices=NotificationKind.choices)
+    status = models.CharField(
+        max_length=25,
+        choices=NotificationStatus.choices,
+        default=NotificationStatus.PENDING,
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    # The job is not claimed before this time (used for retry backoff):
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=255, blank=True)
+    last_error = models.TextField(blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Worker: due jobs in the order they became available.
+            models.Index(fields=["status", "available_at"],
+                         name="notification_job_due_idx"),
+        ]
+        constraints = [
+            # Each notification is queued once per article, even if two
+            # saves publish it at the same time:
+            models.UniqueConstraint(fields=["article", "kind"],
+                                    name="notification_job_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} - {self.article} ({self.status})"
+
+
+class NotificationDelivery(models.Model):
+    """Ledger of the subscribers already emailed about an article.
+
+    A row is written for every recipient once their email is sent, so a
+    retried or resumed fan-out skips them.
+    """
+    article = models.ForeignKey(Article, on_delete=models.CASCADE,
+                                related_name="notification_deliveries")
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL,
+                                  on_delete=models.CASCADE,
+                                  related_name="notification_deliveries")
+    delivered_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["article", "recipient"],
+                                    name="notification_delivery_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.article} -> {self.recipient}"
+
+
+class DigestItem(models.Model):
+    """An article waiting to be included in a reader's next digest email.
+
+    Rows are written by the subscriber fan-out for readers who receive
+    digests and deleted once the digest has been sent.
+    """
+    reader = models.ForeignKey(settings.AUTH_USER_MODEL,
+                               on_delete=models.CASCADE,
+                               related_name="digest_items")
+    article = models.ForeignKey(Article, on_delete=models.CASCADE,
+                                related_name="digest_items")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # Also serves the rollup, which reads the items per reader:
+            models.UniqueConstraint(fields=["reader", "article"],
+                                    name="digest_item_unique"),
+        ]
+
+    def __str__(self):
+        return f"{self.article} -> {self.reader}"
+
+
+class CollectionVersion(models.Model):
+    """A counter bumped on every write to a collection, e.g. "articles".
+
+    HTTP validators (ETag, Last-Modified) of the pages listing the
+    collection are derived from it, so an unchanged poll is answered with
+    a primary key lookup instead of building the payload.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class ArticleTombstone(models.Model):
+    """Marks an article as deleted in the changes feed of the API, so API
+    consumers mirroring the articles can remove it.
+    """
+    article_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["deleted_at", "article_id"],
+                         name="tombstone_deleted_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"Article {self.article_id} deleted at {self.deleted_at}"
+
+
+class APIKey(models.Model):
+    """A revocable key for the article API, issued to a user.
+
+    Only the SHA-256 digest of the key is stored. The key itself is shown
+    once, when it is minted (see the api_keys command), and the prefix
+    identifies it afterwards.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL,
+                             on_delete=models.CASCADE,
+                             related_name="api_keys")
+    name = models.CharField(max_length=100, blank=True)
+    prefix = models.CharField(max_length=12, db_index=True)
+    digest = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.prefix} ({self.user})"
+
+
 class ArticleSerializer(serializers.ModelSerializer):
 
     author_display_name = serializers.CharField(source='author.display_name', 
@@ -1,10 +1,15 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import (pre_save, post_save, pre_delete,
+                                      post_delete)
 from django.dispatch import receiver
 from django.contrib.auth.models import Group, Permission
-from django.conf import settings
-from .models import (User, Roles, ReaderProfile, JournalistProfile, 
-                     EditorProfile, Article, ArticleStatus)
-from .functions.tweet import Tweet
+from .models import (User, Roles, ROLE_GROUPS, ReaderProfile,
+                     JournalistProfile, EditorProfile, Article, ArticleStatus,
+                     Publisher)
+from .functions.search import get_search_backend
+from .functions.notifications import enqueue_publish_notifications
+from .functions.conditional import bump_collection_version
+from .functions.changes import record_article_deletion, touch_articles
+from .functions.api_keys import clear_api_key_cache
 
 
 
@@ -42,6 +47,24 @@ def create_user_profile(sender, instance, created, **kwargs):
         group, _ = Group.objects.get_or_create(name="Editors")
         instance.groups.add(group)
 
+# Keep the group membership consistent with the role column, which is what
+# the views authorise against. Role changes after creation (e.g. through
+# the admin console) move the user to the matching group.
+@receiver(post_save, sender=User)
+def sync_role_group(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        return  # Handled by create_user_profile
+    if update_fields is not None and "role" not in update_fields:
+        return  # e.g. last_login updates on every login
+    role_group = ROLE_GROUPS.get(instance.role)
+    other_groups = [name for name in ROLE_GROUPS.values()
+                    if name != role_group]
+    instance.groups.remove(*Group.objects.filter(name__in=other_groups))
+    if role_group:
+        group, _ = Group.objects.get_or_create(name=role_group)
+        instance.groups.add(group)
+
+
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
     if instance.role == Roles.READER and hasattr(instance, 'reader_profile'):
@@ -53,36 +76,133 @@ def save_user_profile(sender, instance, **kwargs):
         instance.editor_profile.save()
 
 
+# Keep the full-text search index in sync with the articles. Only
+# published articles are indexed, so drafts never take up search results:
 @receiver(post_save, sender=Article)
-def notify_subscribers(sender, instance, **kwargs):
-    if not (instance.publication_status == ArticleStatus.PUBLISHED):
-        return  # Only notify on published articles
-
-    # Always notify subscribers of the author when an article is published:
-    subscribers = (
-        instance.author.journalist_profile.subscribers.all()
-    )
-
-    if not instance.self_published:
-        # If Published through a Publisher, also get publisher's subscribers
-        subscribers_publisher = instance.publisher.subscribers.all()
-        subscribers = subscribers | subscribers_publisher
-    # Send an email notification to each subscriber:
-    for subscriber in subscribers.distinct():
-        subscriber.reader_profile.send_new_article_notification_email(instance)
-
-    # Post the article on the sites Twitter account:
-    tweet_text = f"New Article Published on News Addiction!:\n"
-    tweet_text += f"Title: {instance.title}\n"
-    tweet_text += f"Author: {instance.author.display_name}\n"
-    tweet_text += f"Content: \n{instance.content}\n\n"
-    tweet_text += f"View the article and more at News Addiction!.co.za"
-    
-    if instance.image:
-        image_path = instance.image.path
+def update_search_index(sender, instance, **kwargs):
+    if instance.publication_status == ArticleStatus.PUBLISHED:
+        get_search_backend().index_article(instance)
     else:
-        image_path = None
-    # Skip tweeting during tests - user input required:
-    if getattr(settings, 'TESTING', False):
-        return  
-    Tweet._instance.make_tweet(tweet_text, image_path)
\ No newline at end of file
+        get_search_backend().remove_article(instance.pk)
+
+
+@receiver(post_delete, sender=Article)
+def remove_from_search_index(sender, instance, **kwargs):
+    get_search_backend().remove_article(instance.pk)
+
+
+@receiver(post_save, sender=Publisher)
+def update_publisher_search_index(sender, instance, created, **kwargs):
+    # The publisher name is part of each article's search document:
+    if created:
+        return
+    backend = get_search_backend()
+    articles = instance.articles.filter(
+        publication_status=ArticleStatus.PUBLISHED).with_publishers()
+    for article in articles.iterator(chunk_size=500):
+        backend.index_article(article)
+
+
+# Change the ETag and Last-Modified of the article listings on every write
+# to an article or to a publisher (whose name is part of the listings):
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Publisher)
+@receiver(post_delete, sender=Publisher)
+def bump_articles_version(sender, raw=False, **kwargs):
+    if not raw:
+        bump_collection_version()
+
+
+# Leave a tombstone in the changes feed of the API for every deleted
+# article, whether it is deleted by its journalist, an editor, the admin
+# console or with its author:
+@receiver(post_delete, sender=Article)
+def add_article_tombstone(sender, instance, **kwargs):
+    record_article_deletion(instance.pk)
+
+
+# Article records carry the names of their author and publisher, so
+# renaming either changes its articles in the changes feed. The stored
+# names are read before the save to detect a rename:
+RECORD_NAME_FIELDS = {
+    Publisher: ("name",),
+    User: ("username", "display_name"),
+}
+
+
+@receiver(pre_save, sender=Publisher)
+@receiver(pre_save, sender=User)
+def detect_rename(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._renamed = False
+    fields = RECORD_NAME_FIELDS[sender]
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return  # e.g. last_login updates on every login
+    stored = sender.objects.filter(pk=instance.pk).values_list(
+        *fields).first()
+    instance._renamed = (stored is not None and stored != tuple(
+        getattr(instance, field) for field in fields))
+
+
+@receiver(post_save, sender=Publisher)
+def touch_renamed_publisher_articles(sender, instance, **kwargs):
+    if getattr(instance, "_renamed", False):
+        instance._renamed = False
+        touch_articles(Article.objects.filter(publisher=instance))
+
+
+@receiver(post_save, sender=User)
+def touch_renamed_author_articles(sender, instance, **kwargs):
+    if getattr(instance, "_renamed", False):
+        instance._renamed = False
+        touch_articles(Article.objects.filter(author=instance))
+
+
+# Verified API keys are cached with their user, so forget them when a user
+# is deactivated or deleted. Other processes only notice once their cached
+# result expires (see verify_api_key()):
+@receiver(post_save, sender=User)
+def forget_deactivated_user_keys(sender, instance, **kwargs):
+    if not instance.is_active:
+        clear_api_key_cache()
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user_keys(sender, instance, **kwargs):
+    clear_api_key_cache()
+
+
+# Deleting a publisher sets the publisher of its articles to NULL with an
+# UPDATE that does not change updated_at, so touch them first:
+@receiver(pre_delete, sender=Publisher)
+def touch_deleted_publisher_articles(sender, instance, **kwargs):
+    touch_articles(Article.objects.filter(publisher=instance))
+
+
+# Notify subscribers only when an article becomes published, not on every
+# later save (editor tweaks, resaves) of a published article. The stored
+# status is read before the save to detect the transition:
+@receiver(pre_save, sender=Article)
+def detect_publish_transition(sender, instance, raw=False, **kwargs):
+    instance._publishing = False
+    if raw or instance.publication_status != ArticleStatus.PUBLISHED:
+        return
+    previous_status = None
+    if instance.pk is not None:
+        previous_status = Article.objects.filter(pk=instance.pk).values_list(
+            "publication_status", flat=True).first()
+    instance._publishing = previous_status != ArticleStatus.PUBLISHED
+
+
+@receiver(post_save, sender=Article)
+def notify_subscribers(sender, instance, **kwargs):
+    if not getattr(instance, "_publishing", False):
+        return  # Only notify when the article is being published
+    instance._publishing = False
+
+    # Queue the subscriber emails and the tweet in the notification outbox.
+    # They are delivered by the run_notification_worker command, so
+    # publishing does not wait on the SMTP server or on Twitter:
+    enqueue_publish_notifications(instance)
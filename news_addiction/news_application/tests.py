@@ -1,24 +1,80 @@
 from datetime import timedelta
 import io
+import csv
 import json
 import base64
+import gzip
+from xml.etree import ElementTree
 from django.utils import timezone
-from django.test import TestCase, Client
+from django.test import (TestCase, Client, RequestFactory,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from .models import (Publisher, Article, ResetToken, User, Roles, 
                      ReaderProfile, JournalistProfile, EditorProfile,
-                     ArticleCategory, ArticleStatus)
+                     ArticleCategory, ArticleStatus, NotificationJob,
+                     NotificationKind, NotificationStatus,
+                     NotificationDelivery, DigestFrequency, DigestItem,
+                     ArticleSerializer, APIKey)
 from datetime import date
-from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
+from django.http import HttpResponse, JsonResponse
 from django.contrib.auth.models import Group
 from django.core.files.uploadedfile import SimpleUploadedFile
 from PIL import Image
 
 from .views import generate_reset_url, build_email_reset_password
+from .middleware import CompressionMiddleware
+from .functions.search import get_search_backend
+from .functions.export import StreamingXMLRenderer
+from .functions.api_keys import (clear_api_key_cache, hash_api_key,
+                                 mint_api_key)
+from .functions.compression import (choose_encoding,
+                                    get_compression_metrics,
+                                    reset_compression_metrics)
+from rest_framework_xml.renderers import XMLRenderer
+from django.core.management import call_command
+from .management.commands.check_query_plans import used_indexes
+from .functions import notifications
+from .functions.local_smtp import LocalSMTPServer
+from unittest.mock import patch, Mock
+import os
+import shutil
+import tempfile
+from .functions.token_store import EncryptedTokenStore
+from .functions.tweet import (Tweet, TwitterNotAuthorised, TwitterRateLimited,
+                              file_sha256)
+from .functions.local_twitter import LocalTwitterServer
+from .functions import syndication
+from .functions import digests
+from .functions import rendering
+from .functions import http_client
+import socket
+from django.core.cache import cache, caches
+import requests
+from django.core import mail
 
 # Create your tests here.
 
 
+# The factories upload images, so point MEDIA_ROOT at a throwaway directory
+# for the whole module instead of the media directory of the tree:
+media_root = None
+media_override = None
+
+
+def setUpModule():
+    global media_root, media_override
+    media_root = tempfile.mkdtemp()
+    media_override = override_settings(MEDIA_ROOT=media_root)
+    media_override.enable()
+
+
+def tearDownModule():
+    media_override.disable()
+    shutil.rmtree(media_root, ignore_errors=True)
+
+
 class UserFactory:
     """Factory class to create test users easily"""
     
@@ -222,6 +278,97 @@ class TestArticleModel(TestCase):
         self.assertIsNotNone(article.updated_at)
 
 
+class TestArticleWithPublishers(TestCase):
+    """Test loading the article publishers"""
+
+    def setUp(self):
+        self.journalist = UserFactory.create_journalist()
+        self.publisher = PublisherFactory.create_publisher()
+        for index in range(3):
+            ArticleFactory.create_article(title=f"Publisher Article {index}",
+                                          author=self.journalist,
+                                          publisher=self.publisher)
+            ArticleFactory.create_article(title=f"Self Article {index}",
+                                          author=self.journalist,
+                                          publisher=self.journalist)
+
+    def test_with_publishers_query_count(self):
+        """Test that publishers are joined into the article query"""
+        with self.assertNumQueries(1):
+            names = [article.get_publisher_name()
+                     for article in Article.objects.with_publishers()]
+        self.assertEqual(names.count(self.publisher.name), 3)
+        self.assertEqual(names.count(self.journalist.display_name), 3)
+
+    def test_with_publishers_self_published(self):
+        """Test that self_published is stored on the article"""
+        articles = list(Article.objects.with_publishers())
+        with self.assertNumQueries(0):
+            self_published = [article.self_published for article in articles]
+            publishers = [article.publisher for article in articles]
+        self.assertEqual(self_published.count(True), 3)
+        self.assertEqual(self_published.count(False), 3)
+        # Self-published articles return the author as their publisher:
+        self.assertEqual(publishers.count(self.journalist), 3)
+        self.assertEqual(publishers.count(self.publisher), 3)
+
+    def test_publisher_assignment(self):
+        """Test that assigning a publisher updates self_published"""
+        article = Article(title="Assigned", content="Content",
+                          author=self.journalist, publisher=self.journalist)
+        self.assertTrue(article.self_published)
+        self.assertIsNone(article.publisher_id)
+
+        article.publisher = self.publisher
+        self.assertFalse(article.self_published)
+        self.assertEqual(article.publisher_id, self.publisher.id)
+
+    def test_publisher_filter_is_a_join(self):
+        """Test that filtering by publisher name needs a single query"""
+        with self.assertNumQueries(1):
+            articles = list(Article.objects.filter(
+                publisher__name=self.publisher.name))
+        self.assertEqual(len(articles), 3)
+
+
+class TestCheckQueryPlans(TestCase):
+    """Test the check_query_plans management command"""
+
+    def test_canonical_queries_use_their_indexes(self):
+        """Test that every canonical query uses its expected index"""
+        journalist = UserFactory.create_journalist()
+        publisher = PublisherFactory.create_publisher()
+        ArticleFactory.create_article(author=journalist, publisher=publisher)
+
+        out = io.StringIO()
+        call_command("check_query_plans", stdout=out)
+        self.assertNotIn("FAIL", out.getvalue())
+        self.assertIn("All queries use their expected indexes",
+                      out.getvalue())
+
+    def test_used_indexes_mysql_json_plan(self):
+        """Test that only the chosen key of a MySQL JSON plan is reported"""
+        plan = json.dumps({"query_block": {"table": {
+            "table_name": "news_application_article",
+            "possible_keys": ["article_status_date_idx",
+                              "article_author_status_idx"],
+            "key": "article_author_status_idx",
+        }}})
+        self.assertEqual(used_indexes(plan, "mysql"),
+                         {"article_author_status_idx"})
+
+    def test_used_indexes_text_plan(self):
+        """Test index names in SQLite and PostgreSQL text plans"""
+        self.assertEqual(
+            used_indexes("SEARCH t USING INDEX article_status_date_idx "
+                         "(publication_status=?)", "sqlite"),
+            {"article_status_date_idx"})
+        self.assertEqual(
+            used_indexes("Index Scan using article_author_status_idx on t",
+                         "postgresql"),
+            {"article_author_status_idx"})
+
+
 class TestResetTokenModel(TestCase):
     def setUp(self):
         # Create a user object:
@@ -402,6 +549,71 @@ class TestLoginView(TestCase):
         self.assertEqual(response.context['page_title'], 'Login')
 
 
+class TestRoleResolution(TestCase):
+    """Test role based access control without group queries"""
+
+    def setUp(self):
+        self.reader = UserFactory.create_reader(username="test_reader")
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist")
+        self.client = Client()
+
+    def assertNoGroupQueries(self, queries):
+        group_queries = [query["sql"] for query in queries.captured_queries
+                         if "auth_group" in query["sql"]]
+        self.assertEqual(group_queries, [])
+
+    def test_protected_view_does_not_query_groups(self):
+        """Test that authorising a request does not query the groups"""
+        self.client.login(username="test_reader", password="testpass123")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('reader_start_page'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.role, Roles.READER)
+        self.assertNoGroupQueries(queries)
+
+    def test_wrong_role_redirects_to_login(self):
+        """Test that a user without the required role is redirected"""
+        self.client.login(username="test_journalist", password="testpass123")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('reader_start_page'))
+        self.assertRedirects(
+            response,
+            f"{reverse('login_page')}?next={reverse('reader_start_page')}",
+            fetch_redirect_response=False
+        )
+        self.assertNoGroupQueries(queries)
+
+    def test_anonymous_request_has_no_role(self):
+        """Test that anonymous requests resolve to no role"""
+        response = self.client.get(reverse('login_page'))
+        self.assertIsNone(response.wsgi_request.role)
+
+    def test_login_redirect_does_not_query_groups(self):
+        """Test that the login redirect is chosen from the role"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('login_page'), {
+                "username": "test_journalist",
+                "password": "testpass123"
+            })
+        self.assertRedirects(response, reverse('journalist_start_page'),
+                             fetch_redirect_response=False)
+        self.assertNoGroupQueries(queries)
+
+    def test_role_change_updates_groups(self):
+        """Test that changing the role moves the user to the role group"""
+        self.reader.role = Roles.EDITOR
+        self.reader.save()
+        groups = set(self.reader.groups.values_list("name", flat=True))
+        self.assertEqual(groups, {"Editors"})
+
+    def test_login_does_not_change_groups(self):
+        """Test that last_login updates leave the groups alone"""
+        self.client.login(username="test_reader", password="testpass123")
+        groups = set(self.reader.groups.values_list("name", flat=True))
+        self.assertEqual(groups, {"Readers"})
+
+
 class TestPasswordReset(TestCase):
     """Test cases for password reset functionality"""
     
@@ -827,10 +1039,8 @@ class TestEditorViews(TestCase):
         # Log in as editor
         self.client.login(username="test_editor", password="testpass123")
         
-        # Assign article to the publisher via content type
-        publisher_content_type = ContentType.objects.get_for_model(Publisher)
-        self.test_article.publisher_content_type = publisher_content_type
-        self.test_article.publisher_object_id = self.publisher.pk
+        # Assign article to the publisher
+        self.test_article.publisher = self.publisher
         self.test_article.publication_status = ArticleStatus.DRAFT
         self.test_article.save()
         
@@ -951,10 +1161,8 @@ class TestEditorViews(TestCase):
         # Log in as editor
         self.client.login(username="test_editor", password="testpass123")
         
-        # Assign article to publisher
-        publisher_content_type = ContentType.objects.get_for_model(Publisher)
-        self.test_article.publisher_content_type = publisher_content_type
-        self.test_article.publisher_object_id = self.publisher.pk
+        # Assign article to the publisher
+        self.test_article.publisher = self.publisher
         self.test_article.save()
         
         # Create another article not assigned to this publisher
@@ -982,10 +1190,8 @@ class TestEditorViews(TestCase):
         # Log in as editor
         self.client.login(username="test_editor", password="testpass123")
         
-        # Assign article to publisher
-        publisher_content_type = ContentType.objects.get_for_model(Publisher)
-        self.test_article.publisher_content_type = publisher_content_type
-        self.test_article.publisher_object_id = self.publisher.pk
+        # Assign article to the publisher
+        self.test_article.publisher = self.publisher
         self.test_article.publication_status = ArticleStatus.AWAITING_APPROVAL
         self.test_article.save()
         
@@ -1013,6 +1219,59 @@ class TestEditorViews(TestCase):
             ArticleStatus.REJECTED
         )
 
+    def test_editor_delete_redirects_to_the_publisher(self):
+        """Test deleting an article returns to its publisher's articles"""
+        self.client.login(username="test_editor", password="testpass123")
+        self.test_article.publisher = self.publisher
+        self.test_article.save()
+
+        response = self.client.post(
+            reverse('editor_article_delete_page', args=[self.test_article.pk])
+        )
+
+        self.assertRedirects(response, reverse(
+            'editor_article_management_page', args=[self.publisher.pk]),
+            fetch_redirect_response=False)
+        self.assertFalse(
+            Article.objects.filter(pk=self.test_article.pk).exists())
+
+    def test_editor_delete_without_publisher(self):
+        """Test deleting a self-published article or one without a
+        publisher returns to the editor start page"""
+        self.client.login(username="test_editor", password="testpass123")
+        self_published = ArticleFactory.create_article(
+            author=self.journalist, publisher=self.journalist)
+        self.test_article.publisher = None
+        self.test_article.save()
+
+        for article in (self_published, self.test_article):
+            response = self.client.post(
+                reverse('editor_article_delete_page', args=[article.pk])
+            )
+
+            self.assertRedirects(response, reverse('editor_start_page'),
+                                 fetch_redirect_response=False)
+            self.assertFalse(Article.objects.filter(pk=article.pk).exists())
+
+    def test_editor_reviews_self_published_article(self):
+        """Test rejecting and accepting a self-published article returns
+        to the editor start page"""
+        self.client.login(username="test_editor", password="testpass123")
+        article = ArticleFactory.create_article(
+            author=self.journalist, publisher=self.journalist)
+
+        for url_name, status in (
+                ('editor_article_reject_for_publication_page',
+                 ArticleStatus.REJECTED),
+                ('editor_article_accept_for_publication_page',
+                 ArticleStatus.PUBLISHED)):
+            response = self.client.get(reverse(url_name, args=[article.pk]))
+
+            self.assertRedirects(response, reverse('editor_start_page'),
+                                 fetch_redirect_response=False)
+            article.refresh_from_db()
+            self.assertEqual(article.publication_status, status)
+
 
 class TestReaderViews(TestCase):
     """Test all reader-related views and functionality"""
@@ -1064,6 +1323,20 @@ class TestReaderViews(TestCase):
             ArticleStatus.PUBLISHED
         )
         self.self_published_article.save()
+
+        # Publish the publisher articles, readers only see published ones:
+        for article in (self.article1, self.article2):
+            article.publication_status = ArticleStatus.PUBLISHED
+            article.publication_date = timezone.now()
+            article.save()
+
+        # Draft article that should never be shown to readers:
+        self.draft_article = ArticleFactory.create_article(
+            title="Draft Article",
+            content="Content for draft article",
+            author=self.journalist,
+            publisher=self.publisher
+        )
         
         self.client = Client()
     
@@ -1077,12 +1350,15 @@ class TestReaderViews(TestCase):
         
         # Check response
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, "Search articles by title...")
+        self.assertContains(response, "Search articles by title, content, "
+                            "author or publisher...")
         self.assertContains(response, "Welcome to News Addiction! - "
                             "All the Latest News at Your Fingertips"
                     )
         self.assertIn('articles', response.context)
-        self.assertEqual(len(response.context['articles']), 3)  # All articles
+        # All published articles:
+        self.assertEqual(len(response.context['articles']), 3)
+        self.assertNotContains(response, "Draft Article")
     
     def test_reader_start_view_unauthenticated(self):
         """Test that unauthenticated users cannot access reader start view"""
@@ -1123,8 +1399,46 @@ class TestReaderViews(TestCase):
         
         # Check response
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.context['articles']), 3)  # All articles
+        # All published articles:
+        self.assertEqual(len(response.context['articles']), 3)
         self.assertEqual(response.context['search_query'], '')
+
+    @override_settings(READER_FEED_PAGE_SIZE=2)
+    def test_reader_start_view_pagination(self):
+        """Test that the reader feed pages through articles with a cursor"""
+        self.client.login(username="test_reader", password="testpass123")
+
+        response = self.client.get(reverse('reader_start_page'))
+        self.assertEqual(response.status_code, 200)
+        first_page = response.context['articles']
+        self.assertEqual(len(first_page), 2)
+        self.assertIsNotNone(response.context['next_cursor'])
+
+        response = self.client.get(
+            reverse('reader_start_page'),
+            {'after': response.context['next_cursor']}
+        )
+        self.assertEqual(response.status_code, 200)
+        second_page = response.context['articles']
+        self.assertEqual(len(second_page), 1)
+        self.assertIsNone(response.context['next_cursor'])
+
+        # Every published article is shown exactly once across the pages:
+        article_ids = [article.id for article in first_page + second_page]
+        self.assertCountEqual(article_ids, [self.article1.id,
+                                            self.article2.id,
+                                            self.self_published_article.id])
+
+    def test_reader_start_view_invalid_cursor(self):
+        """Test that an invalid cursor returns the first page"""
+        self.client.login(username="test_reader", password="testpass123")
+
+        response = self.client.get(
+            reverse('reader_start_page'),
+            {'after': 'not-a-valid-cursor'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['articles']), 3)
     
     def test_reader_view_article(self):
         """Test that readers can view individual articles"""
@@ -1186,10 +1500,8 @@ class TestReaderViews(TestCase):
         # Log in as reader
         self.client.login(username="test_reader", password="testpass123")
         
-        # Set up content type for publisher
-        publisher_content_type = ContentType.objects.get_for_model(Publisher)
-        self.article1.publisher_content_type = publisher_content_type
-        self.article1.publisher_object_id = self.publisher.id
+        # Set up the publisher of the article
+        self.article1.publisher = self.publisher
         self.article1.save()
         
         # GET request to view publisher details
@@ -1362,148 +1674,1245 @@ class TestReaderViews(TestCase):
         self.assertEqual(response.status_code, 302)
 
 
-class APIGetArticlesTestCase(TestCase):
-    """Test cases for the API_get_articles view"""
-    
+class TestArticleSearch(TestCase):
+    """Test the full-text article search index and the reader search"""
+
     def setUp(self):
-        """Set up test data"""
-        # Create test users
-        self.journalist1 = UserFactory.create_journalist(
-            username="test_journalist_1",
-            email="journalist1@test.com"
-        )
-        self.journalist2 = UserFactory.create_journalist(
-            username="test_journalist_2", 
-            email="journalist2@test.com"
-        )
-        
-        # Create test publishers
-        self.publisher1 = PublisherFactory.create_publisher(
-            name="Test Publisher 1",
-            description="First test publisher"
-        )
-        self.publisher2 = PublisherFactory.create_publisher(
-            name="Test Publisher 2", 
-            description="Second test publisher"
+        self.reader = UserFactory.create_reader(username="test_reader")
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist",
+            display_name="Jane Columnist"
         )
-        
-        # Create test articles
-        self.article1 = Article.objects.create(
-            title="Article by Journalist 1",
-            content="Content of article by journalist 1",
-            author=self.journalist1,
-            publisher=self.publisher1,
-            category=ArticleCategory.POLITICS,
-            publication_status=ArticleStatus.PUBLISHED
+        self.publisher = PublisherFactory.create_publisher(
+            name="Daily Planet"
         )
-        
-        self.article2 = Article.objects.create(
-            title="Another Article by Journalist 1", 
-            content="More content by journalist 1",
-            author=self.journalist1,
-            publisher=self.publisher2,
-            category=ArticleCategory.SPORTS,
-            publication_status=ArticleStatus.PUBLISHED
+        self.article = ArticleFactory.create_article(
+            title="Election Results",
+            content="Voters turned out in record numbers",
+            author=self.journalist,
+            publisher=self.publisher
         )
-        
-        self.article3 = Article.objects.create(
-            title="Article by Journalist 2",
-            content="Content by journalist 2",
-            author=self.journalist2,
-            publisher=self.publisher1,
-            category=ArticleCategory.TECHNOLOGY,
-            publication_status=ArticleStatus.PUBLISHED
+        self.other_article = ArticleFactory.create_article(
+            title="Rugby Final",
+            content="The home team won the cup",
+            author=UserFactory.create_journalist(
+                username="other_journalist",
+                display_name="Sam Sportswriter"
+            ),
+            publisher=self.journalist
         )
-        
-        # Create a test user for API authentication
-        self.api_user = self.journalist1
-        
+        for article in (self.article, self.other_article):
+            article.publication_status = ArticleStatus.PUBLISHED
+            article.publication_date = timezone.now()
+            article.save()
+
+        self.backend = get_search_backend()
         self.client = Client()
-        
-    def test_api_get_articles_with_specific_author(self):
-        """Test API request to get articles by a specific author"""
-        # Authenticate the request
-        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
-        # Make API request with specific author name
-        response = self.client.get(
-            '/get/articles/',
-            {'author_name': 'test_journalist_1'},
-            HTTP_AUTHORIZATION=f'Basic {credentials}'
-        )
-        
-        # Check response status
+
+    def test_search_matches_title_prefix(self):
+        """Test that search terms match word prefixes in the title"""
+        self.assertEqual(self.backend.search("Elect"), [self.article.id])
+
+    def test_search_matches_content(self):
+        """Test that the article content is searched"""
+        self.assertEqual(self.backend.search("record numbers"),
+                         [self.article.id])
+
+    def test_search_matches_author_and_publisher(self):
+        """Test that the author display name and publisher are searched"""
+        self.assertEqual(self.backend.search("Sportswriter"),
+                         [self.other_article.id])
+        self.assertEqual(self.backend.search("Daily Planet"),
+                         [self.article.id])
+
+    def test_search_ignores_operators(self):
+        """Test that search operators in the query are not interpreted"""
+        self.assertEqual(self.backend.search('"Rugby" -(cup*'),
+                         [self.other_article.id])
+        self.assertEqual(self.backend.search('"*()'), [])
+
+    def test_search_index_follows_article_changes(self):
+        """Test that the index is updated on article save and delete"""
+        self.article.title = "Budget Speech"
+        self.article.save()
+        self.assertEqual(self.backend.search("Election"), [])
+        self.assertEqual(self.backend.search("Budget"), [self.article.id])
+
+        self.article.delete()
+        self.assertEqual(self.backend.search("Budget"), [])
+
+    def test_search_index_follows_publisher_rename(self):
+        """Test that renaming a publisher updates its articles"""
+        self.publisher.name = "Evening Star"
+        self.publisher.save()
+        self.assertEqual(self.backend.search("Planet"), [])
+        self.assertEqual(self.backend.search("Evening"), [self.article.id])
+
+    def test_rebuild_search_index_command(self):
+        """Test that the rebuild command backfills the index"""
+        self.backend.clear()
+        self.assertEqual(self.backend.search("Rugby"), [])
+
+        out = io.StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Indexed 2 articles", out.getvalue())
+        self.assertEqual(self.backend.search("Rugby"),
+                         [self.other_article.id])
+
+    def test_reader_search_by_content(self):
+        """Test that the reader start page searches the article content"""
+        self.client.login(username="test_reader", password="testpass123")
+        response = self.client.get(reverse('reader_start_page'),
+                                   {'search': 'cup'})
         self.assertEqual(response.status_code, 200)
-        
-        # Parse JSON response
-        response_data = json.loads(response.content)
-        
-        # Should return 2 articles by test_journalist_1
-        self.assertEqual(len(response_data), 2)
-        
-        # Check that all returned articles are by the correct author
-        for article_data in response_data:
-            self.assertEqual(article_data['author_user_name'], 'test_journalist_1')
-            
-        # Check specific article titles are included
-        article_titles = [article['title'] for article in response_data]
-        self.assertIn("Article by Journalist 1", article_titles)
-        self.assertIn("Another Article by Journalist 1", article_titles)
-        
-    def test_api_get_articles_with_nonexistent_author(self):
-        """Test API request with an author that doesn't exist"""
-        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
-        
-        response = self.client.get(
-            '/get/articles/',
-            {'author_name': 'nonexistent_author'},
-            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        self.assertEqual(list(response.context['articles']),
+                         [self.other_article])
+
+    @override_settings(READER_FEED_PAGE_SIZE=1)
+    def test_reader_search_keeps_rank_order(self):
+        """Test search results are paged most relevant first, not newest
+        first"""
+        newer = ArticleFactory.create_article(
+            title="Match Report",
+            content="A report on the rugby",
+            author=self.journalist,
+            publisher=self.publisher
         )
-        
-        self.assertEqual(response.status_code, 200)
-        response_data = json.loads(response.content)
-        
-        # Should return empty list
-        self.assertEqual(len(response_data), 0)
-        
-    def test_api_get_articles_without_authentication(self):
-        """Test API request without authentication should fail"""
+        newer.publication_status = ArticleStatus.PUBLISHED
+        newer.publication_date = timezone.now() + timedelta(days=1)
+        newer.save()
+        self.assertEqual(self.backend.search("rugby"),
+                         [self.other_article.id, newer.id])
+
+        self.client.login(username="test_reader", password="testpass123")
+        response = self.client.get(reverse('reader_start_page'),
+                                   {'search': 'rugby'})
+        self.assertEqual(list(response.context['articles']),
+                         [self.other_article])
+
         response = self.client.get(
-            '/get/articles/',
-            {'author_name': 'test_journalist_1'}
+            reverse('reader_start_page'),
+            {'search': 'rugby', 'after': response.context['next_cursor']})
+        self.assertEqual(list(response.context['articles']), [newer])
+        self.assertIsNone(response.context['next_cursor'])
+
+    @override_settings(SEARCH_MAX_RESULTS=1)
+    def test_drafts_are_not_indexed(self):
+        """Test drafts cannot use up the search results of published
+        articles"""
+        draft = ArticleFactory.create_article(
+            title="Election Results Draft",
+            content="Election Election Election",
+            author=self.journalist,
+            publisher=self.publisher
         )
-        
-        # Should return 401 Unauthorized
-        self.assertEqual(response.status_code, 401)
-        
-    def test_api_get_articles_all_articles(self):
-        """Test API request to get all articles (no filter)"""
-        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
-        
-        response = self.client.get(
-            '/get/articles/',
-            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        self.assertEqual(self.backend.search("Election"), [self.article.id])
+
+        self.article.publication_status = ArticleStatus.DRAFT
+        self.article.save()
+        self.assertEqual(self.backend.search("Election"), [])
+
+        self.client.login(username="test_reader", password="testpass123")
+        draft.publication_status = ArticleStatus.PUBLISHED
+        draft.publication_date = timezone.now()
+        draft.save()
+        response = self.client.get(reverse('reader_start_page'),
+                                   {'search': 'Election'})
+        self.assertEqual(list(response.context['articles']), [draft])
+
+
+class TestNotificationOutbox(TestCase):
+    """Test the notification outbox and the run_notification_worker command"""
+
+    def setUp(self):
+        self.reader = UserFactory.create_reader(username="test_reader")
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist"
         )
-        
-        self.assertEqual(response.status_code, 200)
-        response_data = json.loads(response.content)
-        
-        # Should return all 3 articles
-        self.assertEqual(len(response_data), 3)
-        
-    def test_api_get_articles_with_publisher_filter(self):
-        """Test API request to get articles by publisher"""
-        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
-        
-        response = self.client.get(
-            '/get/articles/',
-            {'publisher_name': 'Test Publisher 1'},
-            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        self.journalist.journalist_profile.subscribers.add(self.reader)
+        self.article = ArticleFactory.create_article(
+            author=self.journalist
         )
-        
-        self.assertEqual(response.status_code, 200)
-        response_data = json.loads(response.content)
-        
-        # Should return 2 articles from Test Publisher 1
+
+    def publish(self):
+        self.article.publication_status = ArticleStatus.PUBLISHED
+        self.article.save()
+
+    def test_publishing_queues_jobs_without_sending(self):
+        """Test publishing writes the outbox jobs and sends nothing yet"""
+        self.publish()
+
+        jobs = NotificationJob.objects.filter(article=self.article)
+        self.assertEqual(
+            set(jobs.values_list("kind", flat=True)),
+            {NotificationKind.EMAIL_SUBSCRIBERS, NotificationKind.TWEET}
+        )
+        self.assertTrue(all(job.status == NotificationStatus.PENDING
+                            for job in jobs))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_failed_enqueue_rolls_back_publication(self):
+        """Test the article is not published if its jobs cannot be queued"""
+        with patch("news_application.signals.enqueue_publish_notifications",
+                   side_effect=RuntimeError("outbox unavailable")):
+            with self.assertRaises(RuntimeError):
+                self.publish()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.publication_status,
+                         ArticleStatus.DRAFT)
+        self.assertFalse(NotificationJob.objects.exists())
+
+    def test_unpublished_article_queues_no_jobs(self):
+        """Test saving a draft does not queue notifications"""
+        self.assertFalse(NotificationJob.objects.exists())
+
+    def test_worker_delivers_jobs(self):
+        """Test the worker sends the emails and marks the jobs delivered"""
+        self.publish()
+        out = io.StringIO()
+
+        call_command("run_notification_worker", once=True, stdout=out)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [self.reader.email])
+        for job in NotificationJob.objects.all():
+            self.assertEqual(job.status, NotificationStatus.DELIVERED)
+            self.assertEqual(job.attempts, 1)
+            self.assertIsNotNone(job.delivered_at)
+        self.assertIn("Delivered 2 jobs", out.getvalue())
+
+        # Delivered jobs are not claimed again:
+        self.assertEqual(notifications.process_batch(), (0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        """Test a failed delivery goes back to pending with a delay"""
+        self.publish()
+        before = timezone.now()
+
+        with patch.dict(notifications.DELIVERY_HANDLERS, {
+                NotificationKind.EMAIL_SUBSCRIBERS: self.fail_delivery}):
+            self.assertEqual(notifications.process_batch(), (1, 1))
+
+        job = NotificationJob.objects.get(
+            kind=NotificationKind.EMAIL_SUBSCRIBERS)
+        self.assertEqual(job.status, NotificationStatus.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("SMTP server unavailable", job.last_error)
+        self.assertGreaterEqual(job.available_at,
+                                before + timedelta(seconds=30))
+        self.assertEqual(job.locked_by, "")
+
+        # Not due yet, so the next batch leaves it alone:
+        self.assertEqual(notifications.process_batch(), (0, 0))
+
+    @override_settings(NOTIFICATION_MAX_ATTEMPTS=2)
+    def test_job_fails_after_max_attempts(self):
+        """Test a job is marked failed once it runs out of attempts"""
+        self.publish()
+        job = NotificationJob.objects.get(
+            kind=NotificationKind.EMAIL_SUBSCRIBERS)
+        job.attempts = 1
+        job.save()
+
+        with patch.dict(notifications.DELIVERY_HANDLERS, {
+                NotificationKind.EMAIL_SUBSCRIBERS: self.fail_delivery}):
+            notifications.process_batch()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, NotificationStatus.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_processing_job_is_reclaimed(self):
+        """Test jobs left locked by a stopped worker are claimed again"""
+        self.publish()
+        NotificationJob.objects.update(
+            status=NotificationStatus.PROCESSING,
+            locked_at=timezone.now() - timedelta(hours=1),
+            locked_by="crashed-worker",
+        )
+
+        claimed = notifications.claim_jobs(10, "new-worker")
+
+        self.assertEqual(len(claimed), 2)
+        self.assertTrue(all(job.locked_by == "new-worker"
+                            for job in claimed))
+
+    def test_retry_delay_is_capped(self):
+        """Test the retry backoff doubles and is capped"""
+        self.assertEqual(notifications.retry_delay(1), timedelta(seconds=30))
+        self.assertEqual(notifications.retry_delay(3), timedelta(seconds=120))
+        self.assertEqual(notifications.retry_delay(20),
+                         timedelta(seconds=3600))
+
+    @staticmethod
+    def fail_delivery(article):
+        raise ConnectionError("SMTP server unavailable")
+
+
+class TestExactlyOnceNotifications(TestCase):
+    """Test notifications go out once per article, not once per save"""
+
+    def setUp(self):
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist"
+        )
+        self.readers = [UserFactory.create_reader(username=f"reader{i}")
+                        for i in range(3)]
+        self.journalist.journalist_profile.subscribers.add(*self.readers)
+        self.article = ArticleFactory.create_article(author=self.journalist)
+        self.article.publication_status = ArticleStatus.PUBLISHED
+        self.article.save()
+
+    def test_resaving_published_article_queues_nothing(self):
+        """Test edits and no-op saves of a published article are silent"""
+        self.article.title = "Corrected Title"
+        self.article.save()
+        Article.objects.get(pk=self.article.pk).save()
+
+        self.assertEqual(NotificationJob.objects.count(), 2)
+
+    def test_publishing_new_article_queues_jobs(self):
+        """Test an article created as published is notified"""
+        article = Article.objects.create(
+            title="Breaking", content="News", author=self.journalist,
+            publication_status=ArticleStatus.PUBLISHED)
+
+        self.assertEqual(
+            NotificationJob.objects.filter(article=article).count(), 2)
+
+    def test_enqueue_twice_keeps_one_job_per_kind(self):
+        """Test the outbox holds one job per article and kind"""
+        notifications.enqueue_publish_notifications(self.article)
+
+        self.assertEqual(NotificationJob.objects.count(), 2)
+
+    def test_republished_article_is_not_emailed_again(self):
+        """Test subscribers get one email per article"""
+        notifications.process_batch()
+        self.article.publication_status = ArticleStatus.DRAFT
+        self.article.save()
+        self.article.publication_status = ArticleStatus.PUBLISHED
+        self.article.save()
+        notifications.process_batch()
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(NotificationDelivery.objects.filter(
+            article=self.article).count(), 3)
+
+    @override_settings(NOTIFICATION_EMAIL_CHUNK_SIZE=2)
+    def test_interrupted_fan_out_resumes_without_duplicates(self):
+        """Test a retried fan-out only emails the remaining subscribers"""
+        connection = mail.get_connection()
+        send_messages = connection.send_messages
+        calls = []
+
+        def flaky_send_messages(messages):
+            calls.append(len(messages))
+            if len(calls) == 2:
+                raise ConnectionError("connection reset")
+            return send_messages(messages)
+
+        with patch.object(connection, "send_messages", flaky_send_messages), \
+                patch.object(notifications, "get_connection",
+                             return_value=connection):
+            with self.assertRaises(RuntimeError):
+                notifications.deliver_subscriber_emails(self.article)
+        self.assertEqual(len(mail.outbox), 2)
+
+        notifications.deliver_subscriber_emails(self.article)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            sorted(email.to[0] for email in mail.outbox),
+            sorted(reader.email for reader in self.readers)
+        )
+
+
+class TestSubscriberFanOut(TestCase):
+    """Test the subscriber fan-out query"""
+
+    def setUp(self):
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist"
+        )
+        self.publisher = PublisherFactory.create_publisher()
+        self.article = ArticleFactory.create_article(
+            author=self.journalist, publisher=self.publisher
+        )
+        self.author_reader = UserFactory.create_reader(username="reader1")
+        self.publisher_reader = UserFactory.create_reader(username="reader2")
+        self.both_reader = UserFactory.create_reader(username="reader3")
+        UserFactory.create_reader(username="not_subscribed")
+        self.journalist.journalist_profile.subscribers.add(
+            self.author_reader, self.both_reader)
+        self.publisher.subscribers.add(self.publisher_reader,
+                                       self.both_reader)
+
+    def recipient_ids(self, article, **kwargs):
+        return [recipient.id for recipient in
+                notifications.iter_subscriber_recipients(article, **kwargs)]
+
+    def test_recipients_are_deduplicated(self):
+        """Test subscribers of both the author and publisher appear once"""
+        recipients = list(
+            notifications.iter_subscriber_recipients(self.article))
+
+        self.assertEqual(
+            [recipient.id for recipient in recipients],
+            sorted([self.author_reader.pk, self.publisher_reader.pk,
+                    self.both_reader.pk])
+        )
+        self.assertEqual(recipients[0].email, self.author_reader.email)
+        self.assertEqual(recipients[0].display_name,
+                         self.author_reader.display_name)
+
+    def test_self_published_article_reaches_author_subscribers(self):
+        """Test a self-published article only reaches author subscribers"""
+        self.article.publisher = self.journalist
+
+        self.assertEqual(
+            self.recipient_ids(self.article),
+            sorted([self.author_reader.pk, self.both_reader.pk])
+        )
+
+    def test_notified_subscribers_are_excluded(self):
+        """Test subscribers in the delivery ledger are left out"""
+        NotificationDelivery.objects.create(article=self.article,
+                                            recipient=self.both_reader)
+
+        self.assertNotIn(self.both_reader.pk,
+                         self.recipient_ids(self.article))
+        self.assertIn(self.both_reader.pk,
+                      self.recipient_ids(self.article,
+                                         exclude_notified=False))
+
+    def test_keyset_batches(self):
+        """Test the batched read used on MySQL returns every row once"""
+        mysql = type("Connection", (), {"vendor": "mysql"})()
+
+        self.assertEqual(
+            self.recipient_ids(self.article, chunk_size=2,
+                               connection=mysql),
+            self.recipient_ids(self.article)
+        )
+
+    def test_fan_out_query_count_is_constant(self):
+        """Test emailing more subscribers does not run more queries"""
+        # The rendering is cached in the database, so render it first to
+        # run the same cache queries both times:
+        rendering.get_article_notification(self.article)
+        with CaptureQueriesContext(connection) as few:
+            notifications.deliver_subscriber_emails(self.article)
+        NotificationDelivery.objects.all().delete()
+
+        readers = [UserFactory.create_reader(username=f"extra{i}")
+                   for i in range(20)]
+        self.publisher.subscribers.add(*readers)
+        with CaptureQueriesContext(connection) as many:
+            notifications.deliver_subscriber_emails(self.article)
+
+        self.assertEqual(len(mail.outbox), 3 + 23)
+        self.assertEqual(len(many.captured_queries),
+                         len(few.captured_queries))
+
+
+class TestTwitterPosting(TestCase):
+    """Test the token store and rate limit handling of Tweet"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.token_path = os.path.join(temp_dir.name, "tokens.enc")
+        settings_override = override_settings(
+            TWITTER_TOKEN_STORE_PATH=self.token_path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # Start every test with a fresh Tweet instance:
+        Tweet._instance = None
+        self.addCleanup(setattr, Tweet, "_instance", None)
+
+    def response(self, status_code, headers=None):
+        return Mock(status_code=status_code, headers=headers or {},
+                    text="", json=Mock(return_value={}))
+
+    def test_token_store_round_trip(self):
+        """Test tokens are stored encrypted and read back"""
+        store = EncryptedTokenStore()
+        store.save({"oauth_token": "token", "oauth_token_secret": "secret"})
+
+        with open(self.token_path, "rb") as token_file:
+            self.assertNotIn(b"secret", token_file.read())
+        self.assertEqual(os.stat(self.token_path).st_mode & 0o777, 0o600)
+        self.assertEqual(store.load()["oauth_token_secret"], "secret")
+
+    def test_token_store_with_other_key_loads_nothing(self):
+        """Test tokens encrypted with another key are ignored"""
+        EncryptedTokenStore().save({"oauth_token": "token"})
+        other_key = "A" * 43 + "="
+
+        self.assertIsNone(EncryptedTokenStore(key=other_key).load())
+
+    def test_no_tokens_never_prompts(self):
+        """Test posting without tokens fails instead of asking for a PIN"""
+        with patch("builtins.input") as mock_input:
+            with self.assertRaises(TwitterNotAuthorised):
+                Tweet().make_tweet("Hello")
+        mock_input.assert_not_called()
+
+    def test_tokens_loaded_from_store(self):
+        """Test a new Tweet instance uses the stored tokens"""
+        EncryptedTokenStore().save({"oauth_token": "token",
+                                    "oauth_token_secret": "secret"})
+        self.assertIsNotNone(Tweet().oauth)
+
+    def test_rate_limit_honours_reset_header(self):
+        """Test a 429 blocks posting until x-rate-limit-reset"""
+        reset = int((timezone.now() + timedelta(minutes=5)).timestamp())
+        tweet = Tweet()
+        tweet.oauth = Mock()
+        tweet.oauth.post.return_value = self.response(
+            429, {"x-rate-limit-reset": str(reset)})
+
+        with self.assertRaises(TwitterRateLimited) as context:
+            tweet.make_tweet("Hello")
+        self.assertEqual(int(context.exception.reset_at.timestamp()), reset)
+
+        # Further posts wait for the reset without calling the API:
+        with self.assertRaises(TwitterRateLimited):
+            tweet.make_tweet("Hello again")
+        self.assertEqual(tweet.oauth.post.call_count, 1)
+
+    def test_exhausted_rate_limit_defers_next_post(self):
+        """Test a response with no remaining requests defers the next one"""
+        tweet = Tweet()
+        tweet.oauth = Mock()
+        tweet.oauth.post.return_value = self.response(
+            201, {"x-rate-limit-remaining": "0"})
+
+        tweet.make_tweet("Hello")
+        with self.assertRaises(TwitterRateLimited):
+            tweet.make_tweet("Hello again")
+
+    def test_rate_limited_job_is_deferred(self):
+        """Test a rate limited delivery is retried at the reset time without
+        using up an attempt"""
+        article = ArticleFactory.create_article()
+        article.publication_status = ArticleStatus.PUBLISHED
+        article.save()
+        job = NotificationJob.objects.get(kind=NotificationKind.TWEET)
+        reset_at = timezone.now() + timedelta(minutes=10)
+
+        def rate_limited(article):
+            raise notifications.DeliveryDeferred(reset_at)
+
+        with patch.dict(notifications.DELIVERY_HANDLERS,
+                        {NotificationKind.TWEET: rate_limited}):
+            notifications.process_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, NotificationStatus.PENDING)
+        self.assertEqual(job.attempts, 0)
+        self.assertEqual(job.available_at, reset_at)
+
+
+class TestTweetMediaUpload(TestCase):
+    """Test the chunked media upload against a local Twitter stub"""
+
+    def setUp(self):
+        self.server = LocalTwitterServer().start()
+        self.addCleanup(self.server.stop)
+        settings_override = override_settings(
+            TWITTER_MEDIA_UPLOAD_URL=self.server.media_upload_url,
+            TWITTER_TWEET_URL=self.server.tweet_url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        cache.clear()
+
+        Tweet._instance = None
+        self.addCleanup(setattr, Tweet, "_instance", None)
+        self.tweet = Tweet()
+        self.tweet.oauth = requests.Session()
+        self.addCleanup(self.tweet.oauth.close)
+
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.image_path = os.path.join(temp_dir.name, "image.png")
+        Image.effect_noise((200, 150), 64).convert("RGB").save(
+            self.image_path)
+
+    def test_image_uploaded_in_chunks(self):
+        """Test the image is sent as INIT, several APPENDs and FINALIZE"""
+        with patch("news_application.functions.tweet.MEDIA_CHUNK_SIZE",
+                   4096):
+            media_id = self.tweet.upload_image(self.image_path)
+
+        with open(self.image_path, "rb") as image_file:
+            image_bytes = image_file.read()
+        appends = -(-len(image_bytes) // 4096)  # Rounded up
+        self.assertGreater(appends, 1)
+        self.assertEqual(self.server.commands(),
+                         ["INIT"] + ["APPEND"] * appends + ["FINALIZE"])
+        self.assertEqual(self.server.uploaded_bytes(media_id), image_bytes)
+        self.assertEqual(self.server.media[media_id]["media_type"],
+                         "image/png")
+
+    def test_same_image_reuses_media_id(self):
+        """Test posting the same image again does not upload it again"""
+        self.tweet.make_tweet("First", self.image_path)
+        self.tweet.make_tweet("Retry", self.image_path)
+
+        self.assertEqual(self.server.commands().count("INIT"), 1)
+        self.assertEqual(len(self.server.tweets), 2)
+        self.assertEqual(self.server.tweets[0]["media"],
+                         self.server.tweets[1]["media"])
+
+    def test_media_id_is_shared_between_processes(self):
+        """Test the media ID is kept in the shared cache, so a worker in
+        another process reuses it"""
+        media_id = self.tweet.upload_image(self.image_path)
+
+        # A new cache connection has no state of this process:
+        other_process_cache = caches.create_connection("default")
+        self.assertEqual(other_process_cache.get(
+            f"tweet_media:{file_sha256(self.image_path)}"),
+            media_id)
+
+    def test_large_image_is_downscaled(self):
+        """Test images over the size limits are resized before upload"""
+        with patch("news_application.functions.tweet.MAX_IMAGE_DIMENSION",
+                   100):
+            media_id = self.tweet.upload_image(self.image_path)
+
+        uploaded = Image.open(io.BytesIO(
+            self.server.uploaded_bytes(media_id)))
+        self.assertEqual(uploaded.format, "JPEG")
+        self.assertLessEqual(max(uploaded.size), 100)
+
+    def test_rate_limited_upload(self):
+        """Test a 429 during the upload raises TwitterRateLimited"""
+        self.server.queue_response(429, {}, {"x-rate-limit-reset": "0"})
+
+        with self.assertRaises(TwitterRateLimited):
+            self.tweet.upload_image(self.image_path)
+
+
+class TestSyndicationBackends(TestCase):
+    """Test the syndication backends and their benchmark"""
+
+    def setUp(self):
+        self.server = LocalTwitterServer().start()
+        self.addCleanup(self.server.stop)
+        self.article = ArticleFactory.create_article(title="Syndicated")
+        self.article.publication_status = ArticleStatus.PUBLISHED
+        self.article.save()
+
+    def use_stub(self):
+        settings_override = override_settings(
+            SYNDICATION_BACKEND="news_application.functions.syndication."
+                                "StubSyndicationBackend",
+            SYNDICATION_STUB_URL=self.server.tweet_url)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_tests_use_noop_backend(self):
+        """Test nothing is posted with the test settings"""
+        self.assertIsInstance(syndication.get_syndication_backend(),
+                              syndication.NoopSyndicationBackend)
+        notifications.process_batch(kinds=[NotificationKind.TWEET])
+
+        self.assertEqual(self.server.tweets, [])
+        self.assertEqual(
+            NotificationJob.objects.get(kind=NotificationKind.TWEET).status,
+            NotificationStatus.DELIVERED)
+
+    def test_stub_backend_posts_article(self):
+        """Test the stub backend posts the article text to the stub"""
+        self.use_stub()
+
+        notifications.process_batch(kinds=[NotificationKind.TWEET])
+
+        self.assertEqual(len(self.server.tweets), 1)
+        self.assertIn("Title: Syndicated", self.server.tweets[0]["text"])
+        # Only the tweet job was claimed:
+        self.assertEqual(
+            NotificationJob.objects.get(
+                kind=NotificationKind.EMAIL_SUBSCRIBERS).status,
+            NotificationStatus.PENDING)
+
+    def test_rate_limited_post_is_deferred(self):
+        """Test a 429 from the backend reschedules the job at the reset"""
+        self.use_stub()
+        reset = int((timezone.now() + timedelta(minutes=5)).timestamp())
+        self.server.queue_response(429, {}, {"x-rate-limit-reset": str(reset)})
+
+        notifications.process_batch(kinds=[NotificationKind.TWEET])
+
+        job = NotificationJob.objects.get(kind=NotificationKind.TWEET)
+        self.assertEqual(job.status, NotificationStatus.PENDING)
+        self.assertEqual(job.attempts, 0)
+        self.assertEqual(int(job.available_at.timestamp()), reset)
+
+    def test_benchmark_command(self):
+        """Test the benchmark posts every event and leaves no data behind"""
+        out = io.StringIO()
+        article_count = Article.objects.count()
+
+        call_command("benchmark_syndication", events=5, stdout=out)
+
+        self.assertIn("Posts: 5, failed: 0", out.getvalue())
+        self.assertIn("posts/sec per worker", out.getvalue())
+        self.assertEqual(Article.objects.count(), article_count)
+
+
+@override_settings(OUTBOUND_HTTP_BACKOFF_FACTOR=0,
+                   OUTBOUND_HTTP_BACKOFF_JITTER=0)
+class TestOutboundHTTPClient(TestCase):
+    """Test the shared session used for outbound integrations"""
+
+    def setUp(self):
+        self.server = LocalTwitterServer().start()
+        self.addCleanup(self.server.stop)
+        http_client.reset_http_metrics()
+        self.session = http_client.new_session()
+        self.addCleanup(self.session.close)
+
+    def test_idempotent_request_is_retried(self):
+        """Test a GET is retried after server errors"""
+        self.server.queue_response(503)
+        self.server.queue_response(502)
+        self.server.queue_response(200, {"ok": True})
+
+        response = self.session.get(self.server.url + "/status")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_post_is_not_retried_after_server_error(self):
+        """Test a tweet is never posted twice by a retry"""
+        self.server.queue_response(503)
+
+        response = self.session.post(self.server.tweet_url,
+                                     json={"text": "Hello"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_metrics_are_recorded_per_host(self):
+        """Test every request is counted against its host"""
+        for i in range(3):
+            self.session.post(self.server.tweet_url, json={"text": str(i)})
+
+        metrics = http_client.get_http_metrics()[
+            f"{self.server.host}:{self.server.port}"]
+        self.assertEqual(metrics.requests, 3)
+        self.assertEqual(metrics.errors, 0)
+        self.assertGreater(metrics.max_seconds, 0)
+
+    @override_settings(OUTBOUND_HTTP_READ_TIMEOUT=0.2)
+    def test_hung_server_times_out(self):
+        """Test a server that never answers does not block the caller"""
+        # Accepts connections (in its backlog) but never replies:
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen()
+        self.addCleanup(listener.close)
+        host, port = listener.getsockname()
+
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            http_client.new_session().post(f"http://{host}:{port}/hook",
+                                           json={})
+
+        metrics = http_client.get_http_metrics()[f"{host}:{port}"]
+        self.assertEqual(metrics.errors, 1)
+
+    def test_integrations_use_the_outbound_adapter(self):
+        """Test the Twitter and stub sessions are configured"""
+        Tweet._instance = None
+        self.addCleanup(setattr, Tweet, "_instance", None)
+        with patch.object(EncryptedTokenStore, "load", return_value={
+                "oauth_token": "token", "oauth_token_secret": "secret"}):
+            tweet = Tweet()
+
+        for session in (tweet.oauth,
+                        syndication.StubSyndicationBackend().session):
+            self.assertIsInstance(
+                session.get_adapter("https://api.twitter.com/2/tweets"),
+                http_client.OutboundHTTPAdapter)
+
+
+class TestBulkNotificationEmails(TestCase):
+    """Test sending the notification emails in chunks over one connection"""
+
+    def setUp(self):
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist"
+        )
+        self.article = ArticleFactory.create_article(author=self.journalist)
+        self.readers = [UserFactory.create_reader(username=f"reader{i}")
+                        for i in range(5)]
+
+    def test_sends_in_chunks(self):
+        """Test every subscriber gets one email and chunks are reported"""
+        report = notifications.send_bulk_notification_emails(
+            self.article, self.readers, chunk_size=2)
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            sorted(email.to[0] for email in mail.outbox),
+            sorted(reader.email for reader in self.readers)
+        )
+        self.assertIn(f"Hi {self.readers[0].display_name}",
+                      mail.outbox[0].body)
+        self.assertEqual([chunk.size for chunk in report.chunks], [2, 2, 1])
+        self.assertEqual(report.sent, 5)
+        self.assertEqual(report.failed, 0)
+
+    def test_failed_message_is_reported(self):
+        """Test a failing message is recorded and the rest still go out"""
+        connection = mail.get_connection()
+        send_messages = connection.send_messages
+        calls = []
+        sent = []
+
+        def flaky_send_messages(messages):
+            calls.append(len(messages))
+            if len(calls) == 2:
+                raise ConnectionError("connection reset")
+            return send_messages(messages)
+
+        with patch.object(connection, "send_messages", flaky_send_messages):
+            report = notifications.send_bulk_notification_emails(
+                self.article, self.readers, chunk_size=2,
+                connection=connection, on_sent=sent.extend)
+
+        self.assertEqual(report.sent, 4)
+        self.assertEqual(report.failed, 1)
+        self.assertEqual([chunk.sent for chunk in report.chunks], [1, 2, 1])
+        self.assertEqual(report.errors,
+                         ["ConnectionError: connection reset"])
+        self.assertEqual(len(mail.outbox), 4)
+        # Only the readers whose email went out are reported as sent:
+        self.assertEqual(sent, [self.readers[0]] + self.readers[2:])
+
+    def test_dropped_message_is_not_reported_sent(self):
+        """Test a message a fail_silently backend drops counts as failed"""
+        connection = mail.get_connection()
+        send_messages = connection.send_messages
+        sent = []
+
+        def dropping_send_messages(messages):
+            if messages[0].to == [self.readers[1].email]:
+                return 0
+            return send_messages(messages)
+
+        with patch.object(connection, "send_messages",
+                          dropping_send_messages):
+            report = notifications.send_bulk_notification_emails(
+                self.article, self.readers, chunk_size=5,
+                connection=connection, on_sent=sent.extend)
+
+        self.assertEqual(report.sent, 4)
+        self.assertEqual(report.failed, 1)
+        self.assertEqual(sent, [self.readers[0]] + self.readers[2:])
+
+    def test_single_smtp_connection(self):
+        """Test the SMTP backend opens one connection for every chunk"""
+        with LocalSMTPServer() as server:
+            connection = mail.get_connection(
+                "django.core.mail.backends.smtp.EmailBackend",
+                host=server.host, port=server.port)
+            report = notifications.send_bulk_notification_emails(
+                self.article, self.readers, chunk_size=2,
+                connection=connection)
+
+        self.assertEqual(report.sent, 5)
+        self.assertEqual(server.messages, 5)
+        self.assertEqual(server.connections, 1)
+
+
+class TestNotificationRendering(TestCase):
+    """Test the notifications are rendered once per article"""
+
+    def setUp(self):
+        cache.clear()
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist"
+        )
+        self.readers = [
+            UserFactory.create_reader(username=f"reader{i}",
+                                      display_name=f"Reader <{i}>")
+            for i in range(3)
+        ]
+        self.journalist.journalist_profile.subscribers.add(*self.readers)
+        self.article = ArticleFactory.create_article(author=self.journalist)
+
+    def test_article_is_rendered_once_per_publish(self):
+        """Test the fan-out and the post share one rendering"""
+        with patch.object(rendering, "render_article_notification",
+                          wraps=rendering.render_article_notification
+                          ) as render:
+            notifications.deliver_subscriber_emails(self.article)
+            post_text = syndication.build_post_text(self.article)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn(self.article.title, post_text)
+
+    def test_only_greeting_is_personalised(self):
+        """Test each email is the shared body after its own greeting"""
+        notifications.deliver_subscriber_emails(self.article)
+
+        rendered = rendering.get_article_notification(self.article)
+        for email, reader in zip(
+                sorted(mail.outbox, key=lambda email: email.to[0]),
+                self.readers):
+            self.assertEqual(email.to, [reader.email])
+            self.assertEqual(email.subject, rendered.subject)
+            self.assertEqual(email.body,
+                             f"Hi {reader.display_name},\n" + rendered.body)
+            self.assertEqual(email.alternatives, [])
+
+    def test_edited_article_is_rendered_again(self):
+        """Test the cached rendering follows edits to the article"""
+        rendering.get_article_notification(self.article)
+        self.article.title = "Corrected Title"
+        self.article.save()
+
+        rendered = rendering.get_article_notification(self.article)
+
+        self.assertIn("Corrected Title", rendered.subject)
+
+    @override_settings(NOTIFICATION_EMAIL_HTML=True)
+    def test_html_part_escapes_greeting(self):
+        """Test the optional HTML part is attached and escaped"""
+        email = notifications.build_new_article_email(self.article,
+                                                      self.readers[0])
+
+        html, mimetype = email.alternatives[0]
+        self.assertEqual(mimetype, "text/html")
+        self.assertIn("Hi Reader &lt;0&gt;,", html)
+        self.assertIn(self.article.title, html)
+
+
+class TestNotificationDigests(TestCase):
+    """Test readers can receive hourly or daily digests instead of one
+    email per article"""
+
+    def setUp(self):
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist"
+        )
+        self.immediate_reader = UserFactory.create_reader(
+            username="immediate_reader")
+        self.hourly_reader = UserFactory.create_reader(
+            username="hourly_reader")
+        self.daily_reader = UserFactory.create_reader(
+            username="daily_reader")
+        for reader, frequency in ((self.hourly_reader, DigestFrequency.HOURLY),
+                                  (self.daily_reader, DigestFrequency.DAILY)):
+            reader.reader_profile.digest_frequency = frequency
+            reader.reader_profile.save()
+        self.journalist.journalist_profile.subscribers.add(
+            self.immediate_reader, self.hourly_reader, self.daily_reader)
+        self.articles = [
+            ArticleFactory.create_article(author=self.journalist,
+                                          title=f"Digest Article {i}")
+            for i in range(2)
+        ]
+
+    def deliver_articles(self):
+        for article in self.articles:
+            notifications.deliver_subscriber_emails(article)
+
+    def test_digest_readers_are_not_emailed_immediately(self):
+        """Test only immediate readers get an email per article"""
+        self.deliver_articles()
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertTrue(all(email.to == [self.immediate_reader.email]
+                            for email in mail.outbox))
+        self.assertEqual(DigestItem.objects.count(), 4)
+        # Digest readers are in the ledger, so a retry does not queue them
+        # again:
+        self.assertEqual(NotificationDelivery.objects.count(), 6)
+        notifications.deliver_subscriber_emails(self.articles[0])
+        self.assertEqual(DigestItem.objects.count(), 4)
+
+    def test_send_digests_emails_each_reader_once(self):
+        """Test one digest lists every pending article of a reader"""
+        self.deliver_articles()
+        mail.outbox.clear()
+
+        report = digests.send_digests(DigestFrequency.HOURLY)
+
+        self.assertEqual(report.sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        email = mail.outbox[0]
+        self.assertEqual(email.to, [self.hourly_reader.email])
+        self.assertIn("2 new articles", email.subject)
+        for article in self.articles:
+            self.assertIn(article.title, email.body)
+        # The hourly items are sent, the daily ones are still pending:
+        self.assertFalse(DigestItem.objects.filter(
+            reader=self.hourly_reader).exists())
+        self.assertEqual(DigestItem.objects.filter(
+            reader=self.daily_reader).count(), 2)
+
+    def test_failed_digest_is_sent_next_run(self):
+        """Test digest items are kept when sending fails"""
+        self.deliver_articles()
+        mail.outbox.clear()
+        connection = mail.get_connection()
+
+        with patch.object(connection, "send_messages",
+                          side_effect=ConnectionError("connection reset")):
+            report = digests.send_digests(DigestFrequency.DAILY,
+                                          connection=connection)
+        self.assertEqual(report.failed, 1)
+        self.assertEqual(DigestItem.objects.filter(
+            reader=self.daily_reader).count(), 2)
+
+        report = digests.send_digests(DigestFrequency.DAILY)
+
+        self.assertEqual(report.sent, 1)
+        self.assertFalse(DigestItem.objects.filter(
+            reader=self.daily_reader).exists())
+
+    def test_send_notification_digests_command(self):
+        """Test the command sends the digests of one frequency"""
+        self.deliver_articles()
+        mail.outbox.clear()
+        out = io.StringIO()
+
+        call_command("send_notification_digests", "--frequency", "DAILY",
+                     stdout=out)
+
+        self.assertEqual([email.to for email in mail.outbox],
+                         [[self.daily_reader.email]])
+        self.assertIn("Sent 1 daily digests", out.getvalue())
+
+    def test_items_of_readers_back_on_immediate_are_sent(self):
+        """Test a reader who switches back to immediate emails still gets
+        the items queued for their digest"""
+        self.deliver_articles()
+        mail.outbox.clear()
+        profile = self.daily_reader.reader_profile
+        profile.digest_frequency = DigestFrequency.IMMEDIATE
+        profile.save()
+
+        report = digests.send_digests(DigestFrequency.HOURLY)
+
+        self.assertEqual(report.sent, 2)
+        self.assertEqual(
+            sorted(email.to[0] for email in mail.outbox),
+            sorted([self.hourly_reader.email, self.daily_reader.email]))
+        self.assertFalse(DigestItem.objects.exists())
+
+    def test_digests_are_read_in_reader_batches(self):
+        """Test every reader gets one digest when readers span batches"""
+        self.deliver_articles()
+        self.daily_reader.reader_profile.digest_frequency = (
+            DigestFrequency.HOURLY)
+        self.daily_reader.reader_profile.save()
+
+        sent = list(digests.iter_digests(DigestFrequency.HOURLY,
+                                         timezone.now(), chunk_size=1))
+
+        self.assertEqual(
+            sorted((digest.email, len(digest.items)) for digest in sent),
+            sorted([(self.hourly_reader.email, 2),
+                    (self.daily_reader.email, 2)]))
+
+    def test_reader_can_choose_digest_frequency(self):
+        """Test the notification settings view saves the preference"""
+        self.client.login(username="immediate_reader", password="testpass123")
+        url = reverse("reader_notification_settings_page")
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post(
+            url, {"digest_frequency": DigestFrequency.DAILY})
+
+        self.assertRedirects(response, reverse("reader_start_page"))
+        self.immediate_reader.reader_profile.refresh_from_db()
+        self.assertEqual(self.immediate_reader.reader_profile.digest_frequency,
+                         DigestFrequency.DAILY)
+
+
+class APIGetArticlesTestCase(TestCase):
+    """Test cases for the API_get_articles view"""
+    
+    def setUp(self):
+        """Set up test data"""
+        # Create test users
+        self.journalist1 = UserFactory.create_journalist(
+            username="test_journalist_1",
+            email="journalist1@test.com"
+        )
+        self.journalist2 = UserFactory.create_journalist(
+            username="test_journalist_2", 
+            email="journalist2@test.com"
+        )
+        
+        # Create test publishers
+        self.publisher1 = PublisherFactory.create_publisher(
+            name="Test Publisher 1",
+            description="First test publisher"
+        )
+        self.publisher2 = PublisherFactory.create_publisher(
+            name="Test Publisher 2", 
+            description="Second test publisher"
+        )
+        
+        # Create test articles
+        self.article1 = Article.objects.create(
+            title="Article by Journalist 1",
+            content="Content of article by journalist 1",
+            author=self.journalist1,
+            publisher=self.publisher1,
+            category=ArticleCategory.POLITICS,
+            publication_status=ArticleStatus.PUBLISHED
+        )
+        
+        self.article2 = Article.objects.create(
+            title="Another Article by Journalist 1", 
+            content="More content by journalist 1",
+            author=self.journalist1,
+            publisher=self.publisher2,
+            category=ArticleCategory.SPORTS,
+            publication_status=ArticleStatus.PUBLISHED
+        )
+        
+        self.article3 = Article.objects.create(
+            title="Article by Journalist 2",
+            content="Content by journalist 2",
+            author=self.journalist2,
+            publisher=self.publisher1,
+            category=ArticleCategory.TECHNOLOGY,
+            publication_status=ArticleStatus.PUBLISHED
+        )
+        
+        # Create a test user for API authentication
+        self.api_user = self.journalist1
+        
+        self.client = Client()
+        
+    def test_api_get_articles_with_specific_author(self):
+        """Test API request to get articles by a specific author"""
+        # Authenticate the request
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+        # Make API request with specific author name
+        response = self.client.get(
+            '/get/articles/',
+            {'author_name': 'test_journalist_1'},
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+        
+        # Check response status
+        self.assertEqual(response.status_code, 200)
+        
+        # Parse JSON response
+        response_data = json.loads(response.content)
+        
+        # Should return 2 articles by test_journalist_1
+        self.assertEqual(len(response_data), 2)
+        
+        # Check that all returned articles are by the correct author
+        for article_data in response_data:
+            self.assertEqual(article_data['author_user_name'], 'test_journalist_1')
+            
+        # Check specific article titles are included
+        article_titles = [article['title'] for article in response_data]
+        self.assertIn("Article by Journalist 1", article_titles)
+        self.assertIn("Another Article by Journalist 1", article_titles)
+        
+    def test_api_get_articles_with_nonexistent_author(self):
+        """Test API request with an author that doesn't exist"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+        
+        response = self.client.get(
+            '/get/articles/',
+            {'author_name': 'nonexistent_author'},
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        
+        # Should return empty list
+        self.assertEqual(len(response_data), 0)
+        
+    def test_api_get_articles_without_authentication(self):
+        """Test API request without authentication should fail"""
+        response = self.client.get(
+            '/get/articles/',
+            {'author_name': 'test_journalist_1'}
+        )
+        
+        # Should return 401 Unauthorized
+        self.assertEqual(response.status_code, 401)
+        
+    def test_api_get_articles_all_articles(self):
+        """Test API request to get all articles (no filter)"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+        
+        response = self.client.get(
+            '/get/articles/',
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        
+        # Should return all 3 articles
+        self.assertEqual(len(response_data), 3)
+        
+    def test_api_get_articles_query_count_is_constant(self):
+        """Test that the number of queries does not grow with the articles"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(
+                    '/get/articles/',
+                    HTTP_AUTHORIZATION=f'Basic {credentials}'
+                )
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        def add_articles(count):
+            for index in range(count):
+                Article.objects.create(
+                    title=f"Extra Article {index}",
+                    content="Extra content",
+                    author=self.journalist2,
+                    publisher=(self.journalist2 if index % 2
+                               else self.publisher2),
+                    publication_status=ArticleStatus.PUBLISHED
+                )
+
+        # Self-published and publisher articles in both measurements:
+        add_articles(2)
+        query_count = count_queries()
+        add_articles(10)
+        self.assertEqual(count_queries(), query_count)
+
+    def test_api_get_articles_with_publisher_filter(self):
+        """Test API request to get articles by publisher"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+        
+        response = self.client.get(
+            '/get/articles/',
+            {'publisher_name': 'Test Publisher 1'},
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        
+        # Should return 2 articles from Test Publisher 1
         self.assertEqual(len(response_data), 2)
         
         # Check that all returned articles are from the correct publisher
@@ -1513,24 +2922,934 @@ class APIGetArticlesTestCase(TestCase):
     def test_api_get_articles_with_both_author_and_publisher_filter(self):
         """Test API request with both author and publisher filters"""
         credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
-        
+        
+        response = self.client.get(
+            '/get/articles/',
+            {
+                'author_name': 'test_journalist_1',
+                'publisher_name': 'Test Publisher 1'
+            },
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        response_data = json.loads(response.content)
+        
+        # Should return 1 article (journalist 1 + publisher 1)
+        self.assertEqual(len(response_data), 1)
+        
+        article_data = response_data[0]
+        self.assertEqual(article_data['author_user_name'], 'test_journalist_1')
+        self.assertEqual(article_data['publisher_name'], 'Test Publisher 1')
+        self.assertEqual(article_data['title'], 'Article by Journalist 1')
+
+    def test_api_get_articles_cursor_pagination(self):
+        """Test the pages follow each other through the Link header"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+
+        response = self.client.get(
+            '/get/articles/',
+            {'limit': 2},
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+        self.assertEqual([article['title'] for article in
+                          json.loads(response.content)],
+                         [self.article1.title, self.article2.title])
+        self.assertIn('rel="next"', response['Link'])
+
+        next_url = response['Link'].split(';')[0].strip('<>')
+        response = self.client.get(
+            next_url, HTTP_AUTHORIZATION=f'Basic {credentials}')
+
+        self.assertEqual([article['title'] for article in
+                          json.loads(response.content)],
+                         [self.article3.title])
+        self.assertFalse(response.has_header('Link'))
+
+    @override_settings(API_MAX_PAGE_SIZE=2)
+    def test_api_get_articles_page_size_is_capped(self):
+        """Test a client cannot ask for more than API_MAX_PAGE_SIZE"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+
+        response = self.client.get(
+            '/get/articles/',
+            {'limit': 1000},
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+
+        self.assertEqual(len(json.loads(response.content)), 2)
+
+    def test_api_get_articles_next_link_keeps_filters(self):
+        """Test the next page is filtered like the first one"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+
         response = self.client.get(
             '/get/articles/',
-            {
-                'author_name': 'test_journalist_1',
-                'publisher_name': 'Test Publisher 1'
-            },
+            {'author_name': 'test_journalist_1', 'limit': 1},
             HTTP_AUTHORIZATION=f'Basic {credentials}'
         )
-        
-        self.assertEqual(response.status_code, 200)
+        self.assertIn('author_name=test_journalist_1', response['Link'])
+
+        next_url = response['Link'].split(';')[0].strip('<>')
+        response = self.client.get(
+            next_url, HTTP_AUTHORIZATION=f'Basic {credentials}')
+
         response_data = json.loads(response.content)
-        
-        # Should return 1 article (journalist 1 + publisher 1)
-        self.assertEqual(len(response_data), 1)
-        
-        article_data = response_data[0]
-        self.assertEqual(article_data['author_user_name'], 'test_journalist_1')
-        self.assertEqual(article_data['publisher_name'], 'Test Publisher 1')
-        self.assertEqual(article_data['title'], 'Article by Journalist 1')
+        self.assertEqual([article['title'] for article in response_data],
+                         [self.article2.title])
+        self.assertFalse(response.has_header('Link'))
+
+
+    def test_api_get_articles_sparse_fieldset(self):
+        """Test ?fields= only returns and reads the requested columns"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                '/get/articles/',
+                {'fields': 'title,id', 'limit': 2},
+                HTTP_AUTHORIZATION=f'Basic {credentials}'
+            )
+
+        self.assertEqual(json.loads(response.content), [
+            {'id': self.article1.pk, 'title': self.article1.title},
+            {'id': self.article2.pk, 'title': self.article2.title},
+        ])
+        article_sql = [query['sql'] for query in queries.captured_queries
+                       if 'news_application_article' in query['sql']]
+        self.assertEqual(len(article_sql), 1)
+        self.assertNotIn('content', article_sql[0])
+
+        # The next page keeps the field selection:
+        next_url = response['Link'].split(';')[0].strip('<>')
+        response = self.client.get(
+            next_url, HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertEqual(json.loads(response.content),
+                         [{'id': self.article3.pk,
+                           'title': self.article3.title}])
+
+    def test_api_get_articles_expand_relations(self):
+        """Test ?expand= embeds the author and publisher"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+
+        response = self.client.get(
+            '/get/articles/',
+            {'fields': 'title', 'expand': 'author,publisher', 'limit': 1},
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+
+        self.assertEqual(json.loads(response.content), [{
+            'title': self.article1.title,
+            'author': {'id': self.journalist1.pk,
+                       'username': 'test_journalist_1',
+                       'display_name': self.journalist1.display_name},
+            'publisher': {'id': self.publisher1.pk,
+                          'self_published': False,
+                          'name': 'Test Publisher 1'},
+        }])
+
+    def test_api_get_articles_unknown_field(self):
+        """Test unknown fields and expansions are a 400 error"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+
+        for params in ({'fields': 'title,password'}, {'expand': 'category'}):
+            response = self.client.get(
+                '/get/articles/', params,
+                HTTP_AUTHORIZATION=f'Basic {credentials}'
+            )
+            self.assertEqual(response.status_code, 400)
+
+    def test_api_get_articles_is_byte_identical_to_serializer(self):
+        """Test the values() path encodes exactly like ArticleSerializer"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+        # Self-published, without a publisher, and a draft with an image
+        # and no publication date:
+        Article.objects.create(
+            title="Self Published", content="Content \u00e9\u263a",
+            author=self.journalist2, publisher=self.journalist2,
+            publication_status=ArticleStatus.PUBLISHED,
+            publication_date=timezone.now())
+        Article.objects.create(
+            title="No Publisher", content="Content",
+            author=self.journalist2, publisher=None)
+        ArticleFactory.create_article(author=self.journalist1,
+                                      publisher=self.publisher2)
+
+        response = self.client.get(
+            '/get/articles/',
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+
+        expected = JsonResponse(ArticleSerializer(
+            Article.objects.with_publishers().order_by('pk'), many=True
+        ).data, safe=False)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(len(json.loads(response.content)), 6)
+
+    def test_benchmark_article_serialization_command(self):
+        """Test the benchmark compares both paths and leaves no data"""
+        article_count = Article.objects.count()
+        out = io.StringIO()
+
+        call_command("benchmark_article_serialization", articles=[20, 50],
+                     stdout=out)
+
+        self.assertIn("50 articles: ArticleSerializer", out.getvalue())
+        self.assertIn("identical", out.getvalue())
+        self.assertEqual(Article.objects.count(), article_count)
+
+    def test_api_get_articles_xml(self):
+        """Test XML is negotiated with the Accept header or ?format=xml
+        and streamed as the same document as XMLRenderer"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+        records = json.loads(self.client.get(
+            '/get/articles/',
+            HTTP_AUTHORIZATION=f'Basic {credentials}').content)
+
+        for params, headers in (({}, {'HTTP_ACCEPT': 'application/xml'}),
+                                ({'format': 'xml'}, {})):
+            response = self.client.get(
+                '/get/articles/', params,
+                HTTP_AUTHORIZATION=f'Basic {credentials}', **headers
+            )
+
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            self.assertEqual(response['Content-Type'],
+                             'application/xml; charset=utf-8')
+            self.assertIn('Accept', response['Vary'])
+            content = b''.join(response.streaming_content).decode()
+            self.assertEqual(content, XMLRenderer().render(records))
+            root = ElementTree.fromstring(content)
+            self.assertEqual([item.findtext('title') for item in root],
+                             [record['title'] for record in records])
+
+    def test_api_get_articles_xml_pages(self):
+        """Test XML pages keep the Link header and the format"""
+        credentials = base64.b64encode(b'test_journalist_1:testpass123').decode('ascii')
+
+        response = self.client.get(
+            '/get/articles/', {'format': 'xml', 'limit': 2, 'fields': 'id'},
+            HTTP_AUTHORIZATION=f'Basic {credentials}'
+        )
+
+        root = ElementTree.fromstring(b''.join(response.streaming_content))
+        self.assertEqual([int(item.findtext('id')) for item in root],
+                         [self.article1.pk, self.article2.pk])
+        self.assertIn('format=xml', response['Link'])
+
+    def test_streaming_xml_renderer_yields_one_item_at_a_time(self):
+        """Test stream() writes the document incrementally"""
+        items = [{'title': 'First & <one>'}, {'title': None}, {'id': 3}]
+
+        chunks = list(StreamingXMLRenderer().stream(iter(items)))
+
+        self.assertEqual(len(chunks), len(items) + 1)
+        self.assertEqual(''.join(chunks), XMLRenderer().render(items))
+        self.assertEqual(''.join(StreamingXMLRenderer().stream([])),
+                         XMLRenderer().render([]))
+
+
+class APIExportArticlesTestCase(TestCase):
+    """Test cases for the streaming article export"""
+
+    def setUp(self):
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist_1")
+        self.publisher = PublisherFactory.create_publisher(
+            name="Test Publisher 1")
+        self.published = Article.objects.create(
+            title="Published, with a comma",
+            content="Line one\nLine two",
+            author=self.journalist,
+            publisher=self.publisher,
+            publication_status=ArticleStatus.PUBLISHED
+        )
+        self.draft = Article.objects.create(
+            title="Draft",
+            content="Draft content",
+            author=self.journalist,
+            publisher=self.journalist,
+            publication_status=ArticleStatus.DRAFT
+        )
+        credentials = base64.b64encode(
+            b'test_journalist_1:testpass123').decode('ascii')
+        self.auth = {"HTTP_AUTHORIZATION": f"Basic {credentials}"}
+
+    def export(self, params=None, **headers):
+        response = self.client.get('/export/articles/', params or {},
+                                   **self.auth, **headers)
+        content = b"".join(response.streaming_content).decode()
+        return response, content
+
+    def test_ndjson_export_matches_api(self):
+        """Test NDJSON lines hold the same records as /get/articles/"""
+        response, content = self.export()
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"],
+                         "application/x-ndjson; charset=utf-8")
+        records = [json.loads(line) for line in content.splitlines()]
+        api_records = json.loads(
+            self.client.get('/get/articles/', **self.auth).content)
+        self.assertEqual(records, api_records)
+
+    def test_csv_export(self):
+        """Test the CSV export has a header and one record per article"""
+        response, content = self.export({'format': 'csv'})
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual([row["title"] for row in rows],
+                         [self.published.title, self.draft.title])
+        self.assertEqual(rows[0]["content"], "Line one\nLine two")
+        self.assertEqual(rows[1]["publisher_name"], "Test Display Name")
+
+    def test_csv_export_negotiated_with_accept_header(self):
+        """Test the format can be chosen with the Accept header"""
+        response, content = self.export(HTTP_ACCEPT="text/csv")
+
+        self.assertTrue(content.startswith("author_display_name,"))
+
+    def test_xml_export(self):
+        """Test the XML export holds one list-item per article"""
+        response, content = self.export({'format': 'xml'})
+
+        self.assertEqual(response["Content-Type"],
+                         "application/xml; charset=utf-8")
+        self.assertIn('filename="articles.xml"',
+                      response["Content-Disposition"])
+        root = ElementTree.fromstring(content)
+        self.assertEqual([item.findtext("title") for item in root],
+                         [self.published.title, self.draft.title])
+        self.assertEqual(root[0].findtext("content"), "Line one\nLine two")
+
+    def test_export_filters(self):
+        """Test the status and since filters"""
+        response, content = self.export({'status': 'DRAFT'})
+        self.assertEqual([json.loads(line)["title"]
+                          for line in content.splitlines()], ["Draft"])
+
+        Article.objects.filter(pk=self.draft.pk).update(
+            updated_at=timezone.now() - timedelta(days=10))
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        response, content = self.export({'since': since})
+        self.assertEqual([json.loads(line)["title"]
+                          for line in content.splitlines()],
+                         [self.published.title])
+
+    def test_export_rejects_invalid_filters(self):
+        """Test invalid filters are a 400 error"""
+        for params in ({'since': 'yesterday'}, {'status': 'LOST'}):
+            response = self.client.get('/export/articles/', params,
+                                       **self.auth)
+            self.assertEqual(response.status_code, 400)
+
+    def test_export_requires_authentication(self):
+        """Test the export is not public"""
+        response = self.client.get('/export/articles/', {'format': 'csv'})
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_export_articles_command(self):
+        """Test the command writes the export to a file"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        path = os.path.join(temp_dir.name, "articles.ndjson")
+        err = io.StringIO()
+
+        call_command("export_articles", "--status", "PUBLISHED",
+                     "--output", path, stderr=err)
+
+        with open(path, encoding="utf-8") as export_file:
+            records = [json.loads(line) for line in export_file]
+        self.assertEqual([record["id"] for record in records],
+                         [self.published.pk])
+        self.assertIn("Exported 1 articles as ndjson", err.getvalue())
+
+
+class ConditionalGetTestCase(TestCase):
+    """Test ETag/Last-Modified validators and 304 responses"""
+
+    def setUp(self):
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist_1")
+        self.reader = UserFactory.create_reader(username="test_reader")
+        self.article = Article.objects.create(
+            title="Cached Article",
+            content="Content",
+            author=self.journalist,
+            publisher=self.journalist,
+            publication_status=ArticleStatus.PUBLISHED
+        )
+        credentials = base64.b64encode(
+            b'test_journalist_1:testpass123').decode('ascii')
+        self.auth = {"HTTP_AUTHORIZATION": f"Basic {credentials}"}
+
+    def get_articles(self, **headers):
+        return self.client.get('/get/articles/', **self.auth, **headers)
+
+    def test_api_sends_validators(self):
+        """Test the API response has an ETag, Last-Modified and
+        Cache-Control"""
+        response = self.get_articles()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_unchanged_api_poll_is_not_modified(self):
+        """Test If-None-Match is answered without reading the articles"""
+        etag = self.get_articles()['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_articles(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertFalse(any('news_application_article' in query['sql']
+                             for query in queries.captured_queries))
+
+    def test_if_modified_since(self):
+        """Test If-Modified-Since with the Last-Modified date is a 304"""
+        last_modified = self.get_articles()['Last-Modified']
+
+        response = self.get_articles(HTTP_IF_MODIFIED_SINCE=last_modified)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_article_writes_change_the_etag(self):
+        """Test saves and deletes of articles and publishers bump the
+        version"""
+        etags = [self.get_articles()['ETag']]
+        self.article.title = "Corrected Title"
+        self.article.save()
+        etags.append(self.get_articles()['ETag'])
+        PublisherFactory.create_publisher(name="New Publisher")
+        etags.append(self.get_articles()['ETag'])
+        self.article.delete()
+        etags.append(self.get_articles()['ETag'])
+
+        self.assertEqual(len(set(etags)), 4)
+        response = self.get_articles(HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, 200)
+
+    def test_formats_have_their_own_etag(self):
+        """Test the JSON ETag does not validate the XML representation"""
+        json_etag = self.get_articles()['ETag']
+        xml_response = self.get_articles(HTTP_ACCEPT='application/xml')
+
+        self.assertNotEqual(xml_response['ETag'], json_etag)
+        response = self.get_articles(HTTP_ACCEPT='application/xml',
+                                     HTTP_IF_NONE_MATCH=json_etag)
+        self.assertEqual(response.status_code, 200)
+        response = self.get_articles(HTTP_ACCEPT='application/xml',
+                                     HTTP_IF_NONE_MATCH=xml_response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Accept', response['Vary'])
+
+    def test_reader_article_page_is_conditional(self):
+        """Test the article page is a 304 until the article changes"""
+        self.client.login(username="test_reader", password="testpass123")
+        url = reverse('reader_view_article_page', args=[self.article.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.article.content = "Updated content"
+        self.article.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Updated content")
+
+    def test_missing_article_is_still_not_found(self):
+        """Test a conditional request for a missing article is a 404"""
+        self.client.login(username="test_reader", password="testpass123")
+        url = reverse('reader_view_article_page', args=[self.article.pk + 1])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"anything"')
+
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CHANGES_FEED_SETTLE_SECONDS=0)
+class APIArticleChangesTestCase(TestCase):
+    """Test the /get/articles/changes/ feed"""
+
+    def setUp(self):
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist_1")
+        self.editor = UserFactory.create_editor(username="test_editor")
+        self.publisher = PublisherFactory.create_publisher(
+            name="Test Publisher 1")
+        self.article1 = Article.objects.create(
+            title="First Article",
+            content="Content",
+            author=self.journalist,
+            publisher=self.publisher,
+            publication_status=ArticleStatus.PUBLISHED
+        )
+        self.article2 = Article.objects.create(
+            title="Second Article",
+            content="Content",
+            author=self.journalist,
+            publisher=self.journalist,
+            publication_status=ArticleStatus.PUBLISHED
+        )
+        credentials = base64.b64encode(
+            b'test_journalist_1:testpass123').decode('ascii')
+        self.auth = {"HTTP_AUTHORIZATION": f"Basic {credentials}"}
+
+    def get_changes(self, since=None, **params):
+        if since:
+            params['since'] = since
+        response = self.client.get('/get/articles/changes/', params,
+                                   **self.auth)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def titles(self, changes):
+        return [record['title'] for record in changes['articles']]
+
+    def test_first_sync_has_every_article(self):
+        """Test the feed without a cursor starts with every article"""
+        changes = self.get_changes()
+
+        self.assertEqual(self.titles(changes),
+                         ["First Article", "Second Article"])
+        self.assertEqual(changes['deleted'], [])
+        self.assertFalse(changes['has_more'])
+        self.assertEqual(list(changes)[-1], 'cursor')
+
+        # Nothing changed since, and the cursor stays put:
+        later = self.get_changes(changes['cursor'])
+        self.assertEqual(later['articles'], [])
+        self.assertEqual(later['cursor'], changes['cursor'])
+
+    def test_only_changes_after_the_cursor(self):
+        """Test edits and unpublishing show up once, oldest first"""
+        cursor = self.get_changes()['cursor']
+        self.article2.title = "Corrected Article"
+        self.article2.save()
+        self.article1.publication_status = ArticleStatus.DRAFT
+        self.article1.save()
+
+        changes = self.get_changes(cursor)
+
+        self.assertEqual(self.titles(changes),
+                         ["Corrected Article", "First Article"])
+        self.assertEqual(changes['articles'][1]['publication_status'],
+                         ArticleStatus.DRAFT)
+        self.assertEqual(self.get_changes(changes['cursor'])['articles'],
+                         [])
+
+    def test_deletions_leave_tombstones(self):
+        """Test articles deleted by a journalist or an editor are listed
+        as deleted"""
+        cursor = self.get_changes()['cursor']
+        article1_pk, article2_pk = self.article1.pk, self.article2.pk
+
+        self.client.login(username="test_journalist_1",
+                          password="testpass123")
+        self.client.post(reverse('journalist_article_delete_page',
+                                 args=[article2_pk]))
+        self.client.login(username="test_editor", password="testpass123")
+        response = self.client.post(reverse('editor_article_delete_page',
+                                            args=[article1_pk]))
+        self.assertRedirects(response, reverse(
+            'editor_article_management_page', args=[self.publisher.pk]),
+            fetch_redirect_response=False)
+        self.client.logout()
+
+        changes = self.get_changes(cursor)
+        self.assertEqual(changes['articles'], [])
+        self.assertEqual([tombstone['id'] for tombstone in changes['deleted']],
+                         [article2_pk, article1_pk])
+        self.assertEqual(self.get_changes(changes['cursor'])['deleted'], [])
+
+    def test_pages_resume_from_the_cursor(self):
+        """Test a small limit pages through every change exactly once"""
+        for i in range(3):
+            ArticleFactory.create_article(title=f"Article {i}",
+                                          author=self.journalist,
+                                          publisher=self.publisher)
+        article1_pk = self.article1.pk
+        self.article1.delete()
+
+        seen = []
+        deleted = []
+        changes = self.get_changes(limit=2)
+        while True:
+            self.assertLessEqual(
+                len(changes['articles']) + len(changes['deleted']), 2)
+            seen += self.titles(changes)
+            deleted += [tombstone['id'] for tombstone in changes['deleted']]
+            if not changes['has_more']:
+                break
+            changes = self.get_changes(changes['cursor'], limit=2)
+
+        self.assertEqual(seen, ["Second Article", "Article 0", "Article 1",
+                                "Article 2"])
+        self.assertEqual(deleted, [article1_pk])
+
+    def test_renames_change_the_articles(self):
+        """Test renaming a publisher or an author resends their articles,
+        but signing in does not"""
+        cursor = self.get_changes()['cursor']
+        self.client.login(username="test_journalist_1",
+                          password="testpass123")
+        self.assertEqual(self.get_changes(cursor)['articles'], [])
+
+        self.publisher.name = "Renamed Publisher"
+        self.publisher.save()
+        changes = self.get_changes(cursor)
+        self.assertEqual(self.titles(changes), ["First Article"])
+        self.assertEqual(changes['articles'][0]['publisher_name'],
+                         "Renamed Publisher")
+
+        self.journalist.display_name = "Renamed Journalist"
+        self.journalist.save()
+        changes = self.get_changes(changes['cursor'])
+        self.assertEqual(self.titles(changes),
+                         ["First Article", "Second Article"])
+        self.assertEqual(changes['articles'][1]['publisher_name'],
+                         "Renamed Journalist")
+
+    def test_deleted_publisher_changes_its_articles(self):
+        """Test deleting a publisher resends its articles without it"""
+        cursor = self.get_changes()['cursor']
+
+        self.publisher.delete()
+
+        changes = self.get_changes(cursor)
+        self.assertEqual(self.titles(changes), ["First Article"])
+        self.assertEqual(changes['articles'][0]['publisher_name'],
+                         "No Publisher")
+
+    @override_settings(CHANGES_FEED_SETTLE_SECONDS=60)
+    def test_recent_changes_are_held_back(self):
+        """Test changes younger than the settle time wait for a later
+        sync"""
+        changes = self.get_changes()
+
+        self.assertEqual(changes['articles'], [])
+        self.assertTrue(changes['cursor'])
+
+    @override_settings(CHANGES_FEED_SETTLE_SECONDS=2)
+    def test_held_back_changes_follow_the_cursor(self):
+        """Test a change held back by the settle window is in the next
+        sync once it is older than the window"""
+        changes = self.get_changes()
+        self.assertEqual(changes['articles'], [])
+
+        later = timezone.now() + timedelta(seconds=3)
+        with patch("news_application.functions.changes.timezone.now",
+                   return_value=later):
+            changes = self.get_changes(changes['cursor'])
+
+        self.assertEqual(self.titles(changes),
+                         ["First Article", "Second Article"])
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor is a 400 error, not a full resync"""
+        response = self.client.get('/get/articles/changes/',
+                                   {'since': 'not-a-cursor'}, **self.auth)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_xml_changes(self):
+        """Test the feed is also available as XML"""
+        response = self.client.get('/get/articles/changes/',
+                                   {'format': 'xml'}, **self.auth)
+
+        root = ElementTree.fromstring(response.content)
+        self.assertEqual([item.findtext('title')
+                          for item in root.find('articles')],
+                         ["First Article", "Second Article"])
+        self.assertTrue(root.findtext('cursor'))
+
+    def test_changes_require_authentication(self):
+        response = self.client.get('/get/articles/changes/')
+
+        self.assertEqual(response.status_code, 401)
+
+
+class APIKeyAuthenticationTestCase(TestCase):
+    """Test API key authentication of the article API"""
+
+    def setUp(self):
+        clear_api_key_cache()
+        self.addCleanup(clear_api_key_cache)
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist_1")
+        ArticleFactory.create_article(author=self.journalist)
+        self.api_key, self.key = mint_api_key(self.journalist, "Partner")
+
+    def get_articles(self, key):
+        return self.client.get('/get/articles/',
+                               HTTP_AUTHORIZATION=f'Api-Key {key}')
+
+    def test_key_authenticates(self):
+        """Test a minted key is accepted and only its digest is stored"""
+        response = self.get_articles(self.key)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)), 1)
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.digest, hash_api_key(self.key))
+        self.assertNotIn(self.key, self.api_key.digest)
+        self.assertTrue(self.key.startswith(self.api_key.prefix))
+        self.assertIsNotNone(self.api_key.last_used_at)
+
+    def test_wrong_key_is_rejected(self):
+        for key in (self.key + "x", self.api_key.prefix):
+            response = self.get_articles(key)
+            self.assertEqual(response.status_code, 401)
+            # Basic clients that wait for a challenge still get one:
+            self.assertEqual(response['WWW-Authenticate'],
+                             'Basic realm="api"')
+
+    def test_verification_is_cached(self):
+        """Test repeated requests do not look the key up again"""
+        self.get_articles(self.key)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get_articles(self.key)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('news_application_apikey' in query['sql']
+                             for query in queries.captured_queries))
+
+    @override_settings(API_KEY_CACHE_SECONDS=0)
+    def test_cache_can_be_disabled(self):
+        self.get_articles(self.key)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.get_articles(self.key)
+
+        self.assertTrue(any('news_application_apikey' in query['sql']
+                            for query in queries.captured_queries))
+
+    def test_revoked_key_is_rejected(self):
+        """Test revoking a key takes effect at once in this process"""
+        self.assertEqual(self.get_articles(self.key).status_code, 200)
+
+        out = io.StringIO()
+        call_command("api_keys", "revoke", self.api_key.prefix, stdout=out)
+
+        self.assertIn("Revoked 1 keys", out.getvalue())
+        self.assertEqual(self.get_articles(self.key).status_code, 401)
+
+    def test_inactive_user_is_rejected(self):
+        self.journalist.is_active = False
+        self.journalist.save()
+
+        self.assertEqual(self.get_articles(self.key).status_code, 401)
+
+    def test_deactivating_a_cached_user_takes_effect(self):
+        """Test deactivating a user rejects their cached key in this
+        process"""
+        self.assertEqual(self.get_articles(self.key).status_code, 200)
+
+        self.journalist.is_active = False
+        self.journalist.save()
+
+        self.assertEqual(self.get_articles(self.key).status_code, 401)
+
+    def test_basic_auth_still_works(self):
+        credentials = base64.b64encode(
+            b'test_journalist_1:testpass123').decode('ascii')
+
+        response = self.client.get('/get/articles/',
+                                   HTTP_AUTHORIZATION=f'Basic {credentials}')
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_api_keys_command(self):
+        """Test minting, listing and revoking every key of a user"""
+        out = io.StringIO()
+        call_command("api_keys", "mint", "test_journalist_1",
+                     "--name", "Second partner", stdout=out)
+        key = out.getvalue().splitlines()[0]
+        self.assertEqual(self.get_articles(key).status_code, 200)
+
+        out = io.StringIO()
+        call_command("api_keys", "list", "test_journalist_1", stdout=out)
+        self.assertIn("Second partner", out.getvalue())
+        self.assertIn("Summary: 2 keys", out.getvalue())
+
+        call_command("api_keys", "revoke", "--user", "test_journalist_1",
+                     stdout=io.StringIO())
+        self.assertFalse(APIKey.objects.filter(revoked_at__isnull=True))
+        self.assertEqual(self.get_articles(key).status_code, 401)
+
+    def test_benchmark_api_auth_command(self):
+        out = io.StringIO()
+
+        call_command("benchmark_api_auth", requests=2, stdout=out)
+
+        self.assertIn("API key:", out.getvalue())
+        self.assertFalse(User.objects.filter(
+            username="benchmark_api_auth_user").exists())
+
+
+class ResponseCompressionTestCase(TestCase):
+    """Test CompressionMiddleware and the cache of compressed bodies"""
+
+    def setUp(self):
+        cache.clear()
+        reset_compression_metrics()
+        self.addCleanup(clear_api_key_cache)
+        self.journalist = UserFactory.create_journalist(
+            username="test_journalist_1")
+        self.publisher = PublisherFactory.create_publisher(
+            name="Test Publisher 1")
+        for i in range(10):
+            Article.objects.create(
+                title=f"Article {i}",
+                content="Compressible article content. " * 20,
+                author=self.journalist,
+                publisher=self.publisher,
+                publication_status=ArticleStatus.PUBLISHED
+            )
+        _, key = mint_api_key(self.journalist)
+        self.auth = {"HTTP_AUTHORIZATION": f"Api-Key {key}"}
+
+    def get_articles(self, params=None, **headers):
+        return self.client.get('/get/articles/', params or {}, **self.auth,
+                               **headers)
+
+    def test_gzip_is_negotiated(self):
+        """Test gzip bodies decompress to the uncompressed response"""
+        plain = self.get_articles()
+
+        response = self.get_articles(HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(int(response['Content-Length']),
+                         len(response.content))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+    def test_weak_etag_revalidates(self):
+        """Test the weakened ETag of a compressed response gets a 304"""
+        response = self.get_articles(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+
+        response = self.get_articles(HTTP_ACCEPT_ENCODING='gzip',
+                                     HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_compressed_bodies_are_cached_per_version(self):
+        """Test a hot page is compressed once per collection version"""
+        first = self.get_articles(HTTP_ACCEPT_ENCODING='gzip')
+        second = self.get_articles(HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(second.content, first.content)
+        metrics = get_compression_metrics()['gzip']
+        self.assertEqual((metrics.responses, metrics.cache_hits), (2, 1))
+        self.assertGreater(metrics.ratio, 1)
+        self.assertIn('ratio', str(metrics))
+
+        # Another URL, or a new version, is compressed again:
+        self.get_articles({'limit': 5}, HTTP_ACCEPT_ENCODING='gzip')
+        Article.objects.filter(title="Article 0").first().save()
+        response = self.get_articles(HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(get_compression_metrics()['gzip'].cache_hits, 1)
+        self.assertEqual(
+            gzip.decompress(response.content),
+            self.get_articles().content)
+
+    def test_compressed_bodies_are_shared_between_processes(self):
+        """Test a body compressed by one process is reused by another"""
+        self.get_articles(HTTP_ACCEPT_ENCODING='gzip')
+
+        # A new cache connection has no state of this process:
+        with patch("news_application.functions.compression.cache",
+                   caches.create_connection("default")):
+            self.get_articles(HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(get_compression_metrics()['gzip'].cache_hits, 1)
+
+    def test_small_and_unaccepted_responses_are_not_compressed(self):
+        for params, headers in (
+                ({'limit': 1}, {'HTTP_ACCEPT_ENCODING': 'gzip'}),
+                ({}, {'HTTP_ACCEPT_ENCODING': 'gzip;q=0, identity'}),
+                ({}, {})):
+            response = self.get_articles(params, **headers)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_response_is_compressed(self):
+        """Test the streamed XML is compressed as it is produced"""
+        plain = b''.join(self.get_articles(
+            {'format': 'xml'}).streaming_content)
+
+        response = self.get_articles({'format': 'xml'},
+                                     HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)), plain)
+
+    def test_html_pages_are_compressed(self):
+        UserFactory.create_reader(username="test_reader")
+        self.client.login(username="test_reader", password="testpass123")
+
+        response = self.client.get(reverse('reader_start_page'),
+                                   HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'<html', gzip.decompress(response.content).lower())
+
+    def test_html_gzip_keeps_breach_mitigation(self):
+        """Test HTML pages get Django's padded gzip, Vary and a weak ETag"""
+        html = "<html><body>" + "News Addiction! " * 200 + "</body></html>"
+
+        def view(request):
+            response = HttpResponse(html)
+            response['ETag'] = '"page-1"'
+            return response
+
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='br, gzip')
+        response = CompressionMiddleware(view)(request)
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], 'W/"page-1"')
+        # The FNAME flag of the gzip header holds the random padding:
+        self.assertTrue(response.content[3] & gzip.FNAME)
+        self.assertEqual(gzip.decompress(response.content).decode(), html)
+
+    @override_settings(COMPRESSION_ENCODINGS=["zstd", "br", "gzip"])
+    def test_choose_encoding(self):
+        """Test q values win over the server preference"""
+        self.assertIsNone(choose_encoding(''))
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+        self.assertIsNone(choose_encoding('compress, identity'))
+        self.assertEqual(choose_encoding('*'), choose_encoding('zstd, br, gzip'))
+        self.assertEqual(choose_encoding('br;q=0.5, gzip'), 'gzip')
+        self.assertEqual(choose_encoding('GZIP;Q=0.8'), 'gzip')
+        self.assertEqual(choose_encoding('zstd, br, gzip;q=0.5', {'gzip'}),
+                         'gzip')
+        self.assertIsNone(choose_encoding('zstd, br', {'gzip'}))
+
+    def test_benchmark_compression_command(self):
+        out = io.StringIO()
+
+        call_command("benchmark_compression", articles=20, requests=3,
+                     stdout=out)
 
+        self.assertIn("Compression gzip: 3 responses (2 cached)",
+                      out.getvalue())
+        self.assertFalse(User.objects.filter(
+            username="benchmark_compression_author").exists())
@@ -41,6 +41,10 @@ urlpatterns = [
          views.reader_publisher_subscribe_unsubscribe,
          name='reader_publisher_subscribe_unsubscribe_page'
          ),
+     path('reader_notification_settings/',
+          views.reader_notification_settings_view,
+          name='reader_notification_settings_page'
+          ),
 
      # Journalist URLs:
     path('journalist_start/', views.journalist_start_view, 
@@ -129,4 +133,8 @@ urlpatterns = [
      # API Endpoints:
      path('get/articles/', views.API_get_articles, 
           name='API_get_articles_page'),
+     path('get/articles/changes/', views.API_get_article_changes,
+          name='API_get_article_changes_page'),
+     path('export/articles/', views.API_export_articles,
+          name='API_export_articles_page'),
 ]
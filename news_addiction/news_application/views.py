@@ -7,73 +7,60 @@ from django.contrib.auth.models import User, Group
 from django.contrib.auth.forms import (AuthenticationForm, UserCreationForm, 
                                        PasswordResetForm, SetPasswordForm
                                        )
-from django.contrib.contenttypes.models import ContentType
 from django.core.mail import EmailMessage
 from django.contrib import messages
-from django.db.models import Prefetch
+from django.db.models import Case, Prefetch, When
 import secrets
 from datetime import timedelta
 from django.utils import timezone
-from django.contrib.auth.decorators import user_passes_test
 from django.db.models import Q
 from hashlib import sha1
+from .decorators import (reader_required, journalist_required,
+                         editor_required)
+from .middleware import get_user_role
 from .models import (ArticleStatus, Roles, User, ReaderProfile, 
                      JournalistProfile, EditorProfile,
-                     Publisher, Article, ResetToken, ArticleSerializer
+                     Publisher, Article, ResetToken
                      )
 from .forms import (CustomUserCreationForm, CustomPasswordResetForm, 
                     ArticleForm, ArticlePublishForm, EditorArticleForm, 
-                    AssignJournalistsToPublisherForm
+                    AssignJournalistsToPublisherForm,
+                    ReaderNotificationSettingsForm
                     )
  
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework.decorators import (api_view, renderer_classes,
                                        authentication_classes,
                                        permission_classes
                                        )
-from rest_framework_xml.renderers import XMLRenderer
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.authentication import BasicAuthentication
 from rest_framework.permissions import IsAuthenticated
 from .functions.tweet import Tweet
+from .functions.pagination import KeysetPaginator
+from .functions.article_records import (ArticleRecordBuilder,
+                                        parse_field_list)
+from .functions.conditional import (conditional_on_article,
+                                    conditional_on_collection)
+from .functions.export import (EXPORT_FORMATS, CSVRenderer, NDJSONRenderer,
+                               StreamingXMLRenderer, export_queryset,
+                               iter_article_records, parse_since)
+from .functions.api_keys import APIKeyAuthentication
+from .functions.changes import get_changes
+from .functions.search import get_search_backend
+from django.conf import settings
 
 # Create your views here.
 
-def in_group_editor(user):
-    """Returns True if the user is in "Editors" group.
-
-    Args:
-        user (User): The user to check.
-
-    Returns:
-        bool: True if the user is in the "Editors" group, False otherwise.
-    """
-    return user.groups.filter(name="Editors").exists()
-
-
-def in_group_reader(user):
-    """Returns True if the user is in "Readers" group.
-
-    Args:
-        user (User): The user to check.
-
-    Returns:
-        bool: True if the user is in the "Readers" group, False otherwise.
-    """
-    return user.groups.filter(name="Readers").exists()
-
-def in_group_journalist(user):
-    """Returns True if the user is in "Journalists" group.
-
-    Args:
-        user (User): The user to check.
-
-    Returns:
-        bool: True if the user is in the "Journalists" group, False otherwise.
-    """
-    return user.groups.filter(name="Journalists").exists()
+# Start page of each role, used to redirect after logging in:
+ROLE_START_PAGES = {
+    Roles.READER: "reader_start_page",
+    Roles.EDITOR: "editor_start_page",
+    Roles.JOURNALIST: "journalist_start_page",
+}
 
 def login_view(request):
     """
@@ -90,14 +77,10 @@ def login_view(request):
             request.session.set_expiry(0)  # Session expires on browser close
     
     
-            user_groups = user.groups.all()
-            # Redirect to the appropriate dashboard based on user group:
-            if user_groups.filter(name="Readers").exists():
-                return redirect("reader_start_page")
-            elif user_groups.filter(name="Editors").exists():
-                return redirect("editor_start_page")
-            elif user_groups.filter(name="Journalists").exists():
-                return redirect("journalist_start_page")
+            # Redirect to the appropriate dashboard based on user role:
+            start_page = ROLE_START_PAGES.get(get_user_role(user))
+            if start_page:
+                return redirect(start_page)
 
     else:
         form = AuthenticationForm(request)
@@ -118,15 +101,11 @@ def register_new_user_view(request):
             login(request, user)
 
             
-            # Add the user to the group selected during registratio
-
-            user_groups = user.groups.all()
-            if user_groups.filter(name="Readers").exists():
-                return redirect("reader_start_page")
-            elif user_groups.filter(name="Editors").exists():
-                return redirect("editor_start_page")
-            elif user_groups.filter(name="Journalists").exists():
-                return redirect("journalist_start_page")
+            # Redirect to the start page of the role selected during
+            # registration:
+            start_page = ROLE_START_PAGES.get(get_user_role(user))
+            if start_page:
+                return redirect(start_page)
         
     else:
         form = CustomUserCreationForm()
@@ -285,30 +264,55 @@ def reset_user_password_view(request, token):
         "user": user
     })
 
-@user_passes_test(in_group_reader)
+@reader_required
 def reader_start_view(request):
     """
     View to display reader start page - allowing Readers to browse articles
     and newsletters.
+
+    Only published articles are loaded, newest first, one page at a time.
+    The "after" GET parameter is the opaque cursor of the next page.
+    Search results are shown most relevant first instead, and "after" is
+    then the position of the next page in the ranked results.
     """
-    # Get search query from GET parameters
+    # Get search query and page cursor from GET parameters
     search_query = request.GET.get("search", "").strip()
+    after = request.GET.get("after", "")
 
-    # Start with all articles
-    articles = Article.objects.all()
+    # Only published articles, the feed never shows the article body:
+    articles = Article.objects.filter(
+        publication_status=ArticleStatus.PUBLISHED
+        ).with_publishers().defer("content")
     
-    # Filter by search query if provided
+    page_size = getattr(settings, "READER_FEED_PAGE_SIZE", 20)
     if search_query:
-        articles = articles.filter(
-            title__icontains=search_query
-        )
+        # Page through the IDs ranked by the full-text search index,
+        # keeping their order:
+        search_limit = getattr(settings, "SEARCH_MAX_RESULTS", 500)
+        article_ids = get_search_backend().search(search_query,
+                                                  limit=search_limit)
+        offset = int(after) if after.isdigit() else 0
+        page_ids = article_ids[offset:offset + page_size]
+        object_list = articles.filter(pk__in=page_ids).order_by(Case(
+            *[When(pk=pk, then=rank) for rank, pk in enumerate(page_ids)]))
+        next_cursor = None
+        if len(article_ids) > offset + page_size:
+            next_cursor = str(offset + page_size)
+    else:
+        page = KeysetPaginator(articles, "publication_date",
+                               page_size).page(after)
+        object_list = page.object_list
+        next_cursor = page.next_cursor
 
     return render(request, "news_application/reader_start.html",
                   {"page_title": "Welcome!",
-                   "articles": articles,
+                   "articles": object_list,
+                   "next_cursor": next_cursor,
+                   "is_first_page": not after,
                    "search_query": search_query})
 
-@user_passes_test(in_group_reader)
+@reader_required
+@conditional_on_article
 def reader_view_article(request, article_id):
     """
     View to display a single article to the reader.
@@ -318,7 +322,7 @@ def reader_view_article(request, article_id):
                   {"page_title": article.title,
                    "article": article})
 
-@user_passes_test(in_group_reader)
+@reader_required
 def reader_view_journalist_details(request, journalist_id, article_id):
     """
     View to display details of a specific journalist to the reader.
@@ -341,7 +345,7 @@ def reader_view_journalist_details(request, journalist_id, article_id):
                    "previous_article_id": article_id}
     )
 
-@user_passes_test(in_group_reader)
+@reader_required
 def reader_view_publisher_details(request, article_id):
     """
     View to display details of a specific publisher to the reader.
@@ -356,13 +360,9 @@ def reader_view_publisher_details(request, article_id):
                         )
     else:
         # Return to publisher details if not self-published:
-        publisher = get_object_or_404(Publisher, pk=article.publisher.id)
+        publisher = get_object_or_404(Publisher, pk=article.publisher_id)
 
-        publisher_content_type = ContentType.objects.get_for_model(Publisher)
-        articles_published = Article.objects.filter(
-            publisher_content_type=publisher_content_type,
-            publisher_object_id=article.publisher.id
-            ).count()
+        articles_published = publisher.articles.count()
 
         if publisher.subscribers.filter(
             id=request.user.id).exists():
@@ -381,7 +381,7 @@ def reader_view_publisher_details(request, article_id):
                     }
                     )
 
-@user_passes_test(in_group_reader)
+@reader_required
 def reader_journalist_subscribe_unsubscribe(request, journalist_id,
                                             article_id):
     """
@@ -407,7 +407,7 @@ def reader_journalist_subscribe_unsubscribe(request, journalist_id,
                     journalist_id=journalist.id, article_id=article_id)
 
 
-@user_passes_test(in_group_reader)
+@reader_required
 def reader_publisher_subscribe_unsubscribe(request, publisher_id, article_id):
     """
     View to allow a reader to subscribe or unsubscribe from a publisher.
@@ -430,7 +430,29 @@ def reader_publisher_subscribe_unsubscribe(request, publisher_id, article_id):
     return redirect("reader_view_publisher_details_page", 
                     article_id=article_id)
 
-@user_passes_test(in_group_journalist)
+@reader_required
+def reader_notification_settings_view(request):
+    """
+    View for the reader to choose between an email per new article and an
+    hourly or daily digest.
+    """
+    profile = request.user.reader_profile
+
+    if request.method == "POST":
+        form = ReaderNotificationSettingsForm(request.POST, instance=profile)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Notification settings saved.")
+            return redirect("reader_start_page")
+    else:
+        form = ReaderNotificationSettingsForm(instance=profile)
+
+    return render(request,
+                  "news_application/reader_notification_settings.html",
+                  {"page_title": "Notification Settings",
+                   "form": form})
+
+@journalist_required
 def journalist_start_view(request):
     """
     View to display journalist start page - allowing Journalists to manage their articles
@@ -439,7 +461,7 @@ def journalist_start_view(request):
     return render(request, "news_application/journalist_start.html",
                   {"page_title": "Journalist Dashboard"})
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_start_view(request):
     """
     View to display editor start page - allowing Editors to manage their articles
@@ -452,7 +474,7 @@ def editor_start_view(request):
                   {"page_title": "Editor Dashboard",
                    "assigned_publishers": assigned_publishers})
 
-@user_passes_test(in_group_journalist)
+@journalist_required
 def journalist_article_management_view(request):
     """
     View to display journalist article management page - allowing Journalists to
@@ -466,7 +488,7 @@ def journalist_article_management_view(request):
          "ArticleStatus": ArticleStatus}
         )
 
-@user_passes_test(in_group_journalist)
+@journalist_required
 def journalist_article_add_view(request):
     """
     View to create a new article.
@@ -485,7 +507,7 @@ def journalist_article_add_view(request):
     return render(request, "news_application/journalist_article_form.html", 
                   {"form": form})
 
-@user_passes_test(in_group_journalist)
+@journalist_required
 def journalist_article_edit_view(request, pk):
     """
     View to update an existing article.
@@ -506,7 +528,7 @@ def journalist_article_edit_view(request, pk):
     return render(request, "news_application/journalist_article_form.html", 
                   {"form": form, "article": article})
 
-@user_passes_test(in_group_journalist)
+@journalist_required
 def journalist_article_detail_view(request, pk):
     """
     View to display the details of a specific article.
@@ -519,7 +541,7 @@ def journalist_article_detail_view(request, pk):
     return render(request, "news_application/journalist_article_detail.html", 
                   {"article": article})
 
-@user_passes_test(in_group_journalist)
+@journalist_required
 def journalist_article_delete_view(request, pk):
     """
     View to delete an existing article.
@@ -537,7 +559,7 @@ def journalist_article_delete_view(request, pk):
                   {"article": article}
                   )
 
-@user_passes_test(in_group_journalist)
+@journalist_required
 def journalist_article_publish_view(request, pk):
     """
     View to publish an existing article.
@@ -562,7 +584,7 @@ def journalist_article_publish_view(request, pk):
                   )
 
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_publisher_dashboard_view(request, pk):
     """
     View to display editor publisher dashboard page - allowing Editors to 
@@ -575,7 +597,7 @@ def editor_publisher_dashboard_view(request, pk):
                    "publisher": publisher})
 
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_journalist_management_view(request, pk):
     """
     View to display editor journalist management page - allowing Editors to 
@@ -589,7 +611,7 @@ def editor_journalist_management_view(request, pk):
                    "publisher": publisher,
                    "journalists": journalists})
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_assign_journalist_view(request, pk):
     """
     View to assign a journalist to a publisher.
@@ -614,7 +636,7 @@ def editor_assign_journalist_view(request, pk):
                   {"form": form, "publisher": publisher})
 
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_journalist_remove_assignment_view(request, publisher_pk, 
                                              journalist_pk):
     """
@@ -644,7 +666,7 @@ def editor_journalist_remove_assignment_view(request, publisher_pk,
         {"publisher": publisher, "journalist": journalist})
 
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_article_management_view(request, pk):
     """
     View to display editor article management page - allowing Editors to
@@ -653,11 +675,7 @@ def editor_article_management_view(request, pk):
     
     
     publisher = get_object_or_404(Publisher, pk=pk, editors=request.user)
-    publisher_content_type = ContentType.objects.get_for_model(Publisher)
-    articles = Article.objects.filter(
-        publisher_content_type=publisher_content_type,
-        publisher_object_id=publisher.pk).select_related("author"
-        )
+    articles = publisher.articles.with_publishers()
       
     
     return render(
@@ -672,7 +690,7 @@ def editor_article_management_view(request, pk):
         }
     )
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_article_detail_view(request, pk):
     """
     View to display the details of a specific article.
@@ -685,7 +703,7 @@ def editor_article_detail_view(request, pk):
     return render(request, "news_application/editor_article_detail.html", 
                   {"article": article})
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_article_edit_view(request, pk):
     """
     View to update an existing article.
@@ -706,7 +724,17 @@ def editor_article_edit_view(request, pk):
     return render(request, "news_application/editor_article_form.html", 
                   {"form": form, "article": article})
 
-@user_passes_test(in_group_editor)
+def redirect_to_publisher_articles(publisher_pk):
+    """
+    Redirect an editor to the article management page of a publisher, or
+    to the editor start page for a self-published article or one without
+    a publisher (article.publisher_id is None for both).
+    """
+    if publisher_pk is None:
+        return redirect("editor_start_page")
+    return redirect("editor_article_management_page", pk=publisher_pk)
+
+@editor_required
 def editor_article_delete_view(request, pk):
     """
     View to delete an existing article.
@@ -717,14 +745,15 @@ def editor_article_delete_view(request, pk):
     """
     article = get_object_or_404(Article, pk=pk)
     if request.method == "POST":
+        publisher_pk = article.publisher_id
         article.delete()
-        return redirect("editor_article_management_page")
+        return redirect_to_publisher_articles(publisher_pk)
     return render(request, 
                   "news_application/editor_article_confirm_delete.html", 
                   {"article": article}
                   )
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_reject_for_publication_view(request, pk):
     """
     View to reject an existing article for publication.
@@ -741,9 +770,9 @@ def editor_reject_for_publication_view(request, pk):
                      f"has been rejected for publication.\n"
                      f"The author will be notified via email."
                      )
-    return redirect("editor_article_management_page", pk=article.publisher.pk)
+    return redirect_to_publisher_articles(article.publisher_id)
 
-@user_passes_test(in_group_editor)
+@editor_required
 def editor_accept_for_publication_view(request, pk):
     """
     View to reject an existing article for publication.
@@ -761,7 +790,7 @@ def editor_accept_for_publication_view(request, pk):
                      f"has been accepted for publication.\n"
                      f"All subscribers will be notified via email."
                      )
-    return redirect("editor_article_management_page", pk=article.publisher.pk)
+    return redirect_to_publisher_articles(article.publisher_id)
 
 
 
@@ -772,43 +801,72 @@ def editor_accept_for_publication_view(request, pk):
 
 def publisher_name_q(publisher_name: str) :
     """
-    Build a Q() that matches Article.publisher (GenericForeignKey) to either:
+    Build a Q() that matches Article.publisher to either:
       - Publisher objects whose .name matches publisher_name, OR
-      - User objects (self-published) whose username matches publisher_name
+      - Self-published articles whose author username matches publisher_name
     """
+    return (
+        Q(publisher__name__iexact=publisher_name)
+        |
+        Q(self_published=True, author__username__iexact=publisher_name)
+    )
 
-    # Figure out content types for both possible targets
-    ct_publisher = ContentType.objects.get_for_model(Publisher)
-    ct_user = ContentType.objects.get_for_model(User)
 
-    # IDs that match the provided name on each concrete model
-    publisher_ids = Publisher.objects.filter(
-        name__iexact=publisher_name
-    ).values_list("id", flat=True)
 
-    user_ids = User.objects.filter(
-        Q(username__iexact=publisher_name)
-    ).values_list("id", flat=True)
+def api_page_size(request):
+    """Return the page size requested with the 'limit' parameter, capped at
+    API_MAX_PAGE_SIZE. A missing or invalid limit gives API_PAGE_SIZE.
+    """
+    page_size = getattr(settings, "API_PAGE_SIZE", 100)
+    try:
+        page_size = int(request.GET.get("limit", page_size))
+    except ValueError:
+        pass
+    return max(1, min(page_size, getattr(settings, "API_MAX_PAGE_SIZE", 500)))
 
-    # Build the OR across the two content types
-    return (
-        Q(publisher_content_type=ct_publisher,
-          publisher_object_id__in=publisher_ids)
-        |
-        Q(publisher_content_type=ct_user,
-          publisher_object_id__in=user_ids)
-    )
 
+def next_page_link(request, next_cursor):
+    """Build the Link header pointing at the page after next_cursor, keeping
+    the other query parameters of the request.
+    """
+    params = request.GET.copy()
+    params["cursor"] = next_cursor
+    url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+    return f'<{url}>; rel="next"'
 
 
 @api_view(['GET'])
-@authentication_classes([BasicAuthentication])
+@renderer_classes([JSONRenderer, StreamingXMLRenderer])
+@authentication_classes([BasicAuthentication, APIKeyAuthentication])
 @permission_classes([IsAuthenticated])
+@conditional_on_collection()
 def API_get_articles(request):
     """API Request to View all articles, or if the request contains the keyword
     'author_name' then filter by that author, if request contains the keyword
     'publisher_name' then filter by that publisher.
 
+    Articles are JSON by default, or XML with the Accept header
+    application/xml or 'format=xml'. The XML is written to the response
+    one article at a time rather than built as a whole document.
+
+    'fields' (comma separated) limits each article to those fields and
+    'expand=author,publisher' embeds the author and publisher as objects
+    instead of their IDs. Only the columns needed are read from the
+    database.
+
+    Clients authenticate with an API key ("Authorization: Api-Key <key>",
+    see the api_keys command) or with Basic auth. API keys are verified
+    without a password hash, so they suit frequent polling. Unauthenticated
+    requests are challenged for Basic auth.
+
+    Responses carry an ETag and Last-Modified from the articles' collection
+    version, and conditional requests for an unchanged collection get a 304.
+
+    Articles are returned one page at a time, oldest first. The 'limit'
+    parameter sets the page size (at most API_MAX_PAGE_SIZE). When there
+    are more articles, the response has a Link header with rel="next"
+    whose URL carries the opaque 'cursor' of the following page.
+
     Args:
         request (HttpRequest): The HTTP request object.
     """
@@ -816,18 +874,111 @@ def API_get_articles(request):
         author_name = request.GET.get('author_name')
         publisher_name = request.GET.get('publisher_name')
 
-        query_articles = Article.objects.all().select_related("author")
+        query_articles = Article.objects.all()
 
         if author_name:
             query_articles = query_articles.filter(
                 author__username__iexact=author_name)
         
         
-        # Generic ForeignKey filtering (publisher can be Publisher or User):
+        # Publisher filtering (publisher can be Publisher or the author):
         if publisher_name:
             query_articles = query_articles.filter(
                 publisher_name_q(publisher_name))
 
-        serializer = ArticleSerializer(query_articles, many=True)
-        return JsonResponse(serializer.data, safe=False)
-    
\ No newline at end of file
+        # Build the records from values_list() rows holding only the
+        # columns of the requested fields (all of them by default), the
+        # same output as ArticleSerializer without a model instance and
+        # serializer field per row:
+        try:
+            builder = ArticleRecordBuilder(
+                parse_field_list(request.GET.get("fields")),
+                parse_field_list(request.GET.get("expand")))
+        except ValueError as e:
+            return Response({"detail": str(e)},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        page = KeysetPaginator(builder.rows(query_articles), "pk",
+                               api_page_size(request),
+                               descending=False).page(
+                                   request.GET.get("cursor"))
+
+        renderer = request.accepted_renderer
+        if renderer.format == "xml":
+            records = (builder.record(row) for row in page.object_list)
+            response = StreamingHttpResponse(
+                renderer.stream(records),
+                content_type=f"{renderer.media_type}; charset=utf-8")
+        else:
+            data = builder.records(page.object_list)
+            response = JsonResponse(data, safe=False)
+        if page.has_next:
+            response["Link"] = next_page_link(request, page.next_cursor)
+        return response
+
+
+@api_view(['GET'])
+@renderer_classes([JSONRenderer, StreamingXMLRenderer])
+@authentication_classes([BasicAuthentication, APIKeyAuthentication])
+@permission_classes([IsAuthenticated])
+def API_get_article_changes(request):
+    """API Request for the articles changed since a cursor, so consumers
+    can mirror the articles without fetching all of them on every sync.
+
+    Without 'since' the feed starts with every article. Each response
+    has the records of the articles created or saved (e.g. edited,
+    published or unpublished) after the cursor, oldest change first, the
+    IDs of the articles deleted since then, and a 'cursor' to pass as
+    'since' on the next request. 'has_more' is true while more changes
+    are waiting, and 'limit' sets the number of changes per response (at
+    most API_MAX_PAGE_SIZE). JSON by default, or XML like
+    /get/articles/. Changes younger than CHANGES_FEED_SETTLE_SECONDS are
+    held back for a later request (see get_changes()).
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+    """
+    try:
+        changes = get_changes(request.GET.get("since"),
+                              api_page_size(request))
+    except ValueError as e:
+        return Response({"detail": str(e)},
+                        status=status.HTTP_400_BAD_REQUEST)
+    return Response(changes)
+
+
+@api_view(['GET'])
+@renderer_classes([NDJSONRenderer, CSVRenderer, StreamingXMLRenderer])
+@authentication_classes([BasicAuthentication, APIKeyAuthentication])
+@permission_classes([IsAuthenticated])
+def API_export_articles(request):
+    """API Request to export every article as NDJSON (the default), CSV or
+    XML, chosen with the Accept header or 'format=ndjson'/'format=csv'/
+    'format=xml'.
+
+    The rows are streamed from the database as the response is written,
+    so memory use does not grow with the number of articles. 'since' (an
+    ISO 8601 date or datetime) only exports the articles updated since
+    then, and 'status' the articles with that publication status.
+
+    Args:
+        request (HttpRequest): The HTTP request object.
+    """
+    renderer = request.accepted_renderer
+    try:
+        since = parse_since(request.GET.get("since"))
+    except ValueError as e:
+        return JsonResponse({"detail": str(e)}, status=400)
+    publication_status = request.GET.get("status")
+    if publication_status and publication_status not in ArticleStatus.values:
+        return JsonResponse(
+            {"detail": f"Invalid status: {publication_status}"}, status=400)
+
+    records = iter_article_records(
+        export_queryset(since, publication_status))
+    response = StreamingHttpResponse(
+        EXPORT_FORMATS[renderer.format](records),
+        content_type=f"{renderer.media_type}; charset=utf-8")
+    response["Content-Disposition"] = (
+        f'attachment; filename="articles.{renderer.format}"')
+    return response